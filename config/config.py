@@ -11,7 +11,19 @@ MYSQL_CONFIG = {
     'user': os.getenv('MYSQL_USER', 'root'),
     'password': os.getenv('MYSQL_PASSWORD', ''),
     'database': os.getenv('MYSQL_DATABASE', 'analysis_db'),
-    'charset': 'utf8mb4'
+    'charset': 'utf8mb4',
+    # 连接空闲超过该秒数后，下一条语句执行前才 ping 校验
+    'ping_interval': int(os.getenv('MYSQL_PING_INTERVAL', 30)),
+    # 连接池：每个数据库的最大连接数、连接最长空闲秒数、等待空闲连接的超时秒数
+    'pool_size': int(os.getenv('MYSQL_POOL_SIZE', 5)),
+    'pool_max_idle': int(os.getenv('MYSQL_POOL_MAX_IDLE', 300)),
+    'pool_wait_timeout': int(os.getenv('MYSQL_POOL_WAIT_TIMEOUT', 10)),
+    # 调度任务执行数据库调用的线程数，不应超过连接池大小
+    'executor_workers': int(os.getenv('MYSQL_EXECUTOR_WORKERS', 4)),
+    # 项目信息并发查询各关联表的整体截止秒数，超时的板块以空值返回
+    'enrich_deadline': float(os.getenv('MYSQL_ENRICH_DEADLINE', 15)),
+    # 各Twitter用户最近推文的内存缓冲增量刷新间隔秒数
+    'recent_tweets_refresh': int(os.getenv('MYSQL_RECENT_TWEETS_REFRESH', 60))
 }
 
 MONGO_CONFIG = {
@@ -28,6 +40,40 @@ TASK_CONFIG = {
     'interval_minutes': int(os.getenv('TASK_INTERVAL_MINUTES', 10)),
     'important_interval_seconds': int(os.getenv('IMPORTANT_INTERVAL_SECONDS', 5)),
     'process_limit_count': int(os.getenv('TASK_PROCESS_LIMIT_COUNT', 2)),
+    # KOL推文并发分析数量及单条推文最大重试次数
+    'kol_concurrency': int(os.getenv('KOL_ANALYSIS_CONCURRENCY', 5)),
+    'kol_max_retries': int(os.getenv('KOL_ANALYSIS_MAX_RETRIES', 3)),
+    # KOL推文批量提取：每批最多推文数（1 表示逐条分析）及每批推文token预算
+    'kol_batch_size': int(os.getenv('KOL_BATCH_SIZE', 10)),
+    'kol_batch_token_budget': int(os.getenv('KOL_BATCH_TOKEN_BUDGET', 3000)),
+    # KOL推文按游标分页拉取的每页条数
+    'kol_page_size': int(os.getenv('KOL_PAGE_SIZE', 200)),
+    # 处理后的KOL推文批量写库：缓冲条数上限及最长缓冲秒数
+    'kol_write_batch_size': int(os.getenv('KOL_WRITE_BATCH_SIZE', 50)),
+    'kol_write_max_age': float(os.getenv('KOL_WRITE_MAX_AGE_SECONDS', 5)),
+    # 事件循环阻塞统计输出间隔（秒）
+    'loop_lag_report_seconds': int(os.getenv('LOOP_LAG_REPORT_SECONDS', 60)),
+    # 项目标签内存索引检查表更新的间隔（秒）
+    'project_index_refresh_seconds': int(os.getenv('PROJECT_INDEX_REFRESH_SECONDS', 300)),
+    # KOL推文本地预提取：是否启用，以及本地匹配可跳过LLM的最低置信度
+    'kol_local_extract': os.getenv('KOL_LOCAL_EXTRACT_ENABLED', 'true').lower() == 'true',
+    'kol_local_min_confidence': float(os.getenv('KOL_LOCAL_MIN_CONFIDENCE', 0.8)),
+    # 近似重复推文检测：是否启用、相似度阈值、滑动窗口（秒）
+    'kol_dedup': os.getenv('KOL_DEDUP_ENABLED', 'true').lower() == 'true',
+    'kol_dedup_threshold': float(os.getenv('KOL_DEDUP_THRESHOLD', 0.8)),
+    'kol_dedup_window_seconds': int(os.getenv('KOL_DEDUP_WINDOW_SECONDS', 21600)),
+    # 小时总结单次调用的推文token预算，超出时分片并发总结后再合并
+    'summary_chunk_token_budget': int(os.getenv('SUMMARY_CHUNK_TOKEN_BUDGET', 6000)),
+    # 小时总结增量折叠间隔（分钟），0 表示整点一次性总结
+    'summary_fold_minutes': int(os.getenv('SUMMARY_FOLD_MINUTES', 10)),
+    # 推文总结回补：同时总结的窗口数及预取推文领先的窗口数
+    'backfill_concurrency': int(os.getenv('BACKFILL_CONCURRENCY', 4)),
+    'backfill_prefetch': int(os.getenv('BACKFILL_PREFETCH', 2)),
+    # 项目热度预警：检查间隔（分钟，0 表示关闭），近 1 小时 z-score 阈值、最少提及次数及同一项目的冷却时间（分钟）
+    'trend_alert_minutes': int(os.getenv('TREND_ALERT_MINUTES', 5)),
+    'trend_alert_zscore': float(os.getenv('TREND_ALERT_ZSCORE', 3.0)),
+    'trend_alert_min_count': int(os.getenv('TREND_ALERT_MIN_COUNT', 5)),
+    'trend_alert_cooldown_minutes': int(os.getenv('TREND_ALERT_COOLDOWN_MINUTES', 120)),
     # MySQL数据源配置
     'mysql_sources': [
         {
@@ -84,3 +130,63 @@ LOCAL_MODEL_CONFIG = {
     'base_url': os.getenv('MODEL_BASE_URL'),
     'model': os.getenv('MODEL_NAME')
 }
+
+# LLM响应缓存
+LLM_CACHE_CONFIG = {
+    'enabled': os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true',
+    'path': os.getenv('LLM_CACHE_PATH', 'cache/llm_cache.sqlite3'),
+    'ttl_seconds': int(os.getenv('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600)),
+    'memory_size': int(os.getenv('LLM_CACHE_MEMORY_SIZE', 2000)),
+    'max_entries': int(os.getenv('LLM_CACHE_MAX_ENTRIES', 200000))
+}
+
+# 项目信息（get_all_info）缓存：进程内 LRU 的项目数、是否启用 MySQL 共享层，以及三档板块 TTL（秒）
+DOSSIER_CACHE_CONFIG = {
+    'enabled': os.getenv('DOSSIER_CACHE_ENABLED', 'true').lower() == 'true',
+    'shared': os.getenv('DOSSIER_CACHE_SHARED', 'false').lower() == 'true',
+    'memory_size': int(os.getenv('DOSSIER_CACHE_MEMORY_SIZE', 500)),
+    'static_ttl': int(os.getenv('DOSSIER_CACHE_STATIC_TTL', 24 * 3600)),
+    'medium_ttl': int(os.getenv('DOSSIER_CACHE_MEDIUM_TTL', 3600)),
+    'activity_ttl': int(os.getenv('DOSSIER_CACHE_ACTIVITY_TTL', 300))
+}
+
+# 项目信息物化表：get_all_info 是否先读物化表，后台构建的时刻（上海时间的小时）、每页项目数、每页查询截止秒数、
+# 定期全量重建的间隔秒数和物化数据的最大有效秒数（需大于全量重建间隔）
+DOSSIER_STORE_CONFIG = {
+    'enabled': os.getenv('DOSSIER_STORE_ENABLED', 'false').lower() == 'true',
+    'build_hour': int(os.getenv('DOSSIER_BUILD_HOUR', 4)),
+    'batch_size': int(os.getenv('DOSSIER_BUILD_BATCH_SIZE', 200)),
+    'build_deadline': int(os.getenv('DOSSIER_BUILD_DEADLINE', 120)),
+    'full_rebuild_seconds': float(os.getenv('DOSSIER_FULL_REBUILD_DAYS', 7)) * 86400,
+    'max_age_seconds': float(os.getenv('DOSSIER_STORE_MAX_AGE_HOURS', 192)) * 3600
+}
+
+# LLM自适应限流（AIMD），rpm/tpm 为 0 表示不限制
+LLM_RATE_LIMIT_CONFIG = {
+    'enabled': os.getenv('LLM_RATE_LIMIT_ENABLED', 'true').lower() == 'true',
+    'min_concurrency': int(os.getenv('LLM_MIN_CONCURRENCY', 1)),
+    'max_concurrency': int(os.getenv('LLM_MAX_CONCURRENCY', 16)),
+    'initial_concurrency': int(os.getenv('LLM_INITIAL_CONCURRENCY', 4)),
+    'increase_step': float(os.getenv('LLM_CONCURRENCY_INCREASE_STEP', 1.0)),
+    'decrease_factor': float(os.getenv('LLM_CONCURRENCY_DECREASE_FACTOR', 0.5)),
+    'decrease_cooldown': float(os.getenv('LLM_CONCURRENCY_DECREASE_COOLDOWN', 5)),
+    'rpm': int(os.getenv('LLM_RPM_LIMIT', 0)),
+    'tpm': int(os.getenv('LLM_TPM_LIMIT', 0))
+}
+
+# 模型提供方路由：按 LLM_PROVIDERS 顺序故障转移，可选对冲请求
+LLM_PROVIDER_CONFIGS = {
+    'deepseek': DEEPSEEK_CONFIG,
+    'openai': OPENAI_CONFIG,
+    'local': LOCAL_MODEL_CONFIG
+}
+
+LLM_ROUTER_CONFIG = {
+    'providers': [name.strip() for name in os.getenv('LLM_PROVIDERS', 'deepseek').split(',') if name.strip()],
+    'hedge_enabled': os.getenv('LLM_HEDGE_ENABLED', 'false').lower() == 'true',
+    # 主提供方耗时样本不足时使用的对冲等待秒数，样本充足时使用其 p95 耗时
+    'hedge_delay_seconds': float(os.getenv('LLM_HEDGE_DELAY_SECONDS', 20)),
+    'hedge_min_delay_seconds': float(os.getenv('LLM_HEDGE_MIN_DELAY_SECONDS', 2)),
+    'failure_threshold': int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', 3)),
+    'open_seconds': int(os.getenv('LLM_CIRCUIT_OPEN_SECONDS', 60))
+}
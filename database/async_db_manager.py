@@ -0,0 +1,61 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('async_db_manager')
+
+
+class AsyncMySQLManager:
+    """MySQLManager 的异步封装
+
+    方法与 MySQLManager 一一对应，调用时在专用线程池中执行同步的 pymysql 调用并 await 结果，
+    数据库 I/O 不再阻塞事件循环。底层连接由连接池管理，线程数不应超过连接池大小。
+    """
+
+    def __init__(self, mysql_manager, max_workers=4):
+        """初始化异步管理器
+
+        Args:
+            mysql_manager (MySQLManager): 同步的MySQL管理器
+            max_workers (int, optional): 执行数据库调用的线程数
+        """
+        self.mysql_manager = mysql_manager
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mysql')
+
+    def __getattr__(self, name):
+        attr = getattr(self.mysql_manager, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        return wrapper
+
+    async def run(self, func, *args, **kwargs):
+        """在数据库线程池中执行同步函数"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def iter_kol_tweet_pages(self, cursor, page_size=200):
+        """异步版 MySQLManager.iter_kol_tweet_pages，每页在线程池中读取
+
+        Yields:
+            list: 一页推文
+        """
+        pages = self.mysql_manager.iter_kol_tweet_pages(cursor, page_size)
+        try:
+            while True:
+                page = await self.run(next, pages, None)
+                if page is None:
+                    return
+                yield page
+        finally:
+            pages.close()
+
+    async def close(self):
+        """等待进行中的数据库调用完成并关闭线程池，等待在线程中进行，不阻塞事件循环"""
+        await asyncio.to_thread(self.executor.shutdown, True)
+        logger.info("MySQL异步线程池已关闭")
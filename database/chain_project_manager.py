@@ -1,35 +1,68 @@
 import logging
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 from database.db_factory import db_factory
 
 
 
 logger = logging.getLogger('chain_project_manager')
 
+_section_executor = None
+_section_executor_lock = threading.Lock()
+# 启动时由 configure_dossier_sources 设置，构造 ChainProjectManager 时未显式传入则使用
+_default_dossier_cache = None
+_default_dossier_store = None
+
+# get_all_info 结果中每个项目的板块，顺序即输出顺序
+DOSSIER_SECTIONS = (
+    'ecosystems', 'fundraising', 'fundraising_rounds', 'investments', 'social_links', 'subsidiary_orgs',
+    'tags', 'team_members', 'active_team_members', 'github_commit_msg', 'team_members_details',
+    'token_contracts', 'token_unlock_events', 'snapshots', 'recent_activity'
+)
+# 由多张表推导的板块及其依赖的查询，依赖缺失时不写入缓存
+DERIVED_SECTIONS = {
+    'team_members_details': {
+        'active_team_members', 'people_education', 'people_social_links', 'people_work_experience',
+        'people_investments'
+    },
+    'recent_activity': {
+        'active_team_members', 'fundraising', 'people_social_links', 'investor_social_links',
+        'linked_project_social_links', 'recent_activity'
+    }
+}
+
 
 class ChainProjectManager:
     """链上项目数据管理器，负责从chain_project数据库获取项目相关信息"""
 
-    def __init__(self, config, mongo_config=None):
+    def __init__(self, config, mongo_config=None, dossier_cache=None, dossier_store=None):
         """初始化数据库连接
         
         Args:
             config (dict): MySQL连接配置
             mongo_config (dict, optional): MongoDB连接配置，如果为None，则尝试从config中获取
+            dossier_cache (DossierCache, optional): 项目信息缓存，get_all_info 复用该实例时使用，
+                默认为 configure_dossier_sources 设置的缓存
+            dossier_store (DossierStore, optional): 项目信息物化表，get_all_info 复用该实例时使用，
+                默认为 configure_dossier_sources 设置的物化表
         """
         self.config = config
         self.mongo_config = mongo_config
+        self.dossier_cache = dossier_cache if dossier_cache is not None else _default_dossier_cache
+        self.dossier_store = dossier_store if dossier_store is not None else _default_dossier_store
         self.mysql_source = None
         self.connect()
+        # 长期复用的管理器在多次 get_all_info 之间保留各用户的最近推文，只增量查询新推文
+        self.tweet_buffer = RecentTweetsBuffer(self, refresh_seconds=config.get('recent_tweets_refresh', 60))
 
     def connect(self):
         """创建数据库连接，使用chain_project数据库"""
         try:
-            # 使用数据库工厂获取MySQL数据源
-            self.mysql_source = db_factory.get_mysql_source(self.config)
-
-            # 切换到chain_project数据库
-            self.mysql_source.switch_database('chain_project')
+            # 使用固定chain_project数据库的独立连接池，不影响其他管理器使用的连接
+            self.mysql_source = db_factory.get_mysql_source(dict(self.config, database='chain_project'))
         except Exception as e:
             logger.error(f"chain_project数据库连接失败: {str(e)}")
             raise
@@ -75,6 +108,42 @@ class ChainProjectManager:
 
         return filter_projects
 
+    def get_projects_page(self, after_project_id=None, limit=200):
+        """按项目ID顺序分页获取项目
+
+        Args:
+            after_project_id (optional): 上一页最后一个项目ID，为None时从头开始
+            limit (int, optional): 每页数量
+
+        Returns:
+            list: 项目信息列表
+        """
+        if after_project_id is None:
+            query = "SELECT * FROM projects ORDER BY project_id LIMIT %s"
+            params = (limit,)
+        else:
+            query = "SELECT * FROM projects WHERE project_id > %s ORDER BY project_id LIMIT %s"
+            params = (after_project_id, limit)
+        return self.mysql_source.execute_query(query, params)
+
+    def get_table_update_times(self, tables):
+        """获取chain_project库中各表最近一次写入的时间（information_schema.TABLES.UPDATE_TIME）
+
+        Args:
+            tables (list): 表名列表
+
+        Returns:
+            dict: {表名: 更新时间}，MySQL 未记录时为None
+        """
+        if not tables:
+            return {}
+
+        placeholders = ", ".join(["%s"] * len(tables))
+        query = (f"SELECT TABLE_NAME AS table_name, UPDATE_TIME AS update_time FROM information_schema.TABLES "
+                 f"WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})")
+        results = self.mysql_source.execute_query(query, ['chain_project'] + list(tables))
+        return {row['table_name']: row['update_time'] for row in results}
+
     def get_projects_by_token(self, token_names):
         """根据代币名称获取项目信息
         
@@ -362,31 +431,39 @@ class ChainProjectManager:
 
         return grouped
 
-    def get_project_github_commits(self, project_ids):
+    def get_project_github_commits(self, project_ids, limit=5):
         """
-        获取project项目的github仓库的提交记录
+        获取project项目的github仓库的提交记录，每个项目最近 limit 条
+        每个项目一个按 commit_date 倒序、LIMIT limit 的子查询，用 UNION ALL 合并，
+        结果只取决于项目本身，与同批查询的其他项目无关
         :param project_ids:
-        :return: dict: 以项目id为键的github提交记录信息
+        :param limit: 每个项目返回的提交记录数量
+        :return: dict: 以项目id为键的github提交记录信息，每个项目按时间倒序
         """
         if not project_ids:
             return {}
-        placeholders = ", ".join(["%s"] * len(project_ids))
-        query = f"SELECT * FROM github_commits WHERE project_id IN ({placeholders}) ORDER BY commit_date DESC LIMIT 5"
-        results = self.mysql_source.execute_query(query, project_ids)
         grouped = {}
-        for item in results:
-            project_id = item['project_id']
-            if project_id not in grouped:
-                grouped[project_id] = []
-            grouped[project_id].append(item)
-
+        # 分批拼接子查询，避免单条语句过长
+        for start in range(0, len(project_ids), 100):
+            batch = project_ids[start:start + 100]
+            query = " UNION ALL ".join(
+                ["(SELECT * FROM github_commits WHERE project_id = %s ORDER BY commit_date DESC LIMIT %s)"] * len(batch)
+            )
+            params = [value for project_id in batch for value in (project_id, limit)]
+            for item in self.mysql_source.execute_query(query, params):
+                grouped.setdefault(item['project_id'], []).append(item)
+
+        # UNION ALL 不保证子查询之间及子查询内的顺序，分组后再排序
+        for commits in grouped.values():
+            commits.sort(key=lambda item: (item['commit_date'] is not None, item['commit_date']), reverse=True)
         return grouped
 
-    def get_project_snapshots(self, project_ids):
-        """获取项目快照信息
+    def get_project_snapshots(self, project_ids, limit=5):
+        """获取项目快照信息，每个 space 最近结束的 limit 条提案
         
         Args:
             project_ids (list): 项目ID列表 (假设这些ID对应MongoDB中的space.name)
+            limit (int, optional): 每个 space 返回的提案数量
             
         Returns:
             dict: 以项目ID为键的快照信息字典
@@ -423,16 +500,18 @@ class ChainProjectManager:
                 'state': 'closed'
             }
 
-            result_cursor = collection.find(query).sort([('end', -1)]).limit(5)
-            results = list(result_cursor)
+            # 按 space 分组后各取最近的 limit 条，结果与同批查询的其他 space 无关
+            pipeline = [
+                {'$match': query},
+                {'$sort': {'end': -1}},
+                {'$group': {'_id': '$space.name', 'items': {'$push': '$$ROOT'}}},
+                {'$project': {'items': {'$slice': ['$items', limit]}}}
+            ]
 
             grouped = {}
-            for item in results:
-                space_name = item.get('space', {}).get('name')
-                if space_name:
-                    if space_name not in grouped:
-                        grouped[space_name] = []
-                    grouped[space_name].append(item)
+            for group in collection.aggregate(pipeline):
+                if group['_id']:
+                    grouped[group['_id']] = group['items']
             return grouped
 
         except Exception as e:
@@ -466,38 +545,79 @@ class ChainProjectManager:
 
         return grouped
         
-    def get_recent_tweets(self, twitter_usernames, limit=5):
+    def get_recent_tweets(self, twitter_usernames, limit=5, since=None, days=5):
         """获取Twitter用户最近的推文
         
+        每个用户一个按 tweet_date 倒序、LIMIT limit 的子查询，用 UNION ALL 合并，
+        配合 (twitter_username, tweet_date) 索引每个用户只读取 limit 行，
+        传输的行数不超过 用户数 × limit。最近 days 天的截止时间由数据库按 NOW() 计算，
+        与 tweet_date 使用同一时钟。
+        
         Args:
             twitter_usernames (list): Twitter用户名列表
             limit (int, optional): 每个用户返回的推文数量限制
+            since (dict, optional): {用户名: 时间}，只返回不早于该时间的推文，用于增量刷新
+            days (int, optional): 只获取最近多少天内的推文
             
         Returns:
-            dict: 以Twitter用户名为键的推文列表字典
+            dict: 以Twitter用户名为键的推文列表字典，每个用户的推文按时间倒序
         """
         if not twitter_usernames:
             return {}
-        
-        # 批量查询所有用户的推文，只获取最近5天内的推文
-        placeholders = ", ".join(["%s"] * len(twitter_usernames))
-        query = f"SELECT * FROM tweets WHERE twitter_username IN ({placeholders}) AND tweet_date > FROM_UNIXTIME(UNIX_TIMESTAMP() - (5*24*60*60)) ORDER BY twitter_username, tweet_date DESC"
-        
-        results = self.mysql_source.execute_query(query, twitter_usernames)
-        
-        # 在应用层面按用户名分组并限制每个用户的推文数量
+
+        since = since or {}
         grouped = {}
-        for item in results:
-            username = item['twitter_username']
-            if username not in grouped:
-                grouped[username] = []
-            
-            # 只添加不超过limit数量的推文
-            if len(grouped[username]) < limit:
-                grouped[username].append(item)
-                
+        # 分批拼接子查询，避免单条语句过长
+        for start in range(0, len(twitter_usernames), 100):
+            parts = []
+            params = []
+            for username in twitter_usernames[start:start + 100]:
+                if since.get(username):
+                    parts.append("(SELECT * FROM tweets WHERE twitter_username = %s AND tweet_date >= %s "
+                                 "AND tweet_date > NOW() - INTERVAL %s DAY ORDER BY tweet_date DESC LIMIT %s)")
+                    params.extend([username, since[username], days, limit])
+                else:
+                    parts.append("(SELECT * FROM tweets WHERE twitter_username = %s "
+                                 "AND tweet_date > NOW() - INTERVAL %s DAY ORDER BY tweet_date DESC LIMIT %s)")
+                    params.extend([username, days, limit])
+            results = self.mysql_source.execute_query(" UNION ALL ".join(parts), params)
+            for item in results:
+                grouped.setdefault(item['twitter_username'], []).append(item)
+
+        # UNION ALL 不保证子查询之间及子查询内的顺序，分组后再排序
+        for tweets in grouped.values():
+            tweets.sort(key=lambda item: item['tweet_date'], reverse=True)
         return grouped
 
+    def get_database_now(self):
+        """返回数据库的当前时间，与 tweet_date 等由数据库写入的时间比较时使用"""
+        rows = self.mysql_source.execute_query("SELECT NOW() AS now")
+        return rows[0]['now']
+
+    def ensure_recent_tweets_index(self):
+        """确保tweets表有以 (twitter_username, tweet_date) 开头的索引，没有时创建
+
+        Returns:
+            bool: 是否新建了索引
+        """
+        rows = self.mysql_source.execute_query(
+            "SELECT INDEX_NAME AS index_name, SEQ_IN_INDEX AS seq, COLUMN_NAME AS column_name "
+            "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'tweets' "
+            "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+            ['chain_project']
+        )
+        indexes = {}
+        for row in rows:
+            indexes.setdefault(row['index_name'], []).append(row['column_name'].lower())
+        if any(columns[:2] == ['twitter_username', 'tweet_date'] for columns in indexes.values()):
+            return False
+
+        logger.info("tweets表缺少 (twitter_username, tweet_date) 索引，开始创建")
+        self.mysql_source.execute_update(
+            "CREATE INDEX idx_tweets_username_date ON tweets (twitter_username, tweet_date)"
+        )
+        return True
+
     def get_project_info_by_twitter_name(self, twitter_names):
         """根据twitter 用户名获取projects_social_links表中的信息
 
@@ -591,6 +711,55 @@ class ChainProjectManager:
         results = self.mysql_source.execute_query(query, [url])
         
         return results[0] if results else None
+
+    def _get_by_urls(self, table, urls):
+        if not urls:
+            return {}
+
+        placeholders = ", ".join(["%s"] * len(urls))
+        query = f"SELECT * FROM {table} WHERE url IN ({placeholders})"
+
+        results = self.mysql_source.execute_query(query, urls)
+
+        # 同一URL只保留第一条，与按单个URL查询的 LIMIT 1 一致
+        grouped = {}
+        for item in results:
+            grouped.setdefault(item['url'], item)
+
+        return grouped
+
+    def get_investors_by_urls(self, urls):
+        """根据URL批量获取投资者信息
+
+        Args:
+            urls (list): 投资者URL列表
+
+        Returns:
+            dict: 以URL为键的投资者信息字典
+        """
+        return self._get_by_urls('investors', urls)
+
+    def get_people_by_urls(self, urls):
+        """根据URL批量获取人员信息
+
+        Args:
+            urls (list): 人员URL列表
+
+        Returns:
+            dict: 以URL为键的人员信息字典
+        """
+        return self._get_by_urls('people', urls)
+
+    def get_projects_by_urls(self, urls):
+        """根据URL批量获取项目信息
+
+        Args:
+            urls (list): 项目URL列表
+
+        Returns:
+            dict: 以URL为键的项目信息字典
+        """
+        return self._get_by_urls('projects', urls)
         
     def get_investor_social_links(self, investor_ids):
         """获取投资者社交链接信息
@@ -875,6 +1044,211 @@ class ChainProjectManager:
         return self.mysql_source.execute_query(query, params)
 
 
+class ChainProjectLoader:
+    """请求级批量加载器
+
+    同一次 get_all_info 内按查询类型缓存结果：load_many 只对尚未加载过的键发起一次
+    IN (...) 查询，查不到的键也会记住，之后同类型的查找全部命中缓存。先收集所有项目的键
+    统一加载，再逐个项目组装，查询次数与项目、成员、融资链接的数量无关。
+    """
+
+    def __init__(self, manager, tweet_limit=5):
+        """初始化加载器
+
+        Args:
+            manager (ChainProjectManager): 数据库管理器实例
+            tweet_limit (int, optional): 每个Twitter用户加载的最近推文数量
+        """
+        self.manager = manager
+        self.tweet_limit = tweet_limit
+        self._fetchers = {
+            'people_by_name': manager.get_people_info_by_names,
+            'people_by_url': manager.get_people_by_urls,
+            'investor_by_url': manager.get_investors_by_urls,
+            'project_by_url': manager.get_projects_by_urls,
+            'people_social_links': manager.get_people_social_link,
+            'investor_social_links': manager.get_investor_social_links,
+            'project_social_links': manager.get_project_social_links,
+            'recent_tweets': self._load_recent_tweets
+        }
+        self._cache = {kind: {} for kind in self._fetchers}
+        self.stats = {
+            'queries': 0,
+            'keys': 0,
+            'hits': 0
+        }
+
+    def _load_recent_tweets(self, usernames):
+        buffer = getattr(self.manager, 'tweet_buffer', None)
+        if buffer and buffer.limit >= self.tweet_limit:
+            return {
+                username: tweets[:self.tweet_limit]
+                for username, tweets in buffer.get_many(usernames).items()
+            }
+        return self.manager.get_recent_tweets(usernames, self.tweet_limit)
+
+    def prime(self, kind, keys, values):
+        """写入已经查询过的结果，keys 中没有出现在 values 里的键记为不存在"""
+        cache = self._cache[kind]
+        for key in keys:
+            cache[key] = values.get(key)
+
+    def load_many(self, kind, keys):
+        """批量加载同一类型的多个键
+
+        Args:
+            kind (str): 查询类型
+            keys (list): 键列表
+
+        Returns:
+            dict: 以键为键的查询结果，不存在的键不包含在内
+        """
+        cache = self._cache[kind]
+        missing = list(dict.fromkeys(key for key in keys if key and key not in cache))
+        self.stats['hits'] += sum(1 for key in keys if key in cache)
+        if missing:
+            results = self._fetchers[kind](missing) or {}
+            self.stats['queries'] += 1
+            self.stats['keys'] += len(missing)
+            for key in missing:
+                cache[key] = results.get(key)
+        return {key: cache[key] for key in keys if cache.get(key) is not None}
+
+
+class RecentTweetsBuffer:
+    """各Twitter用户最近推文的内存缓冲区
+
+    每个用户保留最近 limit 条推文（以推文主键为键、按时间倒序的字典）。首次读取的用户按
+    get_recent_tweets 加载最近 limit 条；已加载的用户超过 refresh_seconds 后只查询
+    不早于已知最新推文的新推文并按主键合并，同一推文再次查到时以新的行为准，
+    超出 days 天的推文在读取时丢弃。
+    丢弃用的截止时间按每次查询时记录的数据库时钟偏差换算，与 SQL 中的 NOW() 一致。
+    缓冲的用户数超过 max_users 时淘汰最久未读取的用户。
+    """
+
+    def __init__(self, manager, limit=5, refresh_seconds=60, max_users=5000, days=5):
+        """初始化缓冲区
+
+        Args:
+            manager (ChainProjectManager): 数据库管理器实例
+            limit (int, optional): 每个用户保留的推文数量
+            refresh_seconds (float, optional): 已加载的用户增量刷新的间隔秒数
+            max_users (int, optional): 缓冲的最大用户数
+            days (int, optional): 只保留最近多少天内的推文
+        """
+        self.manager = manager
+        self.limit = limit
+        self.refresh_seconds = refresh_seconds
+        self.max_users = max_users
+        self.days = days
+        # 用户名 -> [{推文主键: 推文}（按时间倒序）, 上次刷新时间]
+        self._users = OrderedDict()
+        # 数据库时间减去本地时间，首次查询前没有缓冲的推文，不需要换算
+        self._clock_offset = timedelta(0)
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'loads': 0,
+            'refreshes': 0,
+            'rows': 0
+        }
+
+    @staticmethod
+    def _tweet_key(tweet):
+        """推文的主键，没有 twitter_id / id 字段时退回到 (用户名, 发布时间)"""
+        for field in ('twitter_id', 'id'):
+            if tweet.get(field) is not None:
+                return tweet[field]
+        return tweet.get('twitter_username'), tweet['tweet_date']
+
+    def get_many(self, usernames):
+        """返回各用户最近的推文，必要时先加载或增量刷新
+
+        Args:
+            usernames (list): Twitter用户名列表
+
+        Returns:
+            dict: 以用户名为键、按时间倒序的推文列表，没有推文的用户不包含在内
+        """
+        usernames = list(dict.fromkeys(username for username in usernames if username))
+        now = time.monotonic()
+        with self._lock:
+            new_users = [username for username in usernames if username not in self._users]
+            stale = {
+                username: next(iter(self._users[username][0].values()))['tweet_date'] if self._users[username][0] else None
+                for username in usernames
+                if username in self._users and now - self._users[username][1] >= self.refresh_seconds
+            }
+            self.stats['hits'] += len(usernames) - len(new_users) - len(stale)
+
+        # 没有缓冲推文的用户按首次加载处理
+        load_users = new_users + [username for username, newest in stale.items() if newest is None]
+        refresh = {username: newest for username, newest in stale.items() if newest is not None}
+        fetched = {}
+        clock_offset = None
+        if load_users or refresh:
+            clock_offset = self.manager.get_database_now() - datetime.now()
+        if load_users:
+            fetched.update(self.manager.get_recent_tweets(load_users, self.limit, days=self.days))
+        if refresh:
+            fetched.update(self.manager.get_recent_tweets(list(refresh), self.limit, since=refresh, days=self.days))
+
+        result = {}
+        with self._lock:
+            self.stats['loads'] += len(load_users)
+            self.stats['refreshes'] += len(refresh)
+            self.stats['rows'] += sum(len(tweets) for tweets in fetched.values())
+            if clock_offset is not None:
+                self._clock_offset = clock_offset
+            cutoff = datetime.now() + self._clock_offset - timedelta(days=self.days)
+            for username in load_users + list(refresh):
+                entry = self._users.get(username)
+                if entry is None or username in load_users:
+                    entry = self._users[username] = [{}, now]
+                entry[1] = now
+                merged = dict(entry[0])
+                merged.update((self._tweet_key(tweet), tweet) for tweet in fetched.get(username, []))
+                newest = sorted(merged.items(), key=lambda item: item[1]['tweet_date'], reverse=True)
+                entry[0] = dict(newest[:self.limit])
+            for username in usernames:
+                entry = self._users.get(username)
+                if entry is None:
+                    continue
+                self._users.move_to_end(username)
+                tweets = [tweet for tweet in entry[0].values() if tweet['tweet_date'] > cutoff]
+                if tweets:
+                    result[username] = tweets
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return result
+
+    def invalidate(self, usernames=None):
+        """丢弃指定用户（默认全部用户）的缓冲推文，下次读取时重新加载"""
+        with self._lock:
+            if usernames is None:
+                self._users.clear()
+            else:
+                for username in usernames:
+                    self._users.pop(username, None)
+
+    def metrics(self):
+        """返回缓冲区统计"""
+        with self._lock:
+            return {'users': len(self._users), **self.stats}
+
+
+def configure_dossier_sources(dossier_cache=None, dossier_store=None):
+    """设置进程内默认的项目信息缓存和物化表，之后构造的 ChainProjectManager 未显式传入时使用
+
+    Args:
+        dossier_cache (DossierCache, optional): 项目信息缓存，为None时不缓存
+        dossier_store (DossierStore, optional): 项目信息物化表，为None时不读取物化表
+    """
+    global _default_dossier_cache, _default_dossier_store
+    _default_dossier_cache = dossier_cache
+    _default_dossier_store = dossier_store
+
+
 def extract_twitter_username(link):
     """从Twitter链接中提取用户名
     
@@ -894,33 +1268,68 @@ def extract_twitter_username(link):
     return username
 
 
-def process_fundraising_links(fundraising_data, manager):
-    """处理融资数据中的链接，获取对应的Twitter链接
-    
+def _get_section_executor(max_workers):
+    """返回并发查询各信息板块共用的线程池，线程数与连接池大小一致"""
+    global _section_executor
+    with _section_executor_lock:
+        if _section_executor is None:
+            _section_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chain_project')
+        return _section_executor
+
+
+def fetch_sections(sections, deadline, max_workers=5):
+    """并发执行互不依赖的查询，在截止时间前未完成或出错的板块记为缺失
+
+    Args:
+        sections (dict): 板块名称为键，(查询函数, 参数元组) 为值的字典
+        deadline (float): 截止时间（time.monotonic() 时间点）
+        max_workers (int, optional): 线程池大小，首次调用时生效
+
+    Returns:
+        tuple: (板块名称为键的查询结果字典, 缺失的板块名称列表)
+    """
+    executor = _get_section_executor(max_workers)
+    futures = {executor.submit(func, *args): name for name, (func, args) in sections.items()}
+    done, _ = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+
+    results = {}
+    missing = []
+    for future, name in futures.items():
+        if future not in done:
+            # 已开始的查询无法中断，完成后结果被丢弃
+            future.cancel()
+            missing.append(name)
+            logger.warning(f"查询 {name} 超过截止时间，结果缺失")
+        elif future.exception() is not None:
+            missing.append(name)
+            logger.error(f"查询 {name} 失败: {future.exception()!r}")
+        else:
+            results[name] = future.result()
+    return results, missing
+
+
+def collect_fundraising_links(fundraising_data):
+    """按链接类型收集融资数据中的链接
+
     Args:
         fundraising_data (dict): 项目ID为键的融资信息字典
-        manager (ChainProjectManager): 数据库管理器实例
-        
+
     Returns:
-        dict: 名称为键，Twitter链接为值的字典
+        tuple: (投资者链接列表, 人员链接列表, 项目链接列表, 链接到名称的字典)
     """
-    if not fundraising_data:
-        return {}
-    
-    # 收集所有链接
     investor_links = []
     people_links = []
     project_links = []
     name_link_map = {}
-    
-    for project_id, items in fundraising_data.items():
+
+    for project_id, items in (fundraising_data or {}).items():
         for item in items:
             if 'link' not in item or not item['link']:
                 continue
-                
+
             link = item['link']
             name = item.get('name', '')
-            
+
             # 根据链接类型分类
             if '/Investors/detail/' in link:
                 investor_links.append(link)
@@ -931,101 +1340,79 @@ def process_fundraising_links(fundraising_data, manager):
             elif '/Projects/detail/' in link:
                 project_links.append(link)
                 name_link_map[link] = name
-    # 获取投资者Twitter链接
-    investor_twitter_links = {}
-    if investor_links:
-        investor_ids = []
-        investor_url_map = {}
-        
-        # 从investors表获取investor_id
-        for link in investor_links:
-            result = manager.get_investor_by_url(link)
-            if result and 'investor_id' in result:
-                investor_id = result['investor_id']
-                investor_ids.append(investor_id)
-                investor_url_map[investor_id] = link
-
-        # 获取Twitter链接
-        if investor_ids:
-            investor_social_links = manager.get_investor_social_links(investor_ids)
-            for investor_id, links in investor_social_links.items():
-                for link_info in links:
-                    if link_info.get('text') == 'X' and link_info.get('link'):
-                        original_link = investor_url_map.get(investor_id)
-                        if original_link:
-                            name = name_link_map.get(original_link, '')
-                            investor_twitter_links[name] = link_info['link']
-    
-    # 获取人员Twitter链接
-    people_twitter_links = {}
-    if people_links:
-        people_ids = []
-        people_url_map = {}
-        
-        # 从people表获取people_id
-        for link in people_links:
-            result = manager.get_people_by_url(link)
-            if result and 'people_id' in result:
-                people_id = result['people_id']
-                people_ids.append(people_id)
-                people_url_map[people_id] = link
-        
-        # 获取Twitter链接
-        if people_ids:
-            people_social_links = manager.get_people_social_link(people_ids)
-            for people_id, links in people_social_links.items():
-                for link_info in links:
-                    if link_info.get('text') == 'X' and link_info.get('link'):
-                        original_link = people_url_map.get(people_id)
-                        if original_link:
-                            name = name_link_map.get(original_link, '')
-                            people_twitter_links[name] = link_info['link']
+    return investor_links, people_links, project_links, name_link_map
+
+
+def _twitter_links_by_url(loader, links, url_kind, id_field, social_kind, name_link_map):
+    """通过URL找到实体ID，再从实体的社交链接中取出Twitter链接"""
+    if not links:
+        return {}
+
+    # 从URL对应的表获取实体ID
+    url_map = {}
+    rows = loader.load_many(url_kind, links)
+    for link in links:
+        result = rows.get(link)
+        if result and id_field in result:
+            url_map[result[id_field]] = link
+
+    # 获取Twitter链接
+    twitter_links = {}
+    for entity_id, social_links in loader.load_many(social_kind, list(url_map)).items():
+        for link_info in social_links:
+            if link_info.get('text') == 'X' and link_info.get('link'):
+                original_link = url_map.get(entity_id)
+                if original_link:
+                    name = name_link_map.get(original_link, '')
+                    twitter_links[name] = link_info['link']
+    return twitter_links
+
+
+def process_fundraising_links(fundraising_data, manager, loader=None):
+    """处理融资数据中的链接，获取对应的Twitter链接
     
-    # 获取项目Twitter链接
-    project_twitter_links = {}
-    if project_links:
-        project_ids = []
-        project_url_map = {}
-        
-        # 从projects表获取project_id
-        for link in project_links:
-            result = manager.get_project_by_url(link)
-            if result and 'project_id' in result:
-                project_id = result['project_id']
-                project_ids.append(project_id)
-                project_url_map[project_id] = link
+    Args:
+        fundraising_data (dict): 项目ID为键的融资信息字典
+        manager (ChainProjectManager): 数据库管理器实例
+        loader (ChainProjectLoader, optional): 批量加载器，多次调用共享时已加载的数据不再查询
         
-        # 获取Twitter链接
-        if project_ids:
-            project_social_links = manager.get_project_social_links(project_ids)
-            for project_id, links in project_social_links.items():
-                for link_info in links:
-                    if link_info.get('text') == 'X' and link_info.get('link'):
-                        original_link = project_url_map.get(project_id)
-                        if original_link:
-                            name = name_link_map.get(original_link, '')
-                            project_twitter_links[name] = link_info['link']
-    
+    Returns:
+        dict: 名称为键，Twitter链接为值的字典
+    """
+    if not fundraising_data:
+        return {}
+    loader = loader or ChainProjectLoader(manager)
+
+    investor_links, people_links, project_links, name_link_map = collect_fundraising_links(fundraising_data)
+
     # 合并所有Twitter链接
     twitter_links = {}
-    twitter_links.update(investor_twitter_links)
-    twitter_links.update(people_twitter_links)
-    twitter_links.update(project_twitter_links)
+    twitter_links.update(_twitter_links_by_url(
+        loader, investor_links, 'investor_by_url', 'investor_id', 'investor_social_links', name_link_map
+    ))
+    twitter_links.update(_twitter_links_by_url(
+        loader, people_links, 'people_by_url', 'people_id', 'people_social_links', name_link_map
+    ))
+    twitter_links.update(_twitter_links_by_url(
+        loader, project_links, 'project_by_url', 'project_id', 'project_social_links', name_link_map
+    ))
     return twitter_links
 
 
-def process_team_members(team_members, manager):
+def process_team_members(team_members, manager, loader=None):
     """处理团队成员信息，获取对应的Twitter链接
     
     Args:
         team_members (dict): 项目ID为键的团队成员信息字典
         manager (ChainProjectManager): 数据库管理器实例
+        loader (ChainProjectLoader, optional): 批量加载器，多次调用共享时已加载的数据不再查询
         
     Returns:
         dict: 名称为键，Twitter链接为值的字典
     """
     if not team_members:
         return {}
+    loader = loader or ChainProjectLoader(manager)
     
     # 收集所有团队成员名称
     member_names = []
@@ -1033,39 +1420,33 @@ def process_team_members(team_members, manager):
         for member in members:
             if 'name' in member and member['name']:
                 member_names.append(member['name'])
-    people_info = manager.get_people_info_by_names(member_names)
-    people_ids = []
+    people_info = loader.load_many('people_by_name', member_names)
+    # 将people_id映射回名称
+    people_id_name_map = {}
     for name, info in people_info.items():
         if 'people_id' in info:
-            people_ids.append(info['people_id'])
-    # 获取社交链接信息
+            people_id_name_map[info['people_id']] = name
+
+    # 提取Twitter链接
     twitter_links = {}
-    if people_ids:
-        people_social_links = manager.get_people_social_link(people_ids)
-        # 将people_id映射回名称
-        people_id_name_map = {}
-        for name, info in people_info.items():
-            if 'people_id' in info:
-                people_id_name_map[info['people_id']] = name
-        
-        # 提取Twitter链接
-        for people_id, links in people_social_links.items():
-            for link_info in links:
-                if link_info.get('text') == 'X' and link_info.get('link'):
-                    name = people_id_name_map.get(people_id, '')
-                    if name:
-                        twitter_links[name] = link_info['link']
+    for people_id, links in loader.load_many('people_social_links', list(people_id_name_map)).items():
+        for link_info in links:
+            if link_info.get('text') == 'X' and link_info.get('link'):
+                name = people_id_name_map.get(people_id, '')
+                if name:
+                    twitter_links[name] = link_info['link']
 
     return twitter_links
 
 
-def get_recent_tweets(twitter_usernames, manager, limit=5):
+def get_recent_tweets(twitter_usernames, manager, limit=5, loader=None):
     """获取最近的推文
     
     Args:
         twitter_usernames (dict): 名称为键，Twitter链接为值的字典
         manager (ChainProjectManager): 数据库管理器实例
-        limit (int, optional): 每个用户返回的推文数量限制
+        limit (int, optional): 每个用户返回的推文数量限制，使用 loader 时以 loader.tweet_limit 为准
+        loader (ChainProjectLoader, optional): 批量加载器
         
     Returns:
         dict: 名称为键，推文列表为值的字典
@@ -1083,7 +1464,10 @@ def get_recent_tweets(twitter_usernames, manager, limit=5):
             usernames.append(username)
             username_name_map[username] = name
 
-    tweets_data = manager.get_recent_tweets(usernames, limit)
+    if loader:
+        tweets_data = loader.load_many('recent_tweets', usernames)
+    else:
+        tweets_data = manager.get_recent_tweets(usernames, limit)
 
     result = {}
     for username, tweets in tweets_data.items():
@@ -1093,23 +1477,274 @@ def get_recent_tweets(twitter_usernames, manager, limit=5):
     return result
 
 
-def get_all_info(extracted_record, mysql_config, existing_manager=None, mongo_config=None):
+def fetch_dossier_sections(manager, all_projects, need, cached, deadline, max_workers=5, loader=None,
+                           extra_queries=None):
+    """查询项目信息中需要更新的板块，并与已有的板块合并
+
+    get_all_info 与项目信息物化表的构建共用该流程：need 中列出的项目按板块查询，
+    其余项目的板块直接取 cached 中的数据。各板块的查询结果只取决于项目本身（快照按项目自己的
+    project_name 查询，提交记录、推文按项目或用户分别取最近几条），可以按项目缓存和物化。
+
+    Args:
+        manager (ChainProjectManager): 链上项目数据管理器
+        all_projects (dict): {项目ID: 项目基本信息}
+        need (dict): {板块名称: 需要查询的项目ID列表}，需包含 DOSSIER_SECTIONS 中的全部板块；
+            可包含 twitter_links（项目相关人员、投资方的Twitter链接，由物化表保存），
+            cached 中有 twitter_links 的项目计算最近推文时不再解析团队成员和融资链接
+        cached (dict): {项目ID: {板块名称: 数据}}，不在 need 中的板块从这里读取
+        deadline (float): time.monotonic() 表示的截止时间
+        max_workers (int, optional): 并发查询的线程数
+        loader (ChainProjectLoader, optional): 批量加载器，默认新建
+        extra_queries (dict, optional): 与第一轮查询一起并发执行的其他查询 {名称: (函数, 参数)}
+
+    Returns:
+        tuple: (values, missing_sections, extra)，values 为 {板块名称: {项目ID: 数据}}，
+            missing_sections 为超时或出错的查询，extra 为 extra_queries 的结果
+    """
+    if loader is None:
+        loader = ChainProjectLoader(manager)
+    project_ids = list(all_projects)
+
+    # 并发获取各个关联表的数据
+    section_queries = {
+        section: (func, (need[section],))
+        for section, func in (
+            ('ecosystems', manager.get_project_ecosystems),
+            ('fundraising', manager.get_project_fundraising),
+            ('fundraising_rounds', manager.get_project_fundraising_rounds),
+            ('investments', manager.get_project_investments),
+            ('social_links', manager.get_project_social_links),
+            ('subsidiary_orgs', manager.get_project_subsidiary_orgs),
+            ('tags', manager.get_project_tags),
+            ('team_members', manager.get_project_team_members),
+            ('token_contracts', manager.get_project_token_contracts),
+            ('token_unlock_events', manager.get_project_token_unlock_events),
+            # 根据project_id字段获取github提交记录
+            ('github_commit_msg', manager.get_project_github_commits),
+            # 获取活跃团队成员信息（过滤掉is_former为1的成员）
+            ('active_team_members', manager.get_active_team_members)
+        )
+        if need[section]
+    }
+    if need['snapshots']:
+        snapshot_names = list(dict.fromkeys(
+            all_projects[pid].get('project_name', '') for pid in need['snapshots']
+        ))
+        section_queries['snapshots'] = (manager.get_project_snapshots, (snapshot_names,))
+    section_queries.update(extra_queries or {})
+    sections, missing_sections = fetch_sections(section_queries, deadline, max_workers)
+
+    # 合并缓存与本次查询的结果，values[板块][项目ID]
+    values = {}
+    for section in DOSSIER_SECTIONS:
+        if section in DERIVED_SECTIONS:
+            continue
+        fetched = sections.get(section, {})
+        per_project = {}
+        for pid in project_ids:
+            if section in cached.get(pid, {}):
+                per_project[pid] = cached[pid][section]
+            elif section == 'snapshots':
+                # 快照以项目名称为键
+                per_project[pid] = fetched.get(all_projects[pid].get('project_name', ''), [])
+            else:
+                per_project[pid] = fetched.get(pid, [])
+        values[section] = per_project
+
+    project_fundraising = values['fundraising']
+    active_team_members = values['active_team_members']
+    if 'social_links' in sections:
+        loader.prime('project_social_links', need['social_links'], sections['social_links'])
+
+    # 团队成员详情和最近推文由多张表推导，只为缓存中缺少这两个板块的项目计算
+    details_ids = need['team_members_details']
+    activity_ids = need['recent_activity']
+    # 项目相关人员、投资方的Twitter链接已物化时直接使用，只为缺少链接的项目解析团队成员和融资链接
+    link_ids = list(dict.fromkeys(
+        need.get('twitter_links', []) +
+        [pid for pid in activity_ids if 'twitter_links' not in cached.get(pid, {})]
+    ))
+
+    # 处理团队成员详细信息
+    all_people_names = []
+    project_people_map = {}
+
+    # 收集所有活跃团队成员的名称
+    for project_id in dict.fromkeys(details_ids + link_ids):
+        project_people_map[project_id] = []
+        for member in active_team_members.get(project_id, []):
+            if 'name' in member and member['name']:
+                all_people_names.append(member['name'])
+                project_people_map[project_id].append(member['name'])
+
+
+    all_people_names = list(set(all_people_names))
+
+    # 获取所有人员的基本信息
+    people_info = loader.load_many('people_by_name', all_people_names)
+
+    all_people_ids = []
+    for name, info in people_info.items():
+        if 'people_id' in info:
+            all_people_ids.append(info['people_id'])
+    # 教育、工作经历和投资记录只用于团队成员详情，最近推文只需要社交链接
+    detail_names = {name for project_id in details_ids for name in project_people_map[project_id]}
+    detail_people_ids = [
+        info['people_id'] for name, info in people_info.items() if name in detail_names and 'people_id' in info
+    ]
+
+    # 先解析所有项目融资数据中的链接，使融资链接中的人员与团队成员的社交链接合并为一次查询
+    investor_links, people_links, project_links, _ = collect_fundraising_links(
+        {project_id: project_fundraising.get(project_id, []) for project_id in link_ids}
+    )
+    linked_investor_ids = [
+        row['investor_id'] for row in loader.load_many('investor_by_url', investor_links).values()
+        if 'investor_id' in row
+    ]
+    linked_project_ids = [
+        row['project_id'] for row in loader.load_many('project_by_url', project_links).values()
+        if 'project_id' in row
+    ]
+    linked_people_ids = [
+        row['people_id'] for row in loader.load_many('people_by_url', people_links).values()
+        if 'people_id' in row
+    ]
+
+    # 并发获取人员相关的详细信息及融资链接实体的社交链接
+    people_sections, missing_people_sections = fetch_sections({
+        'people_education': (manager.get_people_education_experience, (detail_people_ids,)),
+        'people_social_links': (loader.load_many, ('people_social_links', all_people_ids + linked_people_ids)),
+        'people_work_experience': (manager.get_people_work_experience, (detail_people_ids,)),
+        'people_investments': (manager.get_people_investments_info, (detail_people_ids,)),
+        'investor_social_links': (loader.load_many, ('investor_social_links', linked_investor_ids)),
+        'linked_project_social_links': (loader.load_many, ('project_social_links', linked_project_ids))
+    }, deadline, max_workers)
+    missing_sections.extend(missing_people_sections)
+    for name, kind, keys in (
+        ('people_social_links', 'people_social_links', all_people_ids + linked_people_ids),
+        ('investor_social_links', 'investor_social_links', linked_investor_ids),
+        ('linked_project_social_links', 'project_social_links', linked_project_ids)
+    ):
+        if name in missing_people_sections:
+            # 缺失的社交链接记为空，逐个项目组装时不再单独查询
+            loader.prime(kind, keys, {})
+
+    people_education = people_sections.get('people_education', {})
+    people_social = people_sections.get('people_social_links', {})
+    people_work = people_sections.get('people_work_experience', {})
+    people_investments = people_sections.get('people_investments', {})
+
+    detailed_people_info = {}
+    for name, info in people_info.items():
+        people_id = info.get('people_id')
+        if people_id:
+            detailed_people_info[name] = {
+                'basic_info': info,
+                'education': people_education.get(people_id, []),
+                'social_links': people_social.get(people_id, []),
+                'work_experience': people_work.get(people_id, []),
+                'investments': people_investments.get(people_id, [])
+            }
+        else:
+            detailed_people_info[name] = {
+                'basic_info': info,
+                'education': [],
+                'social_links': [],
+                'work_experience': [],
+                'investments': []
+            }
+
+    # 处理每个项目团队成员和融资数据中的Twitter链接，所需数据均已在加载器中
+    project_twitter_links = {}
+    for project_id in link_ids:
+        team_twitter_links = process_team_members({
+            project_id: active_team_members.get(project_id, [])
+        }, manager, loader)
+        fundraising_twitter_links = process_fundraising_links({
+            project_id: project_fundraising.get(project_id, [])
+        }, manager, loader)
+
+        # 合并所有Twitter链接再获取推文
+        all_twitter_links = {}
+        all_twitter_links.update(team_twitter_links)
+        all_twitter_links.update(fundraising_twitter_links)
+        project_twitter_links[project_id] = all_twitter_links
+    values['twitter_links'] = dict(project_twitter_links)
+    for project_id in activity_ids:
+        if project_id not in project_twitter_links:
+            project_twitter_links[project_id] = cached[project_id]['twitter_links']
+
+    # 所有项目相关用户的最近推文一次查询，已超过截止时间时不再查询
+    usernames = [
+        username
+        for project_id in activity_ids
+        for username in map(extract_twitter_username, project_twitter_links[project_id].values()) if username
+    ]
+    if time.monotonic() < deadline:
+        loader.load_many('recent_tweets', usernames)
+    else:
+        loader.prime('recent_tweets', usernames, {})
+        missing_sections.append('recent_activity')
+
+    for project_id in details_ids:
+        # 获取该项目的所有活跃团队成员的详细信息
+        project_people_details = {}
+        for name in project_people_map.get(project_id, []):
+            if name in detailed_people_info:
+                project_people_details[name] = detailed_people_info[name]
+        values.setdefault('team_members_details', {})[project_id] = project_people_details
+    for project_id in activity_ids:
+        recent_tweets = {}
+        if project_twitter_links[project_id]:
+            recent_tweets = get_recent_tweets(project_twitter_links[project_id], manager, loader=loader)
+        values.setdefault('recent_activity', {})[project_id] = recent_tweets
+    for section in list(DERIVED_SECTIONS) + ['twitter_links']:
+        per_project = values.setdefault(section, {})
+        for project_id in project_ids:
+            if section in cached.get(project_id, {}) and project_id not in per_project:
+                per_project[project_id] = cached[project_id][section]
+
+    extra = {name: sections.get(name, {}) for name in extra_queries or {}}
+    return values, missing_sections, extra
+
+
+def get_all_info(extracted_record, mysql_config, existing_manager=None, mongo_config=None, deadline_seconds=None,
+                 dossier_cache=None, dossier_store=None, missing_sections=None):
     """获取所有相关信息
+
+    各关联表按所有项目的ID一次性查询；团队成员、融资链接和最近推文的查找通过
+    ChainProjectLoader 在所有项目间合并，每类查找只发起一次 IN (...) 查询，
+    总查询次数与项目、成员、融资链接的数量无关。互不依赖的关联表查询通过连接池并发执行，
+    整体受截止时间限制，超时或出错的板块以空值返回，并通过日志和 missing_sections 参数告知调用方，
+    返回的项目信息结构不变。
+    提供项目信息物化表时，先按主键读取后台预先构建的板块；提供项目信息缓存时，
+    各项目未过期的板块直接从缓存读取。只查询两者都没有的板块。
     
     Args:
         extracted_record (dict): 提取的记录信息
         mysql_config (dict): MySQL配置
         existing_manager (ChainProjectManager, optional): 现有的ChainProjectManager实例，如果提供则复用该实例
         mongo_config (dict, optional): MongoDB配置，用于获取项目快照信息
+        deadline_seconds (float, optional): 并发查询的整体截止秒数，默认取 mysql_config 的 enrich_deadline
+        dossier_cache (DossierCache, optional): 项目信息缓存，默认使用 existing_manager 的缓存
+        dossier_store (DossierStore, optional): 项目信息物化表，默认使用 existing_manager 的物化表
+        missing_sections (list, optional): 传入列表时，超时或出错而以空值返回的板块会追加到其中
         
     Returns:
         dict: 所有相关信息
     """
+    if deadline_seconds is None:
+        deadline_seconds = mysql_config.get('enrich_deadline', 15)
+    deadline = time.monotonic() + deadline_seconds
+    max_workers = mysql_config.get('pool_size', 5)
     # 检查是否提供了现有的ChainProjectManager实例
     if existing_manager and isinstance(existing_manager, ChainProjectManager):
         manager = existing_manager
     else:
         manager = ChainProjectManager(mysql_config, mongo_config)
+    loader = ChainProjectLoader(manager)
+    dossier_cache = dossier_cache or manager.dossier_cache
+    dossier_store = dossier_store or manager.dossier_store
 
     try:
         project_names = extracted_record.get('project', [])
@@ -1149,122 +1784,44 @@ def get_all_info(extracted_record, mysql_config, existing_manager=None, mongo_co
         # 获取所有项目ID
         project_ids = list(all_projects.keys())
 
-        # 获取各个关联表的数据
-        project_ecosystems = manager.get_project_ecosystems(project_ids)
-        project_fundraising = manager.get_project_fundraising(project_ids)
-        project_fundraising_rounds = manager.get_project_fundraising_rounds(project_ids)
-        project_investments = manager.get_project_investments(project_ids)
-        project_social_links = manager.get_project_social_links(project_ids)
-        project_subsidiary_orgs = manager.get_project_subsidiary_orgs(project_ids)
-        project_tags = manager.get_project_tags(project_ids)
-        project_team_members = manager.get_project_team_members(project_ids)
-        project_token_contracts = manager.get_project_token_contracts(project_ids)
-        project_token_unlock_events = manager.get_project_token_unlock_events(project_ids)
-        project_snapshots = manager.get_project_snapshots(project_names)
-
         investor_ids = list(all_vc.keys())
-        investors_investments = manager.get_investors_investments(investor_ids)
-        investors_fundraising = manager.get_investors_fundraising(investor_ids)
-
-        # 根据project_id字段获取github提交记录
-        project_github_commits = manager.get_project_github_commits(project_ids)
-
-        # 获取活跃团队成员信息（过滤掉is_former为1的成员）
-        active_team_members = manager.get_active_team_members(project_ids)
-
-        # 处理团队成员详细信息
-        all_people_names = []
-        project_people_map = {}
-
-        # 收集所有活跃团队成员的名称
-        for project_id, members in active_team_members.items():
-            project_people_map[project_id] = []
-            for member in members:
-                if 'name' in member and member['name']:
-                    all_people_names.append(member['name'])
-                    project_people_map[project_id].append(member['name'])
-                    
-       
-        all_people_names = list(set(all_people_names))
-
-        # 获取所有人员的基本信息
-        people_info = manager.get_people_info_by_names(all_people_names)
-
-        all_people_ids = []
-        for name, info in people_info.items():
-            if 'people_id' in info:
-                all_people_ids.append(info['people_id'])
-
-        # 获取人员相关的详细信息
-        people_education = manager.get_people_education_experience(all_people_ids)
-        people_social = manager.get_people_social_link(all_people_ids)
-        people_work = manager.get_people_work_experience(all_people_ids)
-        people_investments = manager.get_people_investments_info(all_people_ids)
-
-        detailed_people_info = {}
-        for name, info in people_info.items():
-            people_id = info.get('people_id')
-            if people_id:
-                detailed_people_info[name] = {
-                    'basic_info': info,
-                    'education': people_education.get(people_id, []),
-                    'social_links': people_social.get(people_id, []),
-                    'work_experience': people_work.get(people_id, []),
-                    'investments': people_investments.get(people_id, [])
-                }
-            else:
-                detailed_people_info[name] = {
-                    'basic_info': info,
-                    'education': [],
-                    'social_links': [],
-                    'work_experience': [],
-                    'investments': []
-                }
+
+        # 物化表和缓存中已有的板块不再查询，need 记录每个板块需要重新查询的项目
+        stored = dossier_store.get_many(project_ids) if dossier_store else {}
+        cached = dossier_cache.get_many(project_ids) if dossier_cache else {}
+        if stored:
+            cached = {pid: {**stored.get(pid, {}), **cached.get(pid, {})} for pid in project_ids}
+        need = {
+            section: [pid for pid in project_ids if section not in cached.get(pid, {})]
+            for section in DOSSIER_SECTIONS
+        }
+
+        extra_queries = {}
+        if investor_ids:
+            extra_queries['investors_investments'] = (manager.get_investors_investments, (investor_ids,))
+            extra_queries['investors_fundraising'] = (manager.get_investors_fundraising, (investor_ids,))
+        values, missing, extra = fetch_dossier_sections(
+            manager, all_projects, need, cached, deadline, max_workers, loader=loader,
+            extra_queries=extra_queries
+        )
+        investors_investments = extra.get('investors_investments', {})
+        investors_fundraising = extra.get('investors_fundraising', {})
+
+        # 只缓存本次查询得到的完整板块，依赖的查询缺失时不写入
+        if dossier_cache:
+            fresh = {}
+            for section, project_ids_needed in need.items():
+                if DERIVED_SECTIONS.get(section, {section}) & set(missing):
+                    continue
+                for project_id in project_ids_needed:
+                    fresh.setdefault(project_id, {})[section] = values[section][project_id]
+            dossier_cache.set_many(fresh)
 
         result = []
         for project_id, project in all_projects.items():
-            # 获取该项目的所有活跃团队成员的详细信息
-            project_people_details = {}
-            for name in project_people_map.get(project_id, []):
-                if name in detailed_people_info:
-                    project_people_details[name] = detailed_people_info[name]
-            project_name = project.get('project_name', '')
-            # 处理团队成员的Twitter链接
-            team_twitter_links = process_team_members({
-                project_id: active_team_members.get(project_id, [])
-            }, manager)
-            
-            # 处理融资数据中的Twitter链接
-            fundraising_twitter_links = process_fundraising_links({
-                project_id: project_fundraising.get(project_id, [])
-            }, manager)
-            
-            # 合并所有Twitter链接再获取推文
-            all_twitter_links = {}
-            all_twitter_links.update(team_twitter_links)
-            all_twitter_links.update(fundraising_twitter_links)
-
-            recent_tweets = {}
-            if all_twitter_links:
-                recent_tweets = get_recent_tweets(all_twitter_links, manager)
-            
             project_info = {
                 'basic_info': project,
-                'ecosystems': project_ecosystems.get(project_id, []),
-                'fundraising': project_fundraising.get(project_id, []),
-                'fundraising_rounds': project_fundraising_rounds.get(project_id, []),
-                'investments': project_investments.get(project_id, []),
-                'social_links': project_social_links.get(project_id, []),
-                'subsidiary_orgs': project_subsidiary_orgs.get(project_id, []),
-                'tags': project_tags.get(project_id, []),
-                'team_members': project_team_members.get(project_id, []),
-                'active_team_members': active_team_members.get(project_id, []),
-                'github_commit_msg': project_github_commits.get(project_id, []),
-                'team_members_details': project_people_details,
-                'token_contracts': project_token_contracts.get(project_id, []),
-                'token_unlock_events': project_token_unlock_events.get(project_id, []),
-                'snapshots': project_snapshots.get(project_name, []),  # 快照信息
-                'recent_activity': recent_tweets
+                **{section: values[section][project_id] for section in DOSSIER_SECTIONS}
             }
             result.append(project_info)
 
@@ -1274,6 +1831,11 @@ def get_all_info(extracted_record, mysql_config, existing_manager=None, mongo_co
         #         'investor_investments': investors_investments.get(vc_id, []),
         #         'investor_fundraising': investors_fundraising.get(vc_id, [])
         #     })
+        if missing:
+            logger.warning(f"项目信息部分板块超时或查询失败，以空值返回: {missing}")
+            if missing_sections is not None:
+                missing_sections.extend(missing)
+        logger.info(f"项目信息组装完成: {len(result)} 个项目，批量加载统计 {loader.stats}")
         return result
 
     finally:
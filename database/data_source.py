@@ -1,7 +1,11 @@
 import logging
+import threading
+import time
 import pymysql
 import pymongo
-from pymysql.cursors import DictCursor
+from collections import deque
+from contextlib import contextmanager
+from pymysql.cursors import DictCursor, SSDictCursor
 from abc import ABC, abstractmethod
 
 logger = logging.getLogger('data_source')
@@ -40,17 +44,32 @@ class DataSource(ABC):
 
 
 class MySQLSource(DataSource):
-    """MySQL数据源实现"""
+    """MySQL数据源实现
+
+    连接只在空闲超过 ping_interval 秒或上一次执行出错后才 ping 校验；会话级设置按物理连接
+    （服务端 thread_id）只应用一次，ping 自动重连产生新连接时才重新应用。
+    """
     
     def __init__(self, config):
         """初始化MySQL连接
         
         Args:
-            config (dict): MySQL连接配置
+            config (dict): MySQL连接配置，可选 ping_interval 指定空闲多少秒后才校验连接
         """
         super().__init__(config)
         self.conn = None
         self.current_database = config.get('database')
+        self.ping_interval = config.get('ping_interval', 30)
+        self._last_used = 0.0
+        self._session_thread_id = None
+        self.stats = {
+            'statements': 0,
+            'pings': 0,
+            'pings_skipped': 0,
+            'session_configs': 0,
+            'session_configs_skipped': 0,
+            'reconnects': 0
+        }
         self.connect()
     
     def connect(self):
@@ -71,9 +90,12 @@ class MySQLSource(DataSource):
                 connection_params['database'] = self.config['database']
                 self.current_database = self.config['database']
             
+            if self.conn:
+                self.stats['reconnects'] += 1
             self.conn = pymysql.connect(**connection_params)
             # 确保会话级设置（比如隔离级别、autocommit）正确
-            self._configure_session()
+            self._ensure_session()
+            self._last_used = time.monotonic()
             self.is_connected = True
             
             logger.info(f"成功连接到MySQL服务器: {self.config['host']}:{self.config['port']}")
@@ -89,7 +111,8 @@ class MySQLSource(DataSource):
         if self.conn:
             self.conn.close()
             self.is_connected = False
-            logger.info("MySQL连接已关闭")
+            self._session_thread_id = None
+            logger.info(f"MySQL连接已关闭，连接统计: {self.metrics()}")
     
     def is_alive(self):
         """检查连接是否有效
@@ -102,16 +125,55 @@ class MySQLSource(DataSource):
         
         try:
             self.conn.ping(reconnect=True)
-            # 连接可能在 ping 时自动重连，需重新应用会话设置
-            self._configure_session()
+            self.stats['pings'] += 1
+            # 连接可能在 ping 时自动重连，新的物理连接需重新应用会话设置
+            self._ensure_session()
+            self._last_used = time.monotonic()
             return True
         except Exception:
             return False
 
+    def _ensure_connection(self):
+        """执行语句前确保连接可用，仅在空闲超时或出错后才 ping"""
+        if not self.conn:
+            self.connect()
+            return
+        if time.monotonic() - self._last_used < self.ping_interval:
+            self.stats['pings_skipped'] += 1
+            self._ensure_session()
+            return
+        if not self.is_alive():
+            logger.warning("MySQL连接ping失败，尝试重连")
+            self.connect()
+
+    def _mark_used(self):
+        self.stats['statements'] += 1
+        self._last_used = time.monotonic()
+
+    def _mark_failed(self):
+        """语句执行出错后强制下次执行前校验连接"""
+        self._last_used = 0.0
+
+    def _ensure_session(self):
+        """按物理连接应用一次会话配置"""
+        try:
+            thread_id = self.conn.thread_id()
+        except Exception:
+            thread_id = None
+        if thread_id is not None and thread_id == self._session_thread_id:
+            self.stats['session_configs_skipped'] += 1
+            return
+        if self._session_thread_id is not None:
+            # 自动重连后的新连接回到配置中的默认数据库
+            self.current_database = self.config.get('database')
+        self._configure_session()
+        self._session_thread_id = thread_id
+
     def _configure_session(self):
         """为当前连接应用会话级配置。"""
         if not self.conn:
             return
+        self.stats['session_configs'] += 1
         try:
             try:
                 self.conn.autocommit(True)
@@ -124,6 +186,13 @@ class MySQLSource(DataSource):
                 pass
         except Exception:
             pass
+
+    def metrics(self):
+        """返回连接校验统计，saved_round_trips 为跳过的 ping 和会话设置往返次数"""
+        return {
+            **self.stats,
+            'saved_round_trips': self.stats['pings_skipped'] + self.stats['session_configs_skipped']
+        }
     
     def switch_database(self, database_name):
         """切换到指定的数据库
@@ -143,38 +212,55 @@ class MySQLSource(DataSource):
             return True
             
         try:
+            self._ensure_connection()
+            if database_name == self.current_database:
+                return True
             with self.conn.cursor() as cursor:
                 cursor.execute(f"USE {database_name}")
                 self.current_database = database_name
+                self._mark_used()
                 logger.info(f"已切换到数据库: {database_name}")
                 return True
         except Exception as e:
+            self._mark_failed()
             logger.error(f"切换到数据库 {database_name} 失败: {str(e)}")
             return False
     
-    def execute_query(self, query, params=None):
+    def execute_query(self, query, params=None, unbuffered=False, fetch_size=100):
         """执行查询并返回结果
         
         Args:
             query (str): SQL查询语句
             params (tuple, optional): 查询参数
+            unbuffered (bool, optional): 是否使用服务端（非缓冲）游标逐批读取，
+                避免驱动先把整个结果集缓存在客户端
+            fetch_size (int, optional): 非缓冲模式下每次从服务端读取的行数
             
         Returns:
             list: 查询结果列表
         """
         try:
-            # 确保连接可用并应用会话设置
-            try:
-                self.conn.ping(reconnect=True)
-            except Exception as ping_error:
-                logger.warning(f"MySQL连接ping失败，尝试重连: {ping_error}")
-                self.connect()
-            self._configure_session()
+            self._ensure_connection()
+
+            if unbuffered:
+                # 非缓冲游标读完之前连接不可复用，这里读完整个结果再返回
+                with self.conn.cursor(SSDictCursor) as cursor:
+                    cursor.execute(query, params or ())
+                    rows = []
+                    while True:
+                        chunk = cursor.fetchmany(fetch_size)
+                        if not chunk:
+                            self._mark_used()
+                            return rows
+                        rows.extend(chunk)
 
             with self.conn.cursor() as cursor:
                 cursor.execute(query, params or ())
-                return list(cursor.fetchall())
+                rows = list(cursor.fetchall())
+            self._mark_used()
+            return rows
         except Exception as e:
+            self._mark_failed()
             logger.error(f"查询执行失败: {str(e)}\nSQL: {query}\n参数: {params}")
             # 尝试重新连接
             if not self.is_alive():
@@ -191,20 +277,16 @@ class MySQLSource(DataSource):
             int: 总影响行数
         """
         try:
-            try:
-                self.conn.ping(reconnect=True)  # 确保连接可用
-            except Exception as ping_error:
-                logger.warning(f"MySQL连接ping失败，尝试重连: {ping_error}")
-                self.connect()
-            # 确保会话设置在自动重连后被重新应用
-            self._configure_session()
+            self._ensure_connection()
 
             with self.conn.cursor() as cursor:
                 cursor.executemany(query, params_list)
             self.conn.commit()
+            self._mark_used()
             return cursor.rowcount
 
         except Exception as e:
+            self._mark_failed()
             self.conn.rollback()
             logger.error(f"批量执行失败: {e!r}\nSQL: {query}\n参数数目: {len(params_list)}")
             if not self.is_alive():
@@ -212,6 +294,38 @@ class MySQLSource(DataSource):
             raise
 
     
+    def execute_transaction(self, statements):
+        """在同一个事务内依次执行多条批量语句，任意一条失败则全部回滚
+
+        Args:
+            statements (list | callable): (SQL语句, 参数记录列表) 列表，参数记录为空的语句会跳过；
+                也可以是接收游标、返回该列表的函数，在事务内先查询再决定写入的内容
+
+        Returns:
+            int: 总影响行数
+        """
+        try:
+            self._ensure_connection()
+            self.conn.begin()
+            affected_rows = 0
+            with self.conn.cursor() as cursor:
+                if callable(statements):
+                    statements = statements(cursor)
+                for query, params_list in statements:
+                    if params_list:
+                        affected_rows += cursor.executemany(query, params_list) or 0
+            self.conn.commit()
+            self._mark_used()
+            return affected_rows
+
+        except Exception as e:
+            self._mark_failed()
+            self.conn.rollback()
+            logger.error(f"事务执行失败: {e!r}\n语句数目: {'-' if callable(statements) else len(statements)}")
+            if not self.is_alive():
+                self.connect()
+            raise
+
     def execute_update(self, query, params=None):
         """执行更新操作
         
@@ -223,18 +337,15 @@ class MySQLSource(DataSource):
             int: 受影响的行数
         """
         try:
-            try:
-                self.conn.ping(reconnect=True)
-            except:
-                self.connect()
-            # 自动重连后重新应用会话设置
-            self._configure_session()
+            self._ensure_connection()
             with self.conn.cursor() as cursor:
 
                 affected_rows = cursor.execute(query, params or ())
                 self.conn.commit()
+                self._mark_used()
                 return affected_rows
         except Exception as e:
+            self._mark_failed()
             self.conn.rollback()
             logger.error(f"更新执行失败: {e!r}\nSQL: {query}\n参数: {params}")
             # 尝试重新连接
@@ -243,6 +354,198 @@ class MySQLSource(DataSource):
             raise
 
 
+class PoolTimeoutError(Exception):
+    """等待连接池空闲连接超时"""
+
+
+class MySQLPool(DataSource):
+    """MySQL连接池
+
+    每个池固定连接一个数据库（pinned database），最多持有 pool_size 个 MySQLSource。
+    执行语句时借出一个连接，执行完归还；归还时连接若被切换过数据库会切回固定数据库。
+    空闲连接按归还时间从旧到新排列，每次借出和归还时从最旧的一端关闭空闲超过 pool_max_idle 秒的连接，
+    借出时优先使用最近归还的连接。对外提供与 MySQLSource 相同的
+    execute_* 接口，线程安全。
+    """
+
+    def __init__(self, config):
+        """初始化连接池
+
+        Args:
+            config (dict): MySQL连接配置，可选 pool_size, pool_max_idle, pool_wait_timeout
+        """
+        super().__init__(config)
+        self.current_database = config.get('database')
+        self.pool_size = max(1, config.get('pool_size', 5))
+        self.max_idle = config.get('pool_max_idle', 300)
+        self.wait_timeout = config.get('pool_wait_timeout', 10)
+
+        self._idle = deque()
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'created': 0,
+            'retired': 0
+        }
+        self._retired_metrics = {}
+        self.connect()
+
+    def connect(self):
+        """预先建立一个连接，启动时即可发现配置错误"""
+        if self._created == 0:
+            self.checkin(self.checkout())
+        self._closed = False
+        self.is_connected = True
+
+    def close(self):
+        """关闭连接池中所有空闲连接，借出的连接归还时关闭"""
+        with self._cond:
+            self._closed = True
+            self.is_connected = False
+            while self._idle:
+                self._retire(self._idle.popleft()[0])
+            self._cond.notify_all()
+        logger.info(f"MySQL连接池已关闭，统计: {self.metrics()}")
+
+    def is_alive(self):
+        """连接池未关闭即视为可用，单个连接的校验由 MySQLSource 负责"""
+        return not self._closed
+
+    def _retire(self, source):
+        """关闭一个连接（需持有锁）"""
+        self._created -= 1
+        self.stats['retired'] += 1
+        for key, value in source.metrics().items():
+            self._retired_metrics[key] = self._retired_metrics.get(key, 0) + value
+        try:
+            source.close()
+        except Exception as e:
+            logger.warning(f"关闭MySQL连接失败: {str(e)}")
+
+    def _expire_idle(self, now):
+        """从最旧的一端关闭空闲超过 max_idle 秒的连接（需持有锁）"""
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            self._retire(self._idle.popleft()[0])
+
+    def checkout(self):
+        """借出一个连接
+
+        Returns:
+            MySQLSource: 可用连接，使用完需调用 checkin 归还
+
+        Raises:
+            PoolTimeoutError: 等待超过 pool_wait_timeout 秒仍没有空闲连接
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._expire_idle(now)
+                if self._idle:
+                    source, _ = self._idle.pop()
+                    self.stats['checkouts'] += 1
+                    return source
+                if self._created < self.pool_size:
+                    self._created += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"等待MySQL连接超时（{self.wait_timeout} 秒），连接池大小 {self.pool_size}"
+                    )
+                self.stats['waits'] += 1
+                self._cond.wait(remaining)
+
+        # 在锁外建立新连接，避免阻塞其他线程归还连接
+        try:
+            source = MySQLSource(self.config)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats['created'] += 1
+            self.stats['checkouts'] += 1
+        return source
+
+    def checkin(self, source):
+        """归还连接，连接被切换过数据库时先切回固定数据库"""
+        pinned = source.current_database == self.current_database or (
+            self.current_database and source.switch_database(self.current_database)
+        )
+        with self._cond:
+            now = time.monotonic()
+            self._expire_idle(now)
+            if self._closed or not pinned:
+                self._retire(source)
+            else:
+                self._idle.append((source, now))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """借出连接的上下文管理器"""
+        source = self.checkout()
+        try:
+            yield source
+        finally:
+            self.checkin(source)
+
+    def switch_database(self, database_name):
+        """连接池固定连接一个数据库，不支持切换
+
+        需要访问其他数据库时，请使用 database 不同的配置获取另一个连接池。
+
+        Returns:
+            bool: database_name 是否就是连接池固定的数据库
+        """
+        if database_name == self.current_database:
+            return True
+        logger.error(f"连接池固定使用数据库 {self.current_database}，无法切换到 {database_name}")
+        return False
+
+    def execute_query(self, query, params=None, unbuffered=False, fetch_size=100):
+        """借出连接执行查询，参数同 MySQLSource.execute_query"""
+        with self.connection() as source:
+            return source.execute_query(query, params, unbuffered=unbuffered, fetch_size=fetch_size)
+
+    def execute_many(self, query, params_list):
+        """借出连接执行批量操作，参数同 MySQLSource.execute_many"""
+        with self.connection() as source:
+            return source.execute_many(query, params_list)
+
+    def execute_transaction(self, statements):
+        """借出连接执行事务，参数同 MySQLSource.execute_transaction"""
+        with self.connection() as source:
+            return source.execute_transaction(statements)
+
+    def execute_update(self, query, params=None):
+        """借出连接执行更新操作，参数同 MySQLSource.execute_update"""
+        with self.connection() as source:
+            return source.execute_update(query, params)
+
+    def metrics(self):
+        """返回连接池统计及空闲、已关闭连接的校验统计之和，in_use 为借出中（含正在建立）的连接数"""
+        with self._cond:
+            totals = dict(self._retired_metrics)
+            for source, _ in self._idle:
+                for key, value in source.metrics().items():
+                    totals[key] = totals.get(key, 0) + value
+            return {
+                **totals,
+                **self.stats,
+                'size': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle)
+            }
+
+
 class MongoSource(DataSource):
     """MongoDB数据源实现"""
     
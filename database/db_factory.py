@@ -1,5 +1,6 @@
 import logging
-from database.data_source import MySQLSource, MongoSource
+import threading
+from database.data_source import MySQLPool, MongoSource
 
 logger = logging.getLogger('db_factory')
 
@@ -9,39 +10,45 @@ class DatabaseFactory:
     def __init__(self):
         """初始化数据库工厂"""
         self.sources = {}
+        self._lock = threading.Lock()
     
     def get_mysql_source(self, config, source_key=None):
         """获取MySQL数据源实例
         
+        同一 host:port:database 共享一个连接池，池中每个连接固定使用该数据库，
+        需要访问其他数据库时传入 database 不同的配置即可获得独立的连接池。
+        
         Args:
             config (dict): MySQL连接配置
             source_key (str, optional): 数据源键名，如果为None则使用host:port:database作为键名
             
         Returns:
-            MySQLSource: MySQL数据源实例
+            MySQLPool: MySQL连接池，提供与 MySQLSource 相同的 execute_* 接口
         """
         if source_key is None:
             # 使用host:port:database作为键名
             database = config.get('database', '')
             source_key = f"mysql:{config['host']}:{config['port']}:{database}"
         
-        # 从池子中找到相应的连接实例返回
-        if source_key in self.sources:
-            source = self.sources[source_key]
-            # 重新连接
-            if not source.is_alive():
-                logger.info(f"数据源 {source_key} 连接已断开，尝试重新连接")
-                source.connect()
-            return source
-        
-        # 如果没有就重新创建一个
-        try:
-            source = MySQLSource(config)
-            self.sources[source_key] = source
-            return source
-        except Exception as e:
-            logger.error(f"创建MySQL数据源 {source_key} 失败: {str(e)}")
-            raise
+        with self._lock:
+            # 从池子中找到相应的连接池返回
+            if source_key in self.sources:
+                source = self.sources[source_key]
+                # 连接池被关闭过则重新启用
+                if not source.is_alive():
+                    logger.info(f"数据源 {source_key} 连接池已关闭，重新启用")
+                    source.connect()
+                return source
+            
+            # 如果没有就重新创建一个
+            try:
+                source = MySQLPool(config)
+                self.sources[source_key] = source
+                logger.info(f"创建MySQL连接池 {source_key}，大小 {source.pool_size}")
+                return source
+            except Exception as e:
+                logger.error(f"创建MySQL数据源 {source_key} 失败: {str(e)}")
+                raise
     
     def get_mongo_source(self, config, source_key=None):
         """获取MongoDB数据源实例
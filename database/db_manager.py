@@ -8,6 +8,29 @@ from bson.objectid import ObjectId
 
 logger = logging.getLogger('db_manager')
 
+STRUCTURED_KOL_TWEETS_UPSERT = """INSERT INTO structured_kol_tweets 
+                      ( source_id, project, token, content, tags, created_at) 
+                      VALUES (%s, %s, %s, %s, %s, %s)
+                      ON DUPLICATE KEY UPDATE 
+                        source_id = VALUES(source_id),
+                        project=VALUES(project),
+                        token=VALUES(token),
+                        content=VALUES(content),
+                        tags=VALUES(tags),
+                        created_at=VALUES(created_at)"""
+
+# 项目提及按小时汇总，结构化推文写入时在同一事务内累加
+PROJECT_MENTIONS_UPSERT = """INSERT INTO kol_project_mentions
+                      (bucket_hour, project_name, mention_count, updated_at)
+                      VALUES (%s, %s, %s, %s)
+                      ON DUPLICATE KEY UPDATE
+                        mention_count = mention_count + VALUES(mention_count),
+                        updated_at = VALUES(updated_at)"""
+
+PROJECT_MENTION_TAGS_INSERT = """INSERT IGNORE INTO kol_project_mention_tags
+                      (bucket_hour, project_name, tag)
+                      VALUES (%s, %s, %s)"""
+
 
 class MySQLManager:
     """MySQL数据库管理类，兼容旧代码，内部使用新的数据源抽象"""
@@ -21,6 +44,8 @@ class MySQLManager:
         self.config = config
         self.mysql_source = None
         self.current_database = config.get('database')
+        # 项目标签内存索引（ProjectTagIndex），加载后标签查询不再访问数据库
+        self.project_index = None
         self.connect()
 
     def connect(self, max_retries=3):
@@ -63,6 +88,10 @@ class MySQLManager:
         # 数据库工厂会管理连接的关闭，这里不需要显式关闭
         pass
 
+    def metrics(self):
+        """返回底层连接的校验统计"""
+        return self.mysql_source.metrics() if self.mysql_source else {}
+
     def switch_database(self, database_name):
         """切换到指定的数据库
         
@@ -84,9 +113,7 @@ class MySQLManager:
 
         while retries <= max_retries:
             try:
-                if not self.mysql_source.is_alive():
-                    logger.warning("MySQL连接不可用，尝试重新连接")
-                    self.connect()
+                # 连接校验由数据源在空闲超时或出错后进行，这里不再每次预先 ping
                 return self.mysql_source.execute_many(query, params_list)
 
 
@@ -116,13 +143,57 @@ class MySQLManager:
         logger.error(f"executemany 执行失败，重试次数达到上限: {last_error}")
         raise last_error
 
-    def execute_query(self, query, params=None, max_retries=3):
+    def execute_transaction(self, statements, max_retries=3):
+        """在同一事务内执行多条批量语句，支持断线自动重连
+
+        COMMIT 发出后断线时事务可能已经提交，重试会再执行一次，语句需要幂等：
+        累加类写入应传入函数，在事务内先查询已写入的数据再生成语句。
+
+        Args:
+            statements (list | callable): (SQL语句, 参数记录列表) 列表，或接收游标、返回该列表的函数
+            max_retries (int, optional): 最大重试次数
+
+        Returns:
+            int: 总影响行数
+        """
+        retries = 0
+        last_error = None
+
+        while retries <= max_retries:
+            try:
+                return self.mysql_source.execute_transaction(statements)
+            except pymysql.err.OperationalError as e:
+                last_error = e
+                error_code = e.args[0] if len(e.args) > 0 else None
+
+                if error_code in (2006, 2013):
+                    logger.warning(f"MySQL连接错误 (错误码: {error_code})，尝试重新连接: {e}")
+                    self.connect()
+                else:
+                    logger.error(f"MySQL事务执行失败: {e}")
+                    raise
+            except Exception as e:
+                last_error = e
+                logger.error(f"MySQL事务执行失败: {e}")
+                raise
+
+            retries += 1
+            if retries <= max_retries:
+                wait_time = 2 ** retries
+                logger.info(f"第 {retries} 次重试事务，等待 {wait_time} 秒后再试")
+                time.sleep(wait_time)
+
+        logger.error(f"事务执行失败，重试次数达到上限: {last_error}")
+        raise last_error
+
+    def execute_query(self, query, params=None, max_retries=3, unbuffered=False):
         """执行查询并返回结果
         
         Args:
             query (str): SQL查询语句
             params (tuple, optional): 查询参数
             max_retries (int, optional): 最大重试次数
+            unbuffered (bool, optional): 是否使用服务端游标读取
             
         Returns:
             list: 查询结果列表
@@ -132,12 +203,7 @@ class MySQLManager:
 
         while retries <= max_retries:
             try:
-                # 检查连接是否有效，如果无效则重新连接
-                if not self.mysql_source.is_alive():
-                    logger.warning("MySQL连接已断开，尝试重新连接")
-                    self.connect()
-
-                return self.mysql_source.execute_query(query, params)
+                return self.mysql_source.execute_query(query, params, unbuffered=unbuffered)
             except pymysql.err.OperationalError as e:
                 last_error = e
                 error_code = e.args[0] if len(e.args) > 0 else None
@@ -183,11 +249,6 @@ class MySQLManager:
 
         while retries <= max_retries:
             try:
-                # 检查连接是否有效，如果无效则重新连接
-                if not self.mysql_source.is_alive():
-                    logger.warning("MySQL连接已断开，尝试重新连接")
-                    self.connect()
-
                 return self.mysql_source.execute_update(query, params)
             except pymysql.err.OperationalError as e:
                 # 捕获操作错误（如连接断开）
@@ -573,52 +634,307 @@ class MySQLManager:
         except Exception as e:
             logger.error(f"插入重要新闻到数据库失败：: {str(e)}")
 
-    def get_latest_kol_tweets(self, time):
+    @staticmethod
+    def _kol_tweets_seek_query(time, twitter_id=None, limit=None):
+        """构造按 (tweet_date, twitter_id) 键集定位的KOL推文查询
+
+        使用行构造器比较，配合 (tweet_date, twitter_id) 联合索引走范围扫描
+        """
+        query = "SELECT uid, twitter_id, twitter_username, text, permanent_url, tweet_date FROM kol_tweets"
+        if twitter_id is None:
+            query += " WHERE tweet_date > %s"
+            params = [time]
+        else:
+            query += " WHERE (tweet_date, twitter_id) > (%s, %s)"
+            params = [time, twitter_id]
+        query += " ORDER BY tweet_date ASC, twitter_id ASC"
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
+        return query, params
+
+    def ensure_kol_tweets_index(self):
+        """
+        确保kol_tweets表有以 (tweet_date, twitter_id) 开头的联合索引，没有时创建
+        :return: bool: 是否新建了索引
+        """
+        rows = self.execute_query(
+            "SELECT INDEX_NAME AS index_name, COLUMN_NAME AS column_name FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'kol_tweets' ORDER BY INDEX_NAME, SEQ_IN_INDEX"
+        )
+        indexes = {}
+        for row in rows:
+            indexes.setdefault(row['index_name'], []).append(row['column_name'].lower())
+        if any(columns[:2] == ['tweet_date', 'twitter_id'] for columns in indexes.values()):
+            return False
+
+        logger.info("kol_tweets表缺少 (tweet_date, twitter_id) 联合索引，开始创建")
+        self.execute_update("CREATE INDEX idx_kol_tweets_date_id ON kol_tweets (tweet_date, twitter_id)")
+        return True
+
+    def ensure_structured_kol_tweets_index(self):
         """
-        获取最新的推文
-        :param time:
+        确保structured_kol_tweets表有以 source_id 开头的索引，没有时创建前缀索引，
+        批量写入时按 source_id 查询已写入的推文
+        :return: bool: 是否新建了索引
+        """
+        rows = self.execute_query(
+            "SELECT INDEX_NAME AS index_name, COLUMN_NAME AS column_name FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'structured_kol_tweets' AND SEQ_IN_INDEX = 1"
+        )
+        if any(row['column_name'].lower() == 'source_id' for row in rows):
+            return False
+
+        logger.info("structured_kol_tweets表缺少 source_id 索引，开始创建")
+        self.execute_update(
+            "CREATE INDEX idx_structured_kol_tweets_source_id ON structured_kol_tweets (source_id(64))"
+        )
+        return True
+
+    def get_latest_kol_tweets(self, time, twitter_id=None, limit=None):
+        """
+        获取最新的推文，按 (tweet_date, twitter_id) 键集分页
+        :param time: 游标中的 tweet_date
+        :param twitter_id: 游标中的 twitter_id，为None时返回 tweet_date 之后的所有推文
+        :param limit: 单页最大条数，为None时不限制
         :return: tweets
         """
         try:
-            query = "SELECT uid, twitter_id, twitter_username, text, permanent_url, tweet_date FROM kol_tweets WHERE tweet_date > %s"
-            result = self.execute_query(query, (time,))
+            query, params = self._kol_tweets_seek_query(time, twitter_id, limit)
+            result = self.execute_query(query, params)
 
             return result
         except Exception as e:
             logger.error(f"获取最新推文失败：: {str(e)}")
 
+    def iter_kol_tweet_pages(self, cursor, page_size=200):
+        """
+        从游标之后按页读取KOL推文，每页用服务端游标读取并带 LIMIT，积压再多内存也只占一页
+        每页读完后连接即释放，下一页从上一页最后一行 (tweet_date, twitter_id) 继续定位
+        :param cursor: tuple: 起始游标 (tweet_date, twitter_id)
+        :param page_size: 每页条数
+        :return: generator: 每次产出一页推文列表，读取失败或最后一页不满时结束
+        """
+        time, twitter_id = cursor
+        while True:
+            try:
+                query, params = self._kol_tweets_seek_query(time, twitter_id, page_size)
+                page = self.execute_query(query, params, unbuffered=True)
+            except Exception as e:
+                logger.error(f"分页获取最新推文失败：: {str(e)}")
+                return
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            time, twitter_id = page[-1]['tweet_date'], page[-1]['twitter_id']
+
+    def get_kol_tweets_cursor(self):
+        """
+        从进度表读取KOL推文处理游标
+        查询失败（已按 execute_query 重试）或记录无法解析时抛出异常，不能当作没有记录处理，
+        否则调用方会写入新的游标而跳过停机期间的推文
+        :return: tuple: (tweet_date, twitter_id)，没有记录时返回 None
+        """
+        last_id = self.get_last_processed_id('kol_tweets_cursor')
+        if not last_id:
+            return None
+        tweet_date, twitter_id = json.loads(last_id)
+        return int(tweet_date), twitter_id
+
+    def save_kol_tweets_cursor(self, cursor):
+        """
+        保存KOL推文处理游标到进度表，twitter_id 以 JSON 保存以保留原始类型
+        :param cursor: tuple: (tweet_date, twitter_id)
+        :return: bool: 是否保存成功
+        """
+        try:
+            self.update_progress('kol_tweets_cursor', json.dumps(list(cursor), separators=(',', ':')))
+            return True
+        except Exception as e:
+            logger.error(f"保存KOL推文游标失败: {str(e)}")
+            return False
+
 
 
     def save_processed_kol_tweets(self, data):
         """
         保存处理后的kol数据到数据库
         :param data:
-        :return:
+        :return: bool: 是否保存成功
         """
         try:
-            query = """INSERT INTO structured_kol_tweets 
-                      ( source_id, project, token, content, tags, created_at) 
-                      VALUES (%s, %s, %s, %s, %s, %s)
-                      ON DUPLICATE KEY UPDATE 
-                        source_id = VALUES(source_id),
-                        project=VALUES(project),
-                        token=VALUES(token),
-                        content=VALUES(content),
-                        tags=VALUES(tags),
-                        created_at=VALUES(created_at)"""
-
-            params = (
-                data['source_id'],
-                data['project'],
-                data['token'],
-                data['content'],
-                data['tags'],
-                int(time.time())
-            )
-            self.execute_update(query, params)
+            self.save_processed_kol_tweets_batch([data], raise_error=True)
+            return True
         except Exception as e:
             logger.info(data)
             logger.error(f"保存至数据库失败: {str(e)}")
+            return False
+
+    def save_processed_kol_tweets_batch(self, data_list, raise_error=False):
+        """
+        批量保存处理后的kol数据，并在同一事务内累加项目提及的小时汇总
+        executemany 会把每类语句合并为一条多行语句。事务内先锁定读取已写入的 source_id 并跳过，
+        提及次数只按本次新写入的推文累加，提交结果未知时重试或下次重新写入同一批不会重复计数
+        :param data_list: list[dict]
+        :param raise_error: 失败时是否抛出异常
+        :return: bool: 是否保存成功
+        """
+        if not data_list:
+            return True
+        created_at = int(time.time())
+
+        def statements(cursor):
+            source_ids = list(dict.fromkeys(str(data['source_id']) for data in data_list))
+            placeholders = ", ".join(["%s"] * len(source_ids))
+            cursor.execute(
+                f"SELECT source_id FROM structured_kol_tweets WHERE source_id IN ({placeholders}) FOR UPDATE",
+                source_ids
+            )
+            saved = {row['source_id'] for row in cursor.fetchall()}
+            new_data = []
+            for data in data_list:
+                if str(data['source_id']) not in saved:
+                    saved.add(str(data['source_id']))
+                    new_data.append(data)
+            if len(new_data) < len(data_list):
+                logger.info(f"跳过 {len(data_list) - len(new_data)} 条已写入的kol数据")
+            mention_rows, tag_rows = self._project_mention_rows(new_data, created_at)
+            return [
+                (STRUCTURED_KOL_TWEETS_UPSERT, [self._kol_tweet_params(data, created_at) for data in new_data]),
+                (PROJECT_MENTIONS_UPSERT, mention_rows),
+                (PROJECT_MENTION_TAGS_INSERT, tag_rows)
+            ]
+
+        try:
+            self.execute_transaction(statements)
+            return True
+        except Exception as e:
+            if raise_error:
+                raise
+            logger.error(f"批量保存 {len(data_list)} 条kol数据失败: {str(e)}")
+            return False
+
+    @staticmethod
+    def _project_mention_rows(data_list, created_at):
+        """
+        把结构化推文的 tags 字段汇总为项目提及的小时计数和标签集合
+        :param data_list: list[dict]，tags 为 [{"project_name": ..., "tags": [...]}, ...] 的 JSON
+        :param created_at: 写入时间，决定所属小时
+        :return: (计数参数列表, 标签参数列表)
+        """
+        bucket_hour = created_at - created_at % 3600
+        counts = {}
+        tags = set()
+        for data in data_list:
+            try:
+                items = json.loads(data.get('tags') or '[]')
+            except (TypeError, json.JSONDecodeError):
+                continue
+            for item in items:
+                name = item.get('project_name')
+                if not name:
+                    continue
+                counts[name] = counts.get(name, 0) + 1
+                for tag in item.get('tags') or []:
+                    tags.add((bucket_hour, name, tag))
+        mention_rows = [(bucket_hour, name, count, created_at) for name, count in counts.items()]
+        return mention_rows, sorted(tags)
+
+    def get_project_mention_rollup(self, start_ts, end_ts):
+        """
+        从小时汇总表统计时间范围内各项目的提及次数和标签
+        :param start_ts: 开始时间戳（包含）
+        :param end_ts: 结束时间戳（不包含）
+        :return: list[dict]: [{"name": ..., "tag": [...], "count": ...}]，按提及次数降序
+        """
+        try:
+            counts = self.execute_query(
+                """SELECT project_name, SUM(mention_count) AS mention_count
+                   FROM kol_project_mentions
+                   WHERE bucket_hour >= %s AND bucket_hour < %s
+                   GROUP BY project_name""",
+                (start_ts, end_ts)
+            )
+            tag_rows = self.execute_query(
+                """SELECT DISTINCT project_name, tag
+                   FROM kol_project_mention_tags
+                   WHERE bucket_hour >= %s AND bucket_hour < %s""",
+                (start_ts, end_ts)
+            )
+            tags = {}
+            for row in tag_rows:
+                tags.setdefault(row['project_name'], []).append(row['tag'])
+            result = [
+                {
+                    'name': row['project_name'],
+                    'tag': tags.get(row['project_name'], []),
+                    'count': int(row['mention_count'])
+                }
+                for row in counts
+            ]
+            result.sort(key=lambda x: (-x['count'], x['name']))
+            return result
+        except Exception as e:
+            logger.error(f"查询项目提及汇总失败: {str(e)}")
+            return None
+
+    def get_project_mention_counts(self, start_ts, end_ts):
+        """
+        读取时间范围内各项目每小时的提及次数，用于预热热度引擎
+        :return: list[tuple]: [(bucket_hour, project_name, mention_count)]
+        """
+        try:
+            rows = self.execute_query(
+                """SELECT bucket_hour, project_name, mention_count FROM kol_project_mentions
+                   WHERE bucket_hour >= %s AND bucket_hour < %s""",
+                (start_ts, end_ts)
+            )
+            return [(row['bucket_hour'], row['project_name'], row['mention_count']) for row in rows]
+        except Exception as e:
+            logger.error(f"查询项目提及小时计数失败: {str(e)}")
+            return []
+
+    def rebuild_project_mention_rollup(self, start_ts, end_ts):
+        """
+        根据 structured_kol_tweets 重建时间范围内的项目提及汇总，用于汇总表上线前的历史数据
+        每小时读取一次并在一个事务内替换该小时的汇总，内存占用不超过一小时的推文
+        :param start_ts: 开始时间戳，按小时对齐
+        :param end_ts: 结束时间戳，按小时对齐
+        :return: int: 处理的推文数
+        """
+        start_ts -= start_ts % 3600
+        end_ts -= end_ts % 3600
+        total = 0
+        for bucket_hour in range(start_ts, end_ts, 3600):
+            rows = self.execute_query(
+                """SELECT tags FROM structured_kol_tweets
+                   WHERE created_at >= %s AND created_at < %s""",
+                (bucket_hour, bucket_hour + 3600),
+                unbuffered=True
+            )
+            mention_rows, tag_rows = self._project_mention_rows(rows, bucket_hour)
+            self.execute_transaction([
+                ("DELETE FROM kol_project_mentions WHERE bucket_hour = %s", [(bucket_hour,)]),
+                ("DELETE FROM kol_project_mention_tags WHERE bucket_hour = %s", [(bucket_hour,)]),
+                (PROJECT_MENTIONS_UPSERT, mention_rows),
+                (PROJECT_MENTION_TAGS_INSERT, tag_rows)
+            ])
+            total += len(rows)
+        logger.info(f"已重建 {start_ts} - {end_ts} 的项目提及汇总，共 {total} 条推文")
+        return total
+
+    @staticmethod
+    def _kol_tweet_params(data, created_at):
+        return (
+            data['source_id'],
+            data['project'],
+            data['token'],
+            data['content'],
+            data['tags'],
+            created_at
+        )
 
     def get_projects_tags(self, project_names, token_names):
         """整合去重project，token对应项目的tag
@@ -628,6 +944,8 @@ class MySQLManager:
         try:
             if not project_names and not token_names:
                 return []
+            if self.project_index and self.project_index.loaded:
+                return self.project_index.lookup(project_names, token_names)
             params = {}
             conditions = []
 
@@ -696,6 +1014,8 @@ class MySQLManager:
             # 若输入列表为空，直接返回空结果
             if not project_token_names:
                 return []
+            if self.project_index and self.project_index.loaded:
+                return self.project_index.lookup_any(project_token_names)
 
             params = {}
             conditions = []
@@ -757,6 +1077,106 @@ class MySQLManager:
         except Exception as e:
             logger.error(f"查询指定推文失败：: {str(e)}")
 
+    def get_kol_tweet_refs(self, start_ts, end_ts):
+        """
+        获取时间段内推文的引用信息（不含正文），用于增量总结判断新推文及生成小时报告
+        :return: list[dict]: twitter_id, uid, permanent_url, tweet_date
+        """
+        try:
+            sql = """SELECT twitter_id, uid, permanent_url, tweet_date FROM kol_tweets
+                     WHERE tweet_date >= %s AND tweet_date <= %s
+                     ORDER BY tweet_date ASC, twitter_id ASC"""
+            return self.execute_query(sql, (start_ts, end_ts))
+        except Exception as e:
+            logger.error(f"查询指定推文失败：: {str(e)}")
+            return []
+
+    def get_kol_tweets_by_ids(self, twitter_ids):
+        """
+        按 twitter_id 批量获取推文
+        :param twitter_ids: list
+        :return: list[dict]，按 tweet_date, twitter_id 排序
+        """
+        if not twitter_ids:
+            return []
+        try:
+            placeholders = ", ".join(["%s"] * len(twitter_ids))
+            sql = f"""SELECT * FROM kol_tweets WHERE twitter_id IN ({placeholders})
+                      ORDER BY tweet_date ASC, twitter_id ASC"""
+            return self.execute_query(sql, list(twitter_ids))
+        except Exception as e:
+            logger.error(f"按id查询推文失败：: {str(e)}")
+            return []
+
+    def get_kol_summary_state(self, hour_start):
+        """
+        读取某小时的增量总结状态
+        :param hour_start: 小时开始时间戳
+        :return: dict: {"events": [...], "folded_ids": [...]}，没有记录时返回 None
+        """
+        try:
+            result = self.execute_query(
+                "SELECT state FROM kol_summary_state WHERE hour_start = %s", (hour_start,)
+            )
+            return json.loads(result[0]['state']) if result else None
+        except Exception as e:
+            logger.error(f"读取增量总结状态失败: {str(e)}")
+            return None
+
+    def save_kol_summary_state(self, hour_start, state):
+        """
+        保存某小时的增量总结状态
+        :return: bool: 是否保存成功
+        """
+        try:
+            query = """INSERT INTO kol_summary_state (hour_start, state, updated_at)
+                       VALUES (%s, %s, %s)
+                       ON DUPLICATE KEY UPDATE state = VALUES(state), updated_at = VALUES(updated_at)"""
+            self.execute_update(query, (hour_start, json.dumps(state, ensure_ascii=False), int(time.time())))
+            return True
+        except Exception as e:
+            logger.error(f"保存增量总结状态失败: {str(e)}")
+            return False
+
+    def delete_kol_summary_states(self, before_hour):
+        """删除 before_hour 之前的增量总结状态"""
+        try:
+            return self.execute_update("DELETE FROM kol_summary_state WHERE hour_start < %s", (before_hour,))
+        except Exception as e:
+            logger.error(f"清理增量总结状态失败: {str(e)}")
+            return 0
+
+    def get_completed_backfill_windows(self, start_ts, end_ts):
+        """
+        获取时间范围内已完成回补的总结窗口
+        :return: set: {(window_start, window_end)}
+        """
+        try:
+            result = self.execute_query(
+                """SELECT window_start, window_end FROM kol_summary_backfill
+                   WHERE window_start >= %s AND window_end <= %s AND status = 'done'""",
+                (start_ts, end_ts)
+            )
+            return {(row['window_start'], row['window_end']) for row in result}
+        except Exception as e:
+            logger.error(f"查询回补进度失败: {str(e)}")
+            return set()
+
+    def mark_backfill_window_done(self, window_start, window_end):
+        """
+        记录总结窗口已完成回补
+        :return: bool: 是否记录成功
+        """
+        try:
+            query = """INSERT INTO kol_summary_backfill (window_start, window_end, status, updated_at)
+                       VALUES (%s, %s, 'done', %s)
+                       ON DUPLICATE KEY UPDATE status = VALUES(status), updated_at = VALUES(updated_at)"""
+            self.execute_update(query, (window_start, window_end, int(time.time())))
+            return True
+        except Exception as e:
+            logger.error(f"记录回补进度失败: {str(e)}")
+            return False
+
     def get_target_structured_tweets(self, start_ts, end_ts):
         try:
 
@@ -785,9 +1205,11 @@ class MySQLManager:
                 int(time.time())
             )
             self.execute_update(query, params)
+            return True
         except Exception as e:
             logger.info(data)
             logger.error(f"保存至数据库失败: {str(e)}")
+            return False
 
 
 
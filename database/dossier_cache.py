@@ -0,0 +1,315 @@
+import base64
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from decimal import Decimal
+from database.db_factory import db_factory
+
+logger = logging.getLogger('dossier_cache')
+
+# 各板块的 TTL 档位：static 为团队、融资、生态等很少变化的数据，medium 为解锁事件、提交记录，
+# activity 为推文、快照等变化快的数据
+SECTION_TTL_CLASSES = {
+    'ecosystems': 'static',
+    'fundraising': 'static',
+    'fundraising_rounds': 'static',
+    'investments': 'static',
+    'social_links': 'static',
+    'subsidiary_orgs': 'static',
+    'tags': 'static',
+    'team_members': 'static',
+    'active_team_members': 'static',
+    'team_members_details': 'static',
+    'token_contracts': 'static',
+    'token_unlock_events': 'medium',
+    'github_commit_msg': 'medium',
+    'snapshots': 'activity',
+    'recent_activity': 'activity'
+}
+
+
+def _encode_default(obj):
+    if isinstance(obj, datetime.datetime):
+        return {'__type__': 'datetime', 'value': obj.isoformat()}
+    if isinstance(obj, datetime.date):
+        return {'__type__': 'date', 'value': obj.isoformat()}
+    if isinstance(obj, Decimal):
+        return {'__type__': 'decimal', 'value': str(obj)}
+    if isinstance(obj, bytes):
+        return {'__type__': 'bytes', 'value': base64.b64encode(obj).decode('ascii')}
+    # 其余类型（如 MongoDB 的 ObjectId）按字符串保存
+    return str(obj)
+
+
+def _decode_hook(obj):
+    kind = obj.get('__type__')
+    if kind is None or len(obj) != 2:
+        return obj
+    value = obj['value']
+    if kind == 'datetime':
+        return datetime.datetime.fromisoformat(value)
+    if kind == 'date':
+        return datetime.date.fromisoformat(value)
+    if kind == 'decimal':
+        return Decimal(value)
+    if kind == 'bytes':
+        return base64.b64decode(value)
+    return obj
+
+
+def encode_value(value):
+    """把板块数据编码为压缩的 JSON，datetime、date、Decimal 带类型标记以便还原"""
+    return zlib.compress(json.dumps(value, default=_encode_default, ensure_ascii=False).encode('utf-8'))
+
+
+def decode_value(data):
+    """还原 encode_value 编码的数据"""
+    return json.loads(zlib.decompress(data).decode('utf-8'), object_hook=_decode_hook)
+
+
+def content_hash(value):
+    """返回数据内容的 sha1，与字典键的顺序无关，用于判断内容是否变化"""
+    return hashlib.sha1(
+        json.dumps(value, default=_encode_default, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+
+class DossierCache:
+    """项目信息（get_all_info 结果）按项目、按板块的缓存
+
+    每个项目的各板块分别记录过期时间，TTL 按 SECTION_TTL_CLASSES 的档位取值，只有过期的板块
+    需要重新查询。进程内为按项目数限制的 LRU；可选的共享层存放在 MySQL 的
+    project_dossier_cache 表中，多个进程共用，数据以 encode_value 压缩编码。
+    数据源有更新时通过 invalidate / invalidate_sections / clear 主动失效。
+    """
+
+    def __init__(self, config, mysql_config=None):
+        """初始化缓存
+
+        Args:
+            config (dict): 包含 memory_size, shared, static_ttl, medium_ttl, activity_ttl 的配置
+            mysql_config (dict, optional): 共享层使用的MySQL配置，shared 为 True 时必填
+        """
+        self.memory_size = config.get('memory_size', 500)
+        self.ttls = {
+            'static': config.get('static_ttl', 24 * 3600),
+            'medium': config.get('medium_ttl', 3600),
+            'activity': config.get('activity_ttl', 300)
+        }
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.stats = {
+            'memory_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'invalidations': 0
+        }
+
+        self.mysql_source = None
+        if config.get('shared'):
+            self.mysql_source = db_factory.get_mysql_source(mysql_config)
+            self.mysql_source.execute_update("""
+                CREATE TABLE IF NOT EXISTS project_dossier_cache (
+                project_id VARCHAR(64) NOT NULL COMMENT '项目ID',
+                section VARCHAR(64) NOT NULL COMMENT '板块名称',
+                value LONGBLOB NOT NULL COMMENT '压缩编码后的板块数据',
+                expires_at DOUBLE NOT NULL COMMENT '过期时间',
+                PRIMARY KEY (project_id, section),
+                KEY idx_expires_at (expires_at)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+            """)
+        logger.info(f"项目信息缓存初始化完成，TTL {self.ttls}，共享层 {'开启' if self.mysql_source else '关闭'}")
+
+    def ttl_of(self, section):
+        """返回板块的 TTL（秒），不在档位表中的板块按 activity 处理"""
+        return self.ttls[SECTION_TTL_CLASSES.get(section, 'activity')]
+
+    def _fresh_sections(self, project_id, now):
+        entry = self._memory.get(project_id)
+        if entry is None:
+            return {}
+        return {section: value for section, (expires_at, value) in entry.items() if expires_at > now}
+
+    def _remember(self, project_id, sections):
+        entry = self._memory.setdefault(project_id, {})
+        entry.update(sections)
+        self._memory.move_to_end(project_id)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, project_ids, sections=None):
+        """读取多个项目未过期的板块
+
+        Args:
+            project_ids (list): 项目ID列表
+            sections (iterable, optional): 需要的板块，默认为 SECTION_TTL_CLASSES 中的全部板块
+
+        Returns:
+            dict: {project_id: {板块名称: 数据}}，只包含未过期的板块
+        """
+        wanted = set(sections or SECTION_TTL_CLASSES)
+        now = time.time()
+        result = {}
+        incomplete = []
+        with self._lock:
+            for project_id in project_ids:
+                fresh = self._fresh_sections(project_id, now)
+                if fresh:
+                    self._memory.move_to_end(project_id)
+                result[project_id] = fresh
+                if not wanted <= fresh.keys():
+                    incomplete.append(project_id)
+        self.stats['memory_hits'] += len(project_ids) - len(incomplete)
+
+        if incomplete and self.mysql_source:
+            try:
+                self._load_shared(incomplete, result, now)
+            except Exception as e:
+                logger.warning(f"读取共享项目信息缓存失败: {str(e)}")
+
+        self.stats['misses'] += sum(1 for project_id in incomplete if not wanted <= result[project_id].keys())
+        return {project_id: sections for project_id, sections in result.items() if sections}
+
+    def _load_shared(self, project_ids, result, now):
+        keys = {str(project_id): project_id for project_id in project_ids}
+        placeholders = ", ".join(["%s"] * len(keys))
+        rows = self.mysql_source.execute_query(
+            f"SELECT project_id, section, value, expires_at FROM project_dossier_cache "
+            f"WHERE project_id IN ({placeholders}) AND expires_at > %s",
+            list(keys) + [now]
+        )
+        loaded = {}
+        for row in rows:
+            project_id = keys[row['project_id']]
+            if row['section'] in result[project_id]:
+                continue
+            value = decode_value(row['value'])
+            result[project_id][row['section']] = value
+            loaded.setdefault(project_id, {})[row['section']] = (row['expires_at'], value)
+        with self._lock:
+            for project_id, sections in loaded.items():
+                self._remember(project_id, sections)
+        self.stats['shared_hits'] += len(loaded)
+
+    def set_many(self, dossiers):
+        """写入多个项目的板块，每个板块按自身 TTL 过期
+
+        Args:
+            dossiers (dict): {project_id: {板块名称: 数据}}
+        """
+        now = time.time()
+        rows = []
+        with self._lock:
+            for project_id, sections in dossiers.items():
+                if not sections:
+                    continue
+                entries = {section: (now + self.ttl_of(section), value) for section, value in sections.items()}
+                self._remember(project_id, entries)
+                if self.mysql_source:
+                    rows.extend(
+                        (str(project_id), section, encode_value(value), expires_at)
+                        for section, (expires_at, value) in entries.items()
+                    )
+                self.stats['writes'] += len(entries)
+        if rows:
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 100:
+                self._writes_since_evict = 0
+                self._delete_shared("DELETE FROM project_dossier_cache WHERE expires_at <= %s", (now,))
+            try:
+                self.mysql_source.execute_many(
+                    """INSERT INTO project_dossier_cache (project_id, section, value, expires_at)
+                       VALUES (%s, %s, %s, %s)
+                       ON DUPLICATE KEY UPDATE value = VALUES(value), expires_at = VALUES(expires_at)""",
+                    rows
+                )
+            except Exception as e:
+                logger.warning(f"写入共享项目信息缓存失败: {str(e)}")
+
+    def invalidate(self, project_ids, sections=None):
+        """使指定项目的缓存失效
+
+        Args:
+            project_ids (list): 项目ID列表
+            sections (list, optional): 只失效这些板块，默认失效项目的全部板块
+        """
+        if not project_ids:
+            return
+        with self._lock:
+            for project_id in project_ids:
+                if sections is None:
+                    self._memory.pop(project_id, None)
+                else:
+                    entry = self._memory.get(project_id, {})
+                    for section in sections:
+                        entry.pop(section, None)
+        self.stats['invalidations'] += len(project_ids)
+        if self.mysql_source:
+            keys = [str(project_id) for project_id in project_ids]
+            query = f"DELETE FROM project_dossier_cache WHERE project_id IN ({', '.join(['%s'] * len(keys))})"
+            params = list(keys)
+            if sections is not None:
+                query += f" AND section IN ({', '.join(['%s'] * len(sections))})"
+                params.extend(sections)
+            self._delete_shared(query, params)
+
+    def invalidate_sections(self, sections):
+        """使所有项目的指定板块失效，例如某张关联表整体更新之后"""
+        with self._lock:
+            for entry in self._memory.values():
+                for section in sections:
+                    entry.pop(section, None)
+        self.stats['invalidations'] += 1
+        if self.mysql_source and sections:
+            self._delete_shared(
+                f"DELETE FROM project_dossier_cache WHERE section IN ({', '.join(['%s'] * len(sections))})",
+                list(sections)
+            )
+
+    def clear(self):
+        """清空全部缓存"""
+        with self._lock:
+            self._memory.clear()
+        self.stats['invalidations'] += 1
+        if self.mysql_source:
+            self._delete_shared("DELETE FROM project_dossier_cache", None)
+
+    def _delete_shared(self, query, params):
+        try:
+            self.mysql_source.execute_update(query, params)
+        except Exception as e:
+            logger.warning(f"失效共享项目信息缓存失败: {str(e)}")
+
+    def metrics(self):
+        """返回命中统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_projects'] = len(self._memory)
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_dossier_cache(config, mysql_config=None):
+    """返回进程内共用的项目信息缓存，未启用时返回 None
+
+    Args:
+        config (dict): DOSSIER_CACHE_CONFIG
+        mysql_config (dict, optional): 共享层使用的MySQL配置
+    """
+    global _default_cache
+    if not config.get('enabled'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DossierCache(config, mysql_config)
+        return _default_cache
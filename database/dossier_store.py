@@ -0,0 +1,361 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from database.db_factory import db_factory
+from database.chain_project_manager import ChainProjectManager, DOSSIER_SECTIONS, fetch_dossier_sections
+from database.dossier_cache import encode_value, decode_value, content_hash
+
+logger = logging.getLogger('dossier_store')
+
+# 物化的板块及其来源表；推文、快照变化快，仍在请求时查询
+SECTION_TABLES = {
+    'ecosystems': {'projects_ecosystems'},
+    'fundraising': {'projects_fundraising'},
+    'fundraising_rounds': {'projects_fundraising_rounds'},
+    'investments': {'projects_investments'},
+    'social_links': {'projects_social_links'},
+    'subsidiary_orgs': {'projects_subsidiary_orgs'},
+    'tags': {'projects_tags'},
+    'team_members': {'projects_team_members'},
+    'active_team_members': {'projects_team_members'},
+    'github_commit_msg': {'github_commits'},
+    'team_members_details': {
+        'projects_team_members', 'people', 'people_education_experience', 'people_social_links',
+        'people_work_experience', 'people_investments_info'
+    },
+    'token_contracts': {'projects_token_contracts'},
+    'token_unlock_events': {'projects_token_unlock_events'},
+    # 最近推文不物化，只物化查询推文所需的项目相关人员、投资方Twitter链接
+    'twitter_links': {
+        'projects', 'projects_team_members', 'projects_fundraising', 'projects_social_links', 'people',
+        'people_social_links', 'investors', 'investors_social_links'
+    }
+}
+MATERIALIZED_SECTIONS = tuple(section for section in DOSSIER_SECTIONS if section in SECTION_TABLES) + ('twitter_links',)
+SOURCE_TABLES = sorted({'projects'}.union(*SECTION_TABLES.values()))
+
+
+class DossierStore:
+    """项目信息物化表 project_dossiers 的读写
+
+    每个项目一行，保存 MATERIALIZED_SECTIONS 各板块压缩编码后的数据、内容哈希和版本号，
+    get_all_info 按主键一次读取。project_dossier_sources 记录上次构建成功时各来源表的
+    UPDATE_TIME，构建任务据此判断哪些板块需要重建。最近一次构建成功的时间超过 max_age_seconds
+    时视为物化数据过期，get_many 不再返回，由调用方回退到实时查询。
+    """
+
+    # 构建时间的检查结果缓存秒数
+    FRESHNESS_CHECK_SECONDS = 60
+
+    def __init__(self, mysql_config, max_age_seconds=None):
+        """初始化物化表
+
+        Args:
+            mysql_config (dict): MySQL配置
+            max_age_seconds (float, optional): 物化数据的最大有效秒数，为None时不检查
+        """
+        self.max_age_seconds = max_age_seconds
+        self._freshness = (None, False)
+        self.mysql_source = db_factory.get_mysql_source(mysql_config)
+        self.mysql_source.execute_update("""
+            CREATE TABLE IF NOT EXISTS project_dossiers (
+            project_id VARCHAR(64) NOT NULL PRIMARY KEY COMMENT '项目ID',
+            project_name VARCHAR(255) COMMENT '项目名称',
+            dossier LONGBLOB NOT NULL COMMENT '压缩编码后的各板块数据',
+            content_hash CHAR(40) NOT NULL COMMENT '板块数据的sha1',
+            version INT NOT NULL DEFAULT 1 COMMENT '内容变化一次加一',
+            updated_at DATETIME NOT NULL COMMENT '内容最近一次变化的时间'
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+        self.mysql_source.execute_update("""
+            CREATE TABLE IF NOT EXISTS project_dossier_sources (
+            source_table VARCHAR(64) NOT NULL PRIMARY KEY COMMENT 'chain_project中的来源表',
+            update_time DATETIME COMMENT '上次构建成功时来源表的UPDATE_TIME',
+            built_at DATETIME NOT NULL COMMENT '上次构建成功的时间'
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """)
+
+    def get_rows(self, project_ids):
+        """读取项目的物化行
+
+        Args:
+            project_ids (list): 项目ID列表
+
+        Returns:
+            dict: {项目ID: {"dossier", "content_hash", "version"}}
+        """
+        if not project_ids:
+            return {}
+        keys = {str(project_id): project_id for project_id in project_ids}
+        placeholders = ", ".join(["%s"] * len(keys))
+        rows = self.mysql_source.execute_query(
+            f"SELECT project_id, dossier, content_hash, version FROM project_dossiers "
+            f"WHERE project_id IN ({placeholders})",
+            list(keys)
+        )
+        return {
+            keys[row['project_id']]: {
+                'dossier': decode_value(row['dossier']),
+                'content_hash': row['content_hash'],
+                'version': row['version']
+            }
+            for row in rows
+        }
+
+    def is_fresh(self):
+        """最近一次构建成功的时间是否在 max_age_seconds 以内，检查结果缓存 FRESHNESS_CHECK_SECONDS 秒"""
+        if self.max_age_seconds is None:
+            return True
+        checked_at, fresh = self._freshness
+        if checked_at is not None and time.monotonic() - checked_at < self.FRESHNESS_CHECK_SECONDS:
+            return fresh
+        built_at = self.get_last_built_at()
+        fresh = built_at is not None and (datetime.now() - built_at).total_seconds() <= self.max_age_seconds
+        if not fresh:
+            logger.warning(f"项目信息物化表最近一次构建于 {built_at}，超过 {self.max_age_seconds} 秒，改为实时查询")
+        self._freshness = (time.monotonic(), fresh)
+        return fresh
+
+    def get_many(self, project_ids):
+        """读取项目已物化的板块，物化数据过期或读取失败时返回空字典，由调用方回退到实时查询
+
+        Args:
+            project_ids (list): 项目ID列表
+
+        Returns:
+            dict: {项目ID: {板块名称: 数据}}
+        """
+        try:
+            if not self.is_fresh():
+                return {}
+            return {project_id: row['dossier'] for project_id, row in self.get_rows(project_ids).items()}
+        except Exception as e:
+            logger.warning(f"读取项目信息物化表失败: {str(e)}")
+            return {}
+
+    def save_many(self, dossiers):
+        """写入内容有变化的项目，已存在的行版本号加一
+
+        Args:
+            dossiers (list): [(项目ID, 项目名称, {板块名称: 数据}, 内容哈希)]
+        """
+        if not dossiers:
+            return
+        now = datetime.now()
+        self.mysql_source.execute_many(
+            """INSERT INTO project_dossiers (project_id, project_name, dossier, content_hash, version, updated_at)
+               VALUES (%s, %s, %s, %s, 1, %s)
+               ON DUPLICATE KEY UPDATE project_name = VALUES(project_name), dossier = VALUES(dossier),
+                   content_hash = VALUES(content_hash), version = version + 1, updated_at = VALUES(updated_at)""",
+            [
+                (str(project_id), project_name, encode_value(dossier), digest, now)
+                for project_id, project_name, dossier, digest in dossiers
+            ]
+        )
+
+    def get_source_versions(self):
+        """返回上次构建成功时各来源表的 UPDATE_TIME"""
+        rows = self.mysql_source.execute_query("SELECT source_table, update_time FROM project_dossier_sources")
+        return {row['source_table']: row['update_time'] for row in rows}
+
+    def get_last_built_at(self):
+        """返回各来源表中最早的上次构建成功时间，从未构建时返回 None"""
+        rows = self.mysql_source.execute_query("SELECT MIN(built_at) AS built_at FROM project_dossier_sources")
+        return rows[0]['built_at'] if rows else None
+
+    def save_source_versions(self, update_times, built_at=None):
+        """记录本次构建开始时各来源表的 UPDATE_TIME
+
+        Args:
+            update_times (dict): {表名: 更新时间}
+            built_at (datetime, optional): 构建开始的时间，默认为当前时间
+        """
+        if not update_times:
+            return
+        built_at = built_at or datetime.now()
+        self.mysql_source.execute_many(
+            """INSERT INTO project_dossier_sources (source_table, update_time, built_at) VALUES (%s, %s, %s)
+               ON DUPLICATE KEY UPDATE update_time = VALUES(update_time), built_at = VALUES(built_at)""",
+            [(table, update_time, built_at) for table, update_time in update_times.items()]
+        )
+
+
+class DossierBuilder:
+    """项目信息物化表的后台构建器
+
+    来源表的 UPDATE_TIME 与上次构建成功时记录的不同时，只重建依赖这些表的板块；
+    物化表中还没有的项目构建全部板块。项目按ID分页处理，每页的关联表查询与 get_all_info
+    共用 fetch_dossier_sections，构建结果的内容哈希与已有的一致时不写入。
+    MySQL 未记录 UPDATE_TIME（例如重启后表未再写入）的表视为有变化；UPDATE_TIME 可能延迟更新，
+    上次构建成功超过 full_rebuild_seconds 时全量重建。只有实际构建成功后才更新构建时间，
+    没有变化时跳过的构建不会延长物化数据的有效期。
+    """
+
+    def __init__(self, mysql_config, mongo_config=None, batch_size=200, deadline_seconds=120,
+                 full_rebuild_seconds=None):
+        """初始化构建器
+
+        Args:
+            mysql_config (dict): MySQL配置
+            mongo_config (dict, optional): MongoDB配置
+            batch_size (int, optional): 每页处理的项目数
+            deadline_seconds (float, optional): 每页关联表查询的截止秒数
+            full_rebuild_seconds (float, optional): 距上次构建成功超过该秒数时全量重建，为None时不定期全量重建
+        """
+        self.manager = ChainProjectManager(mysql_config, mongo_config)
+        self.store = DossierStore(mysql_config)
+        self.batch_size = batch_size
+        self.deadline_seconds = deadline_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self.max_workers = mysql_config.get('pool_size', 5)
+
+    def changed_sections(self, force=False):
+        """根据来源表的 UPDATE_TIME 判断需要重建的板块
+
+        Args:
+            force (bool, optional): 为 True 时重建全部板块
+
+        Returns:
+            tuple: (需要重建的板块集合, 项目表是否变化, 构建成功后应记录的各表 UPDATE_TIME)
+        """
+        update_times = self.manager.get_table_update_times(SOURCE_TABLES)
+        built = {} if force else self.store.get_source_versions()
+        # 未记录 UPDATE_TIME 时无法判断是否有变化，按有变化处理
+        changed = {
+            table for table in SOURCE_TABLES
+            if table not in built or update_times.get(table) is None or update_times[table] != built[table]
+        }
+        sections = {section for section, tables in SECTION_TABLES.items() if tables & changed}
+        versions = {table: update_times.get(table) for table in SOURCE_TABLES}
+        return sections, 'projects' in changed, versions
+
+    def build(self, force=False):
+        """构建物化表
+
+        Args:
+            force (bool, optional): 为 True 时忽略 UPDATE_TIME，重建全部项目的全部板块
+
+        Returns:
+            dict: 构建统计
+        """
+        started = time.monotonic()
+        built_at = datetime.now()
+        if not force and self.full_rebuild_seconds is not None:
+            last_built_at = self.store.get_last_built_at()
+            if last_built_at is None or (built_at - last_built_at).total_seconds() >= self.full_rebuild_seconds:
+                logger.info(f"项目信息物化表上次构建成功于 {last_built_at}，本次全量重建")
+                force = True
+        sections, projects_changed, versions = self.changed_sections(force)
+        stats = {'projects': 0, 'built': 0, 'written': 0, 'failed': 0, 'sections': sorted(sections)}
+        if not sections and not projects_changed:
+            # 不更新构建时间，物化数据的有效期仍从上次实际构建算起
+            logger.info("项目信息来源表没有变化，跳过构建")
+            return stats
+
+        logger.info(f"开始构建项目信息物化表，重建板块 {sorted(sections)}")
+        after = None
+        while True:
+            projects = self.manager.get_projects_page(after, self.batch_size)
+            if not projects:
+                break
+            after = projects[-1]['project_id']
+            stats['projects'] += len(projects)
+            self._build_batch(projects, sections, stats)
+
+        # 有失败的页时不记录来源表版本，下次构建重试
+        if not stats['failed']:
+            self.store.save_source_versions(versions, built_at)
+        stats['seconds'] = round(time.monotonic() - started, 1)
+        logger.info(f"项目信息物化表构建完成: {stats}")
+        return stats
+
+    def _build_batch(self, projects, sections, stats):
+        all_projects = {project['project_id']: project for project in projects}
+        try:
+            rows = self.store.get_rows(list(all_projects))
+        except Exception as e:
+            logger.error(f"读取项目信息物化表失败: {str(e)}")
+            stats['failed'] += len(all_projects)
+            return
+        need = {
+            section: [
+                pid for pid in all_projects
+                if section in MATERIALIZED_SECTIONS and (pid not in rows or section in sections)
+            ]
+            for section in DOSSIER_SECTIONS + ('twitter_links',)
+        }
+        if not any(need.values()):
+            return
+
+        # 需要重建的板块不能从已有的行中读取
+        cached = {
+            pid: {section: value for section, value in row['dossier'].items() if section not in sections}
+            for pid, row in rows.items()
+        }
+        values, missing_sections, _ = fetch_dossier_sections(
+            self.manager, all_projects, need, cached, time.monotonic() + self.deadline_seconds, self.max_workers
+        )
+        if missing_sections:
+            logger.error(f"构建项目信息时查询缺失 {missing_sections}，跳过本页 {len(all_projects)} 个项目")
+            stats['failed'] += len(all_projects)
+            return
+
+        changed = []
+        for pid, project in all_projects.items():
+            if pid in rows and not sections:
+                continue
+            dossier = {section: values[section][pid] for section in MATERIALIZED_SECTIONS}
+            digest = content_hash(dossier)
+            stats['built'] += 1
+            if pid not in rows or rows[pid]['content_hash'] != digest:
+                changed.append((pid, project.get('project_name'), dossier, digest))
+        try:
+            self.store.save_many(changed)
+            stats['written'] += len(changed)
+        except Exception as e:
+            logger.error(f"写入项目信息物化表失败: {str(e)}")
+            stats['failed'] += len(all_projects)
+
+
+def build_dossiers(mysql_config, mongo_config=None, config=None, force=False):
+    """构建项目信息物化表，供命令行和后台进程池调用
+
+    Args:
+        mysql_config (dict): MySQL配置
+        mongo_config (dict, optional): MongoDB配置
+        config (dict, optional): DOSSIER_STORE_CONFIG
+        force (bool, optional): 是否全量重建
+
+    Returns:
+        dict: 构建统计
+    """
+    config = config or {}
+    builder = DossierBuilder(
+        mysql_config,
+        mongo_config,
+        batch_size=config.get('batch_size', 200),
+        deadline_seconds=config.get('build_deadline', 120),
+        full_rebuild_seconds=config.get('full_rebuild_seconds')
+    )
+    return builder.build(force=force)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_dossier_store(config, mysql_config):
+    """返回进程内共用的项目信息物化表，未启用时返回 None
+
+    Args:
+        config (dict): DOSSIER_STORE_CONFIG
+        mysql_config (dict): MySQL配置
+    """
+    global _default_store
+    if not config.get('enabled'):
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = DossierStore(mysql_config, max_age_seconds=config.get('max_age_seconds'))
+        return _default_store
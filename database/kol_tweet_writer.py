@@ -0,0 +1,87 @@
+import logging
+import time
+
+logger = logging.getLogger('kol_tweet_writer')
+
+
+class KolTweetWriter:
+    """structured_kol_tweets 的批量写入器（write-behind）
+
+    处理完成的推文先进入缓冲区，条数达到 batch_size 或最早一条缓冲超过 max_age_seconds
+    时，用一次 executemany 批量 upsert 到数据库。flush 结果通过 on_flush 回调通知调用方，
+    调用方应在回调里再确认推文已落库，而不是在加入缓冲区时。写库通过 AsyncMySQLManager
+    在线程池中执行，不阻塞事件循环。
+    """
+
+    def __init__(self, mysql_manager, batch_size=50, max_age_seconds=5.0, on_flush=None):
+        """初始化批量写入器
+
+        Args:
+            mysql_manager (AsyncMySQLManager): 异步MySQL管理器
+            batch_size (int, optional): 缓冲条数达到该值时立即写入
+            max_age_seconds (float, optional): 最早一条缓冲超过该秒数时写入
+            on_flush (callable, optional): 写入完成回调 on_flush(batch, saved)，
+                batch 为本批 {键: 结构化数据}，saved 表示是否写入成功
+        """
+        self.mysql_manager = mysql_manager
+        self.batch_size = max(1, batch_size)
+        self.max_age_seconds = max_age_seconds
+        self.on_flush = on_flush
+        self._buffer = {}
+        self._oldest = None
+        self.stats = {
+            'rows': 0,
+            'flushes': 0,
+            'failed_flushes': 0
+        }
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def is_buffered(self, key):
+        """推文是否还在缓冲区中等待写入"""
+        return key in self._buffer
+
+    async def add(self, key, data):
+        """加入一条处理结果，缓冲区满时立即写入
+
+        Args:
+            key: 推文的键（twitter_id）
+            data (dict): 传给 save_processed_kol_tweets_batch 的结构化数据
+        """
+        if not self._buffer:
+            self._oldest = time.monotonic()
+        self._buffer[key] = data
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush_if_due(self):
+        """最早一条缓冲已超过 max_age_seconds 时写入"""
+        if self._buffer and time.monotonic() - self._oldest >= self.max_age_seconds:
+            await self.flush()
+
+    async def flush(self):
+        """立即写入缓冲区中的所有推文
+
+        Returns:
+            bool: 是否写入成功，缓冲区为空时返回 True
+        """
+        if not self._buffer:
+            return True
+        buffer, self._buffer, self._oldest = self._buffer, {}, None
+        # 先取出缓冲区再写库，写库期间新加入的推文进入下一批
+        saved = await self.mysql_manager.save_processed_kol_tweets_batch(list(buffer.values()))
+        self.stats['flushes'] += 1
+        if saved:
+            self.stats['rows'] += len(buffer)
+            logger.info(f"批量写入 {len(buffer)} 条处理后的KOL推文")
+        else:
+            self.stats['failed_flushes'] += 1
+            logger.warning(f"批量写入 {len(buffer)} 条KOL推文失败，稍后重试")
+        if self.on_flush:
+            self.on_flush(buffer, saved)
+        return saved
+
+    def metrics(self):
+        """返回写入统计"""
+        return {'buffered': len(self._buffer), **self.stats}
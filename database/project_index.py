@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger('project_index')
+
+
+class ProjectTagIndex:
+    """项目/代币名称到项目标签的内存索引
+
+    启动时全量加载 projects 和 projects_tags 两张表，按小写的 project_name、token_name
+    建立到 project_id 的字典，并按 project_id 保存标签列表，名称解析变为内存查询。
+    refresh 通过 information_schema.TABLES 的 UPDATE_TIME 判断表是否有变化，只重新加载
+    变化过的表；UPDATE_TIME 不可用（为 NULL）时按 full_reload_seconds 定期重载。
+    """
+
+    TABLES = ('projects', 'projects_tags')
+
+    def __init__(self, mysql_manager, full_reload_seconds=3600):
+        """初始化索引
+
+        Args:
+            mysql_manager (MySQLManager): MySQL管理器
+            full_reload_seconds (int, optional): 无法获取表更新时间时的重载间隔（秒）
+        """
+        self.mysql_manager = mysql_manager
+        self.full_reload_seconds = full_reload_seconds
+        self.loaded = False
+        # projects 表每重新加载一次加 1，依赖名称集合的组件据此判断是否需要重建
+        self.version = 0
+        self._lock = threading.Lock()
+        self._projects = {}
+        self._by_project_name = {}
+        self._by_token_name = {}
+        self._tags = {}
+        self._versions = {}
+        self._loaded_at = {}
+        self.stats = {
+            'refreshes': 0,
+            'skipped_refreshes': 0,
+            'lookups': 0
+        }
+
+    @staticmethod
+    def normalize(name):
+        """名称归一化：去除首尾空白并转小写，与数据库大小写不敏感的比较保持一致"""
+        return str(name).strip().lower()
+
+    def _table_versions(self):
+        query = """
+            SELECT TABLE_NAME AS table_name, UPDATE_TIME AS update_time
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (%s, %s)
+        """
+        rows = self.mysql_manager.execute_query(query, self.TABLES)
+        return {row['table_name']: row['update_time'] for row in rows}
+
+    def _is_stale(self, table, version, now):
+        if table not in self._loaded_at:
+            return True
+        if version is None:
+            return now - self._loaded_at[table] >= self.full_reload_seconds
+        return version != self._versions.get(table)
+
+    def refresh(self, force=False):
+        """按需重新加载有变化的表
+
+        Args:
+            force (bool, optional): 是否强制全量重新加载
+
+        Returns:
+            bool: 是否有表被重新加载
+        """
+        try:
+            versions = self._table_versions()
+        except Exception as e:
+            logger.warning(f"获取项目表更新时间失败，全量重新加载: {str(e)}")
+            versions = {}
+            force = True
+
+        now = time.monotonic()
+        stale = [table for table in self.TABLES if force or self._is_stale(table, versions.get(table), now)]
+        if not stale:
+            self.stats['skipped_refreshes'] += 1
+            return False
+
+        if 'projects' in stale:
+            rows = self.mysql_manager.execute_query(
+                "SELECT project_id, project_name, token_name FROM projects"
+            )
+            projects, by_project_name, by_token_name = {}, {}, {}
+            for row in rows:
+                pid = row['project_id']
+                projects[pid] = (row['project_name'], row['token_name'])
+                if row['project_name']:
+                    by_project_name.setdefault(self.normalize(row['project_name']), []).append(pid)
+                if row['token_name']:
+                    by_token_name.setdefault(self.normalize(row['token_name']), []).append(pid)
+            with self._lock:
+                self._projects = projects
+                self._by_project_name = by_project_name
+                self._by_token_name = by_token_name
+                self.version += 1
+
+        if 'projects_tags' in stale:
+            rows = self.mysql_manager.execute_query("SELECT project_id, text FROM projects_tags")
+            tags = {}
+            for row in rows:
+                tags.setdefault(row['project_id'], []).append(row['text'])
+            with self._lock:
+                self._tags = tags
+
+        for table in stale:
+            self._versions[table] = versions.get(table)
+            self._loaded_at[table] = now
+        self.loaded = True
+        self.stats['refreshes'] += 1
+        logger.info(f"项目标签索引已重新加载 {stale}: {len(self._projects)} 个项目，{len(self._tags)} 个项目有标签")
+        return True
+
+    def _resolve(self, project_names, token_names, any_names):
+        project_ids = []
+        seen = set()
+        with self._lock:
+            candidates = []
+            for name in project_names:
+                candidates.extend(self._by_project_name.get(self.normalize(name), []))
+            for name in token_names:
+                candidates.extend(self._by_token_name.get(self.normalize(name), []))
+            for name in any_names:
+                key = self.normalize(name)
+                candidates.extend(self._by_project_name.get(key, []))
+                candidates.extend(self._by_token_name.get(key, []))
+            for pid in candidates:
+                if pid in seen:
+                    continue
+                seen.add(pid)
+                project_ids.append(pid)
+            result = []
+            for pid in project_ids:
+                project_name, token_name = self._projects[pid]
+                result.append({
+                    "project_name": project_name,
+                    "token_name": token_name,
+                    "tags": list(self._tags.get(pid, []))
+                })
+        self.stats['lookups'] += 1
+        return result
+
+    def names(self):
+        """返回所有项目的 (project_name, token_name)"""
+        with self._lock:
+            return list(self._projects.values())
+
+    def lookup(self, project_names, token_names):
+        """按项目名称和代币名称分别匹配，返回格式同 MySQLManager.get_projects_tags"""
+        return self._resolve(project_names or [], token_names or [], [])
+
+    def lookup_any(self, names):
+        """名称同时匹配项目名称和代币名称，返回格式同 MySQLManager.get_projects_tokens_tags"""
+        return self._resolve([], [], names or [])
+
+    def metrics(self):
+        """返回索引规模及查询统计"""
+        return {
+            'projects': len(self._projects),
+            'tagged_projects': len(self._tags),
+            **self.stats
+        }
@@ -4,10 +4,17 @@ import time
 import logging
 import argparse
 import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from logging.handlers import TimedRotatingFileHandler
 
-from config.config import MYSQL_CONFIG, MONGO_CONFIG, OPENAI_CONFIG, TASK_CONFIG, DEEPSEEK_CONFIG
+from config.config import MYSQL_CONFIG, MONGO_CONFIG, OPENAI_CONFIG, TASK_CONFIG, DEEPSEEK_CONFIG, LLM_CACHE_CONFIG, \
+    LLM_RATE_LIMIT_CONFIG, LLM_PROVIDER_CONFIGS, LLM_ROUTER_CONFIG, DOSSIER_STORE_CONFIG, DOSSIER_CACHE_CONFIG
+from database.chain_project_manager import ChainProjectManager, configure_dossier_sources
+from database.dossier_cache import get_dossier_cache
+from database.dossier_store import build_dossiers, get_dossier_store
+from database.db_manager import MySQLManager
 from task.scheduler import DataProcessor
 
 log_dir = "logs"
@@ -50,17 +57,62 @@ def check_environment():
 
 
 async def main_async(args):
+    if args.ensure_tweet_index:
+        created = await asyncio.to_thread(ChainProjectManager(MYSQL_CONFIG).ensure_recent_tweets_index)
+        logger.info("已创建tweets表 (twitter_username, tweet_date) 索引" if created else "tweets表索引已存在")
+        return
+    if args.build_dossiers:
+        # 构建项目信息物化表只需要数据库，不检查LLM和Bot的环境变量
+        logger.info("构建项目信息物化表...")
+        stats = await asyncio.to_thread(build_dossiers, MYSQL_CONFIG, MONGO_CONFIG, DOSSIER_STORE_CONFIG,
+                                        args.force)
+        logger.info(f"构建完成: {stats}")
+        return
+    if args.rebuild_mention_rollup:
+        # 重建项目提及汇总只读取已结构化的推文，不调用LLM，也不回补推文总结
+        start, end = parse_range(args.rebuild_mention_rollup, args.rebuild_mention_rollup_end)
+        logger.info(f"重建项目提及汇总 {start} - {end}")
+        total = await asyncio.to_thread(MySQLManager(MYSQL_CONFIG).rebuild_project_mention_rollup,
+                                        int(start.timestamp()), int(end.timestamp()))
+        logger.info(f"重建完成，共 {total} 条推文")
+        return
     if not check_environment():
         return
     try:
+        # 本进程内构造的 ChainProjectManager（get_all_info 等）默认使用按配置创建的项目信息缓存
+        configure_dossier_sources(
+            dossier_cache=get_dossier_cache(DOSSIER_CACHE_CONFIG, MYSQL_CONFIG),
+            dossier_store=get_dossier_store(DOSSIER_STORE_CONFIG, MYSQL_CONFIG)
+        )
+        # 最近推文按用户倒序读取依赖 (twitter_username, tweet_date) 索引，启动时确保存在
+        try:
+            if await asyncio.to_thread(ChainProjectManager(MYSQL_CONFIG).ensure_recent_tweets_index):
+                logger.info("已创建tweets表 (twitter_username, tweet_date) 索引")
+        except Exception as e:
+            logger.warning(f"检查tweets表索引失败，最近推文查询可能较慢: {str(e)}")
+        provider_configs = [LLM_PROVIDER_CONFIGS[name] for name in LLM_ROUTER_CONFIG['providers']
+                            if name in LLM_PROVIDER_CONFIGS]
+        provider_configs = [c for c in provider_configs if c.get('base_url') and c.get('model')] or [DEEPSEEK_CONFIG]
         processor = DataProcessor(
             mysql_config=MYSQL_CONFIG,
             mongo_config=MONGO_CONFIG,
-            openai_config=DEEPSEEK_CONFIG,
-            task_config=TASK_CONFIG
+            openai_config=provider_configs[0],
+            task_config=TASK_CONFIG,
+            llm_cache_config=LLM_CACHE_CONFIG,
+            llm_rate_limit_config=LLM_RATE_LIMIT_CONFIG,
+            fallback_configs=provider_configs[1:],
+            router_config=LLM_ROUTER_CONFIG,
+            dossier_store_config=DOSSIER_STORE_CONFIG
         )
 
-        if args.once:
+        if args.backfill_start:
+            start, end = parse_range(args.backfill_start, args.backfill_end)
+            logger.info(f"回补推文总结 {start} - {end}")
+            await processor.backfill_summaries(int(start.timestamp()), int(end.timestamp()),
+                                               concurrency=args.backfill_concurrency)
+            logger.info("回补完成")
+            await processor.stop()
+        elif args.once:
             logger.info("执行单次数据处理...")
             await processor.start_bot_async()  # 先启动 bot（用于发送）
             await processor._process_summary_tweets()
@@ -74,9 +126,37 @@ async def main_async(args):
         logger.error(f"程序运行出错: {str(e)}")
 
 
+def parse_time(value):
+    """解析 YYYY-MM-DD 或 YYYY-MM-DD HH:MM 格式的时间（上海时区）"""
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"无法解析时间: {value}")
+
+
+def parse_range(start, end=None):
+    """解析上海时区的时间范围，未指定结束时间时为当前整点"""
+    sh_tz = ZoneInfo("Asia/Shanghai")
+    end = parse_time(end).replace(tzinfo=sh_tz) if end \
+        else datetime.now(sh_tz).replace(minute=0, second=0, microsecond=0)
+    return parse_time(start).replace(tzinfo=sh_tz), end
+
+
 def main():
     parser = argparse.ArgumentParser(description='Analysis Bot')
     parser.add_argument('--once', action='store_true', help='只运行一次，不启动定时任务')
+    parser.add_argument('--backfill-start', help='回补推文总结的开始时间（YYYY-MM-DD 或 "YYYY-MM-DD HH:MM"）')
+    parser.add_argument('--backfill-end', help='回补推文总结的结束时间，默认当前整点')
+    parser.add_argument('--backfill-concurrency', type=int, default=None, help='回补时同时总结的窗口数')
+    parser.add_argument('--rebuild-mention-rollup',
+                        help='根据已结构化的推文重建项目提及汇总的开始时间（格式同 --backfill-start），重建后退出')
+    parser.add_argument('--rebuild-mention-rollup-end', help='重建项目提及汇总的结束时间，默认当前整点')
+    parser.add_argument('--build-dossiers', action='store_true', help='构建项目信息物化表后退出')
+    parser.add_argument('--force', action='store_true', help='与 --build-dossiers 一起使用，重建全部项目')
+    parser.add_argument('--ensure-tweet-index', action='store_true',
+                        help='为chain_project.tweets创建 (twitter_username, tweet_date) 索引后退出')
     args = parser.parse_args()
 
     asyncio.run(main_async(args))
@@ -0,0 +1,185 @@
+import logging
+import random
+import re
+import zlib
+from collections import deque
+
+logger = logging.getLogger('dedup')
+
+URL_PATTERN = re.compile(r'https?://\S+')
+NON_WORD_PATTERN = re.compile(r'[^\w$]+')
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def normalize_text(text):
+    """归一化推文文本：去掉链接和标点，转小写并合并空白"""
+    text = URL_PATTERN.sub(' ', text or '')
+    return ' '.join(NON_WORD_PATTERN.sub(' ', text.lower()).split())
+
+
+class NearDuplicateDetector:
+    """基于 MinHash-LSH 的流式近似重复检测
+
+    文本归一化后取字符 shingle 计算 MinHash 签名，签名按 bands 分段放入 LSH 桶，
+    同桶的候选再用签名估计 Jaccard 相似度确认。只与 window_seconds 时间窗口内的推文比较，
+    过期推文会从桶中移除，内存占用与窗口内推文数成正比。
+    """
+
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, shingle_size=5, window_seconds=6 * 3600, seed=1):
+        """初始化检测器
+
+        Args:
+            threshold (float, optional): 判定为重复的最低 Jaccard 相似度估计值
+            num_perm (int, optional): MinHash 签名长度，需能被 bands 整除
+            bands (int, optional): LSH 分段数
+            shingle_size (int, optional): 字符 shingle 长度
+            window_seconds (int, optional): 滑动时间窗口（秒）
+            seed (int, optional): 生成哈希参数的随机种子
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.window_seconds = window_seconds
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+        self._buckets = {}
+        self._signatures = {}
+        self._results = {}
+        self._window = deque()
+        self.stats = {
+            'checked': 0,
+            'duplicates': 0,
+            'expired': 0
+        }
+
+    def _shingles(self, text):
+        compact = normalize_text(text).replace(' ', '')
+        if len(compact) <= self.shingle_size:
+            return {compact} if compact else set()
+        return {compact[i:i + self.shingle_size] for i in range(len(compact) - self.shingle_size + 1)}
+
+    def signature(self, text):
+        """计算文本的 MinHash 签名，文本为空时返回 None"""
+        hashes = [zlib.crc32(s.encode('utf-8')) for s in self._shingles(text)]
+        if not hashes:
+            return None
+        return tuple(
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def similarity(self, sig_a, sig_b):
+        """用签名估计 Jaccard 相似度"""
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / self.num_perm
+
+    def _expire(self, now):
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            _, key = self._window.popleft()
+            self._remove(key)
+            self.stats['expired'] += 1
+
+    def _remove(self, key):
+        signature = self._signatures.pop(key, None)
+        self._results.pop(key, None)
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def _find(self, signature, exclude=None):
+        best, best_score = None, 0.0
+        seen = set()
+        for band_key in self._band_keys(signature):
+            for key in self._buckets.get(band_key, ()):
+                if key == exclude or key in seen:
+                    continue
+                seen.add(key)
+                score = self.similarity(signature, self._signatures[key])
+                if score >= self.threshold and score > best_score:
+                    best, best_score = key, score
+        return best
+
+    def add(self, key, text, timestamp):
+        """检查文本是否与窗口内已有推文近似重复，不重复时登记为新的代表推文
+
+        Args:
+            key: 推文的键（twitter_id）
+            text (str): 推文文本
+            timestamp (int): 推文时间戳，用于滑动窗口
+
+        Returns:
+            代表推文的键，没有近似重复时返回 None
+        """
+        self._expire(timestamp)
+        self.stats['checked'] += 1
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        canonical = self._find(signature, exclude=key)
+        if canonical is not None:
+            self.stats['duplicates'] += 1
+            return canonical
+        if key not in self._signatures:
+            self._signatures[key] = signature
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+            self._window.append((timestamp, key))
+        return None
+
+    def set_result(self, key, result):
+        """记录代表推文的分析结果，供后续重复推文复用"""
+        if key in self._signatures:
+            self._results[key] = result
+
+    def get_result(self, key):
+        """返回代表推文的分析结果，尚未分析完成时返回 None"""
+        return self._results.get(key)
+
+    def cluster(self, items):
+        """将一组文本按近似重复聚类，不使用也不修改滑动窗口
+
+        Args:
+            items (list): 文本列表
+
+        Returns:
+            list: 每个元素为一个簇内文本下标的列表，按簇中第一条出现的顺序排列
+        """
+        clusters = []
+        signatures = []
+        buckets = {}
+        for idx, text in enumerate(items):
+            signature = self.signature(text)
+            target = None
+            if signature is not None:
+                band_keys = self._band_keys(signature)
+                candidates = {c for band_key in band_keys for c in buckets.get(band_key, ())}
+                for c in sorted(candidates):
+                    if self.similarity(signature, signatures[c]) >= self.threshold:
+                        target = c
+                        break
+            if target is not None:
+                clusters[target].append(idx)
+                continue
+            clusters.append([idx])
+            signatures.append(signature)
+            if signature is not None:
+                for band_key in band_keys:
+                    buckets.setdefault(band_key, []).append(len(clusters) - 1)
+        return clusters
+
+    def metrics(self):
+        """返回检测统计"""
+        return {'window_size': len(self._signatures), **self.stats}
@@ -0,0 +1,281 @@
+import logging
+import re
+
+logger = logging.getLogger('entity_extractor')
+
+CASHTAG_PATTERN = re.compile(r'\$([A-Za-z][A-Za-z0-9]{0,14})\b')
+# 剩余文本中可能是未收录项目的词：@账号、句中大写开头的词、含内部大写或数字的词
+RESIDUAL_WORD_PATTERN = re.compile(r'@\w+|[A-Za-z][A-Za-z0-9]*')
+SENTENCE_END = '.!?\n'
+# 同时是常见英文单词的名称，不带 $ 出现时置信度很低
+COMMON_WORDS = {
+    'a', 'ai', 'all', 'any', 'are', 'best', 'big', 'can', 'gas', 'get', 'go', 'gm', 'gn', 'good', 'hot',
+    'just', 'key', 'link', 'love', 'moon', 'more', 'new', 'now', 'one', 'open', 'out', 'pay', 'real',
+    'safe', 'the', 'time', 'top', 'up', 'we', 'win', 'you'
+}
+
+
+def _lower(text):
+    """逐字符转小写，保证与原文的下标一一对应"""
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _is_word_char(c):
+    return c.isalnum() or c == '_'
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机，一次扫描找出文本中所有模式串的出现位置"""
+
+    def __init__(self, patterns):
+        """构建自动机
+
+        Args:
+            patterns (iterable): (模式串, 附加数据) 列表，模式串需已转小写
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, payload in patterns:
+            if pattern:
+                self._add(pattern, payload)
+        self._build()
+
+    def __len__(self):
+        return len(self._goto)
+
+    def _add(self, pattern, payload):
+        node = 0
+        for c in pattern:
+            nxt = self._goto[node].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), payload))
+
+    def _build(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for c, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and c not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(c, 0)
+                # 根节点的子节点失败指针指向根节点
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """扫描文本
+
+        Yields:
+            tuple: (起始下标, 结束下标, 附加数据)
+        """
+        node = 0
+        for idx, c in enumerate(text):
+            while node and c not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(c, 0)
+            for length, payload in self._out[node]:
+                yield idx + 1 - length, idx + 1, payload
+
+
+class Extraction:
+    """单条推文的本地提取结果"""
+
+    def __init__(self, result, confidence, resolved, residual):
+        # result: {"project": [...], "token": [...]}，格式同 LLM 的提取结果
+        self.result = result
+        self.confidence = confidence
+        self.resolved = resolved
+        self.residual = residual
+
+
+class EntityExtractor:
+    """基于项目表名称的本地项目/代币预提取器
+
+    用 projects 表中所有 project_name、token_name 构建 Aho-Corasick 自动机，按词边界匹配，
+    并单独识别 $TICKER 形式的 cashtag。每个匹配按形式给出置信度，推文中所有提及都达到
+    min_confidence、没有无法识别的 cashtag，且剩余文本中没有疑似实体的词时视为本地已完全解析，可以跳过 LLM；
+    否则把去掉高置信度提及后的剩余文本交给 LLM，再与本地结果合并。
+    """
+
+    def __init__(self, min_confidence=0.8):
+        """初始化提取器
+
+        Args:
+            min_confidence (float, optional): 本地匹配被视为可信的最低置信度
+        """
+        self.min_confidence = min_confidence
+        self.version = None
+        self._automaton = None
+        self._tokens = {}
+        self.stats = {
+            'tweets': 0,
+            'resolved': 0,
+            'partial': 0,
+            'unmatched': 0
+        }
+
+    @property
+    def ready(self):
+        return self._automaton is not None
+
+    def build(self, project_index):
+        """根据项目标签索引重建自动机，索引版本未变化时跳过
+
+        Args:
+            project_index (ProjectTagIndex): 已加载的项目标签索引
+
+        Returns:
+            bool: 是否重建
+        """
+        if not project_index.loaded or project_index.version == self.version:
+            return False
+        patterns = {}
+        tokens = {}
+        for project_name, token_name in project_index.names():
+            if project_name:
+                key = _lower(project_name.strip())
+                patterns.setdefault(key, ('project', project_name.strip()))
+            if token_name:
+                key = _lower(token_name.strip())
+                tokens.setdefault(key, token_name.strip())
+                # 同名时项目名称优先
+                patterns.setdefault(key, ('token', token_name.strip()))
+        self._automaton = AhoCorasick(patterns.items())
+        self._tokens = tokens
+        self.version = project_index.version
+        logger.info(f"本地实体提取自动机已重建: {len(patterns)} 个名称，{len(self._automaton)} 个状态")
+        return True
+
+    def _confidence(self, original, kind):
+        lowered = original.lower()
+        if len(original) < 3 or lowered in COMMON_WORDS:
+            return 0.3
+        if kind == 'token':
+            return 0.85 if original.isupper() else 0.5
+        if len(original) >= 5 or ' ' in original or any(c.isdigit() for c in original):
+            return 0.9
+        return 0.6
+
+    def _candidates(self, text):
+        """返回按位置排序、互不重叠的匹配 (start, end, kind, name, confidence)"""
+        lowered = _lower(text)
+        matches = []
+        cashtag_spans = []
+        for m in CASHTAG_PATTERN.finditer(text):
+            name = self._tokens.get(_lower(m.group(1)))
+            cashtag_spans.append((m.start(), m.end()))
+            if name:
+                matches.append((m.start(), m.end(), 'token', name, 1.0))
+            else:
+                # 项目表中没有的 cashtag，需要交给 LLM
+                matches.append((m.start(), m.end(), None, m.group(1), 0.0))
+
+        for start, end, (kind, name) in self._automaton.iter_matches(lowered):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            if any(s <= start < e for s, e in cashtag_spans):
+                continue
+            matches.append((start, end, kind, name, self._confidence(text[start:end], kind)))
+
+        # 最左最长，去掉重叠的匹配
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected = []
+        last_end = -1
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+    @staticmethod
+    def _residual_candidates(residual):
+        """返回剩余文本中疑似未收录项目或代币的词
+
+        @账号、句中以大写字母开头的词（句首的词除外）、含内部大写字母（NewCoin、ETH）或
+        字母数字混合（zkSync2）的词都视为候选，常见英文单词除外。
+        """
+        candidates = []
+        for m in RESIDUAL_WORD_PATTERN.finditer(residual):
+            word = m.group()
+            if word.startswith('@'):
+                candidates.append(word)
+                continue
+            if word.lower() in COMMON_WORDS:
+                continue
+            before = residual[:m.start()].rstrip()
+            sentence_start = not before or before[-1] in SENTENCE_END
+            if (any(c.isupper() for c in word[1:]) or (any(c.isdigit() for c in word) and len(word) > 1)
+                    or (word[0].isupper() and not sentence_start)):
+                candidates.append(word)
+        return candidates
+
+    def extract(self, text):
+        """本地提取推文中的项目和代币
+
+        Args:
+            text (str): 推文文本
+
+        Returns:
+            Extraction: 提取结果，resolved 为 True 时无需再调用 LLM
+        """
+        self.stats['tweets'] += 1
+        result = {'project': [], 'token': []}
+        if not self.ready or not text:
+            self.stats['unmatched'] += 1
+            return Extraction(result, 0.0, False, text)
+
+        matches = self._candidates(text)
+        if not matches:
+            self.stats['unmatched'] += 1
+            return Extraction(result, 0.0, False, text)
+
+        pieces = []
+        last_end = 0
+        confidence = 1.0
+        for start, end, kind, name, score in matches:
+            confidence = min(confidence, score)
+            if kind is None or score < self.min_confidence:
+                continue
+            if name not in result[kind]:
+                result[kind].append(name)
+            pieces.append(text[last_end:start])
+            last_end = end
+        pieces.append(text[last_end:])
+        residual = ' '.join(' '.join(pieces).split())
+
+        # 已识别的提及都可信之外，剩余文本中还不能有疑似新项目的词，否则仍交给 LLM
+        resolved = confidence >= self.min_confidence and not self._residual_candidates(residual)
+        self.stats['resolved' if resolved else 'partial'] += 1
+        return Extraction(result, confidence, resolved, residual)
+
+    @staticmethod
+    def merge(local, remote):
+        """合并本地提取结果与 LLM 提取结果，按出现顺序去重（不区分大小写）"""
+        merged = {}
+        for key in ('project', 'token'):
+            values = []
+            seen = set()
+            for value in list((local or {}).get(key) or []) + list((remote or {}).get(key) or []):
+                normalized = str(value).strip().lower()
+                if normalized and normalized not in seen:
+                    seen.add(normalized)
+                    values.append(value)
+            merged[key] = values
+        return merged
+
+    def metrics(self):
+        """返回提取统计"""
+        return dict(self.stats)
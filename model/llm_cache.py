@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger('llm_cache')
+
+
+class LLMCache:
+    """LLM 响应缓存
+
+    以 (model, 渲染后的 prompt) 的哈希为键，分为进程内 LRU 和本地 SQLite 两级，
+    两级都支持 TTL 过期和按条数上限的 LRU 淘汰。异步调用方使用 aget / aset，
+    SQLite 读写和提交在线程中执行；磁盘命中的访问时间批量提交，不为每次命中单独提交。
+    两级都保存序列化后的 JSON，每次命中重新解码，调用方修改返回的结果不会影响缓存。
+    """
+
+    def __init__(self, config):
+        """初始化缓存
+
+        Args:
+            config (dict): 包含 path, ttl_seconds, memory_size, max_entries 的配置
+        """
+        self.ttl_seconds = config.get('ttl_seconds', 7 * 24 * 3600)
+        self.memory_size = config.get('memory_size', 2000)
+        self.max_entries = config.get('max_entries', 200000)
+        self.path = config.get('path', 'cache/llm_cache.sqlite3')
+
+        self._memory = OrderedDict()
+        # _lock 只保护内存层和统计，SQLite 读写使用 _disk_lock，事件循环线程不会等待磁盘 I/O
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        # 磁盘命中的访问时间，随下一次写入批量提交
+        self._pending_access = {}
+        self._writes_since_evict = 0
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        self.conn.commit()
+        logger.info(f"LLM缓存初始化完成: {self.path}，TTL {self.ttl_seconds} 秒")
+
+    @staticmethod
+    def make_key(model, prompt):
+        """根据模型和 prompt 生成缓存键"""
+        return hashlib.sha256(f"{model}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def _get_memory(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, serialized = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+        return json.loads(serialized)
+
+    def _get_disk(self, key, now):
+        try:
+            with self._disk_lock:
+                row = self.conn.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+            if row and row[1] > now:
+                value = json.loads(row[0])
+                with self._lock:
+                    # 访问时间只记在内存中，随下一次写入一起提交，命中时不单独提交
+                    self._pending_access[key] = now
+                    self._remember(key, row[1], row[0])
+                    self.stats['disk_hits'] += 1
+                    flush = len(self._pending_access) >= 1000
+                if flush:
+                    with self._disk_lock:
+                        self._flush_access()
+                        self.conn.commit()
+                return value
+        except Exception as e:
+            logger.warning(f"读取LLM缓存失败: {str(e)}")
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def get(self, model, prompt):
+        """读取缓存（同步，SQLite 读取在当前线程执行）
+
+        Returns:
+            dict: 缓存的解析结果，未命中返回 None
+        """
+        key = self.make_key(model, prompt)
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return self._get_disk(key, now)
+
+    async def aget(self, model, prompt):
+        """读取缓存，内存未命中时在线程中读取 SQLite，不阻塞事件循环
+
+        Returns:
+            dict: 缓存的解析结果，未命中返回 None
+        """
+        key = self.make_key(model, prompt)
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self._get_disk, key, now)
+
+    def _set_disk(self, key, serialized, expires_at, now):
+        try:
+            with self._disk_lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (cache_key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, serialized, expires_at, now)
+                )
+                self._flush_access()
+                self.conn.commit()
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= 100:
+                    self._evict_disk(now)
+            with self._lock:
+                self.stats['writes'] += 1
+        except Exception as e:
+            logger.warning(f"写入LLM缓存失败: {str(e)}")
+
+    def set(self, model, prompt, value):
+        """写入缓存（同步，SQLite 写入在当前线程执行）"""
+        key = self.make_key(model, prompt)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        serialized = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, expires_at, serialized)
+        self._set_disk(key, serialized, expires_at, now)
+
+    async def aset(self, model, prompt, value):
+        """写入缓存，内存层立即生效，SQLite 写入和提交在线程中执行"""
+        key = self.make_key(model, prompt)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        serialized = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, expires_at, serialized)
+        await asyncio.to_thread(self._set_disk, key, serialized, expires_at, now)
+
+    def _flush_access(self):
+        """把积累的访问时间写入 SQLite（不提交），调用方需持有 _disk_lock"""
+        with self._lock:
+            pending, self._pending_access = self._pending_access, {}
+        if pending:
+            self.conn.executemany(
+                "UPDATE llm_cache SET accessed_at = ? WHERE cache_key = ?",
+                [(accessed_at, key) for key, accessed_at in pending.items()]
+            )
+
+    def _remember(self, key, expires_at, serialized):
+        self._memory[key] = (expires_at, serialized)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        """清理过期条目，并按最近访问时间淘汰超出上限的条目，调用方需持有 _disk_lock"""
+        self._writes_since_evict = 0
+        cursor = self.conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        evicted = cursor.rowcount
+        count = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_entries:
+            cursor = self.conn.execute(
+                "DELETE FROM llm_cache WHERE cache_key IN "
+                "(SELECT cache_key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            evicted += cursor.rowcount
+        self.conn.commit()
+        with self._lock:
+            self.stats['evictions'] += max(evicted, 0)
+
+    def metrics(self):
+        """返回命中统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self):
+        """关闭缓存，提交尚未写入的访问时间"""
+        with self._disk_lock:
+            try:
+                self._flush_access()
+                self.conn.commit()
+                self.conn.close()
+            except Exception:
+                pass
+        logger.info(f"LLM缓存已关闭，统计: {self.metrics()}")
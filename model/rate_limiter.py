@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger('rate_limiter')
+
+WINDOW_SECONDS = 60
+
+
+class LimiterSlot:
+    """一次 LLM 调用占用的并发名额，用于回报调用结果"""
+
+    def __init__(self):
+        self.outcome = None
+        self.tokens_used = None
+
+    def success(self, tokens_used=None):
+        """调用成功，tokens_used 为实际消耗的token数（可选）"""
+        self.outcome = 'success'
+        self.tokens_used = tokens_used
+
+    def throttled(self):
+        """调用被限流（429）或超时"""
+        self.outcome = 'throttled'
+
+
+class AdaptiveLimiter:
+    """AIMD 自适应限流器
+
+    并发上限在调用成功时加性增长、被限流或超时时乘性下降，同时按滑动 60 秒窗口
+    控制每分钟请求数（RPM）和每分钟token数（TPM），使吞吐收敛到后端实际可承受的上限。
+    """
+
+    def __init__(self, config, name='llm'):
+        """初始化限流器
+
+        Args:
+            config (dict): 包含 min_concurrency, max_concurrency, initial_concurrency,
+                increase_step, decrease_factor, decrease_cooldown, rpm, tpm 的配置，
+                rpm/tpm 为 0 表示不限制
+            name (str, optional): 限流器名称，用于日志
+        """
+        self.name = name
+        self.min_concurrency = max(1, config.get('min_concurrency', 1))
+        self.max_concurrency = max(self.min_concurrency, config.get('max_concurrency', 16))
+        self.limit = float(min(self.max_concurrency,
+                               max(self.min_concurrency, config.get('initial_concurrency', 4))))
+        self.increase_step = config.get('increase_step', 1.0)
+        self.decrease_factor = config.get('decrease_factor', 0.5)
+        self.decrease_cooldown = config.get('decrease_cooldown', 5)
+        self.rpm = config.get('rpm', 0)
+        self.tpm = config.get('tpm', 0)
+
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+        self._requests = deque()
+        self._tokens = deque()
+        self._token_sum = 0
+        self._last_decrease = 0.0
+        self.stats = {
+            'success': 0,
+            'throttled': 0,
+            'errors': 0,
+            'increases': 0,
+            'decreases': 0
+        }
+
+    def _purge(self, now):
+        while self._requests and now - self._requests[0] >= WINDOW_SECONDS:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= WINDOW_SECONDS:
+            self._token_sum -= self._tokens.popleft()[1]
+
+    def _budget_wait(self, tokens, now):
+        """返回需要等待预算释放的秒数，0 表示预算充足"""
+        wait = 0.0
+        if self.rpm and len(self._requests) >= self.rpm:
+            wait = max(wait, WINDOW_SECONDS - (now - self._requests[0]))
+        if self.tpm and self._tokens and self._token_sum + tokens > self.tpm:
+            wait = max(wait, WINDOW_SECONDS - (now - self._tokens[0][0]))
+        return wait
+
+    async def _acquire(self, tokens):
+        async with self._cond:
+            while True:
+                now = time.monotonic()
+                self._purge(now)
+                if self.in_flight >= int(self.limit):
+                    await self._cond.wait()
+                    continue
+                wait = self._budget_wait(tokens, now)
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                self.in_flight += 1
+                self._requests.append(now)
+                self._tokens.append((now, tokens))
+                self._token_sum += tokens
+                return
+
+    async def _release(self, slot, estimated_tokens):
+        async with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if slot.outcome == 'success':
+                self.stats['success'] += 1
+                if slot.tokens_used is not None and slot.tokens_used != estimated_tokens:
+                    delta = slot.tokens_used - estimated_tokens
+                    self._tokens.append((now, delta))
+                    self._token_sum += delta
+                if self.limit < self.max_concurrency:
+                    self.limit = min(self.max_concurrency, self.limit + self.increase_step / self.limit)
+                    self.stats['increases'] += 1
+            elif slot.outcome == 'throttled':
+                self.stats['throttled'] += 1
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._last_decrease = now
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                    self.stats['decreases'] += 1
+                    logger.warning(f"[{self.name}] 触发限流，并发上限降至 {self.limit:.2f}")
+            else:
+                self.stats['errors'] += 1
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, tokens=0):
+        """占用一个调用名额
+
+        Args:
+            tokens (int, optional): 本次调用预估的token数
+
+        Yields:
+            LimiterSlot: 调用方通过 success()/throttled() 回报结果，未回报视为普通错误
+        """
+        await self._acquire(tokens)
+        slot = LimiterSlot()
+        try:
+            yield slot
+        finally:
+            await self._release(slot, tokens)
+
+    def metrics(self):
+        """返回当前限流状态"""
+        self._purge(time.monotonic())
+        return {
+            'name': self.name,
+            'concurrency_limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            'requests_last_minute': len(self._requests),
+            'tokens_last_minute': self._token_sum,
+            'rpm_limit': self.rpm,
+            'tpm_limit': self.tpm,
+            **self.stats
+        }
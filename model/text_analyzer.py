@@ -4,12 +4,17 @@ import logging
 
 import json
 import os
+import random
 import re
 import time
+from collections import deque
 
 import httpx
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, APIStatusError, APITimeoutError, RateLimitError
+
+from model.rate_limiter import LimiterSlot
 
 # os.environ["http_proxy"] = "http://192.168.11.51:11434"
 # os.environ["https_proxy"] = "http://192.168.11.51:11434"
@@ -17,19 +22,142 @@ logger = logging.getLogger('text_analyzer')
 
 load_dotenv()
 
-class TextAnalyzer:
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 视为后端限流/过载的状态码
+THROTTLE_STATUS_CODES = (429, 503)
+
+CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]')
+
+
+def estimate_tokens(text):
+    """粗略估算文本的token数量
+
+    中日韩字符按每字 1 个 token 计，其余字符按约 4 个字符 1 个 token 计，
+    只用于批量打包时控制 prompt 大小。
+    """
+    if not text:
+        return 0
+    cjk_count = len(CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """指数退避加全抖动的等待时间
+
+    Args:
+        attempt (int): 已失败次数，从 0 开始
+        base (float, optional): 基础等待秒数
+        cap (float, optional): 最大等待秒数
+
+    Returns:
+        float: 本次等待秒数
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+@asynccontextmanager
+async def _unlimited_slot():
+    yield LimiterSlot()
+
+
+def _usage_tokens(response):
+    """从 OpenAI 兼容接口的 HTTP 响应中读取实际消耗的token数"""
+    try:
+        return response.json().get("usage", {}).get("total_tokens")
+    except Exception:
+        return None
+
+
+class BaseAnalyzer:
+    """分析器基类，提供基于 analyze_text 的批量分析能力"""
+
+    async def analyze_text(self, prompt_template, **kwargs):
+        raise NotImplementedError
+
+    def pack_batches(self, items, token_budget, max_items):
+        """按token预算将多条文本打包成批
+
+        Args:
+            items (list): (key, text) 元组列表
+            token_budget (int): 每批文本的token上限
+            max_items (int): 每批最多包含的文本条数
+
+        Returns:
+            list: 批次列表，每个批次为 (key, text) 元组列表
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        for key, text in items:
+            tokens = estimate_tokens(text)
+            if current and (len(current) >= max_items or current_tokens + tokens > token_budget):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append((key, text))
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def analyze_batch(self, batch_template, single_template, batch):
+        """一次调用分析多条文本，结果按文本编号拆分回每条文本
+
+        批量结果中缺失或格式不正确的文本，单独使用 single_template 重新分析。
+
+        Args:
+            batch_template (str): 批量提取模板，包含 <tweets> 占位符
+            single_template (str): 单条提取模板，包含 <text> 占位符
+            batch (list): (key, text) 元组列表
+
+        Returns:
+            dict: 以 key 为键的分析结果，分析失败的为 {}
+        """
+        results = {}
+        if len(batch) > 1:
+            formatted = "\n\n".join(f"Tweet {idx}: {text}" for idx, (_, text) in enumerate(batch, start=1))
+            response = await self.analyze_text(batch_template, tweets=formatted)
+            batch_results = response.get("results", {}) if isinstance(response, dict) else {}
+            if not isinstance(batch_results, dict):
+                batch_results = {}
+            for idx, (key, _) in enumerate(batch, start=1):
+                item = batch_results.get(str(idx))
+                if isinstance(item, dict) and "project" in item and "token" in item:
+                    results[key] = item
+
+        missing = [(key, text) for key, text in batch if key not in results]
+        if missing and len(batch) > 1:
+            logger.warning(f"批量分析缺失 {len(missing)}/{len(batch)} 条结果，改为单条分析")
+        singles = await asyncio.gather(*(self.analyze_text(single_template, text=text) for _, text in missing))
+        for (key, _), result in zip(missing, singles):
+            results[key] = result
+        return results
 
-    def __init__(self, config):
+
+class TextAnalyzer(BaseAnalyzer):
+
+    def __init__(self, config, cache=None, limiter=None):
         """初始化文本分析器
 
         Args:
             config (dict): 包含 api_key, base_url, model 的配置
+            cache (LLMCache, optional): LLM响应缓存，为None时不缓存
+            limiter (AdaptiveLimiter, optional): 自适应限流器，为None时不限流
         """
         self.config = config
         self.model = config["model"]
+        self.cache = cache
+        self.limiter = limiter
         self.is_ollama = "localhost" in config["base_url"] or "192." in config["base_url"] or "127." in config[
             "base_url"]
 
+        self.client = None
+        self.http_client = None
         if not self.is_ollama:
             # 仅在非 Ollama 时使用 OpenAI SDK
             self.client = AsyncOpenAI(
@@ -45,17 +173,67 @@ class TextAnalyzer:
             for key, value in kwargs.items():
                 prompt = prompt.replace(f"<{key}>", str(value))
 
+            if self.cache:
+                cached = await self.cache.aget(self.model, prompt)
+                if cached is not None:
+                    logger.info("命中LLM缓存")
+                    return cached
+
             if self.is_ollama:
                 logger.info(prompt)
-                return await self._analyze_with_ollama(prompt)
+                result = await self._analyze_with_ollama(prompt)
             else:
                 logger.info(prompt)
-                return await self._analyze_with_openai(prompt)
+                result = await self._analyze_with_openai(prompt)
+
+            if self.cache and result:
+                await self.cache.aset(self.model, prompt, result)
+            return result
 
         except Exception as e:
             logger.error(f"文本解析失败: {str(e)}")
             return {}
 
+    def metrics(self):
+        """返回分析器运行状态"""
+        return {
+            'model': self.model,
+            'limiter': self.limiter.metrics() if self.limiter else None
+        }
+
+    def _limiter_slot(self, prompt):
+        """为一次 LLM 调用占用限流名额"""
+        if self.limiter is None:
+            return _unlimited_slot()
+        return self.limiter.slot(estimate_tokens(prompt))
+
+    def _get_http_client(self):
+        """获取长连接复用的 HTTP 客户端，所有 Ollama 请求共享同一个连接池"""
+        if self.http_client is None or self.http_client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.config.get('max_connections', 20),
+                max_keepalive_connections=self.config.get('max_keepalive_connections', 10),
+                keepalive_expiry=self.config.get('keepalive_expiry', 60)
+            )
+            self.http_client = httpx.AsyncClient(
+                timeout=self.config.get('timeout', 60),
+                limits=limits,
+                http2=HTTP2_AVAILABLE
+            )
+        return self.http_client
+
+    async def aclose(self):
+        """关闭分析器持有的 HTTP 连接"""
+        if self.http_client is not None and not self.http_client.is_closed:
+            await self.http_client.aclose()
+        self.http_client = None
+        if self.client is not None:
+            try:
+                await self.client.close()
+            except Exception as e:
+                logger.warning(f"关闭 OpenAI 客户端出错: {str(e)}")
+            self.client = None
+
     def _extract_json_from_response(self, text):
         cleaned = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
         json_match = re.search(r"```json\s*(.*?)\s*```", cleaned, re.DOTALL | re.IGNORECASE)
@@ -69,14 +247,25 @@ class TextAnalyzer:
             raise
 
     async def _analyze_with_openai(self, prompt):
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            stream=False,
-            response_format={"type": "json_object"}
-        )
+        async with self._limiter_slot(prompt) as slot:
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    stream=False,
+                    response_format={"type": "json_object"}
+                )
+            except (RateLimitError, APITimeoutError):
+                slot.throttled()
+                raise
+            except APIStatusError as e:
+                if e.status_code in THROTTLE_STATUS_CODES:
+                    slot.throttled()
+                raise
+            usage = getattr(response, "usage", None)
+            slot.success(getattr(usage, "total_tokens", None))
         res = response.choices[0].message.content
         print(res)
         return json.loads(res) if res else {}
@@ -96,63 +285,252 @@ class TextAnalyzer:
 
         # 设置最大重试次数
         max_retries = 3
+        client = self._get_http_client()
         for attempt in range(max_retries):
-            async with httpx.AsyncClient(timeout=60) as client:
-                try:
-                    response = await client.post(url, json=payload, headers=headers)
+            try:
+                async with self._limiter_slot(prompt) as slot:
+                    try:
+                        response = await client.post(url, json=payload, headers=headers)
+                    except httpx.TimeoutException:
+                        slot.throttled()
+                        raise
+                    if response.status_code in THROTTLE_STATUS_CODES:
+                        slot.throttled()
                     response.raise_for_status()
-                except httpx.RequestError as e:
-                    logger.error(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {e}")
-                    if attempt < max_retries - 1:  # 如果不是最后一次尝试
-                        time.sleep(2)  # 等待 2 秒后重试
-                        continue
-                    else:
-                        logger.error("达到最大重试次数，返回空数据")
-                        return {}
-
-                except httpx.HTTPStatusError as e:
-                    logger.error(f"接口返回错误状态码 (尝试 {attempt + 1}/{max_retries}): {e.response.status_code}, 内容: {e.response.text}")
-                    if attempt < max_retries - 1:
-                        time.sleep(2)
-                        continue
-                    else:
-                        logger.error("失败达到最大重试次数，返回空数据")
-                        return {}
-
-                try:
-                    result = response.json()
-                except Exception as e:
-                    logger.error(f"响应无法解析为 JSON (尝试 {attempt + 1}/{max_retries}): {response.text[:200]}... 错误: {str(e)}")
-                    if attempt < max_retries - 1:
-                        time.sleep(2)
-                        continue
-                    else:
-                        logger.error("失败达到最大重试次数，返回空数据")
-                        return {}
-
-                try:
-                    content = result["choices"][0]["message"]["content"]
-                    json_text = self._extract_json_from_response(content)
-                    logger.info(json_text)
-                    return json_text
-
-                except (KeyError, IndexError) as e:
-                    logger.error(f"Ollama 返回格式缺失字段 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
-                    if attempt < max_retries - 1:
-                        continue
-                    else:
-                        logger.error("失败达到最大重试次数，返回空数据")
-                        return {}
-
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON 解析失败 (尝试 {attempt + 1}/{max_retries}): {e.msg} at line {e.lineno} column {e.colno} (char {e.pos})")
-                    if attempt < max_retries - 1:
-                        continue
-                    else:
-                        logger.error("失败达到最大重试次数，返回空数据")
-                        return {}
+                    slot.success(_usage_tokens(response))
+            except httpx.RequestError as e:
+                logger.error(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:  # 如果不是最后一次尝试
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                else:
+                    logger.error("达到最大重试次数，返回空数据")
+                    return {}
+
+            except httpx.HTTPStatusError as e:
+                logger.error(f"接口返回错误状态码 (尝试 {attempt + 1}/{max_retries}): {e.response.status_code}, 内容: {e.response.text}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                else:
+                    logger.error("失败达到最大重试次数，返回空数据")
+                    return {}
+
+            try:
+                result = response.json()
+            except Exception as e:
+                logger.error(f"响应无法解析为 JSON (尝试 {attempt + 1}/{max_retries}): {response.text[:200]}... 错误: {str(e)}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                else:
+                    logger.error("失败达到最大重试次数，返回空数据")
+                    return {}
+
+            try:
+                content = result["choices"][0]["message"]["content"]
+                json_text = self._extract_json_from_response(content)
+                logger.info(json_text)
+                return json_text
+
+            except (KeyError, IndexError) as e:
+                logger.error(f"Ollama 返回格式缺失字段 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
+                if attempt < max_retries - 1:
+                    continue
+                else:
+                    logger.error("失败达到最大重试次数，返回空数据")
+                    return {}
+
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON 解析失败 (尝试 {attempt + 1}/{max_retries}): {e.msg} at line {e.lineno} column {e.colno} (char {e.pos})")
+                if attempt < max_retries - 1:
+                    continue
+                else:
+                    logger.error("失败达到最大重试次数，返回空数据")
+                    return {}
 
         return {}
 
 
+class ProviderHealth:
+    """单个模型提供方的健康状态与熔断器"""
+
+    def __init__(self, name, failure_threshold=3, open_seconds=60, latency_window=100):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.score = 1.0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.half_open_trial = False
+        self.latencies = deque(maxlen=latency_window)
+        self.stats = {'success': 0, 'failure': 0, 'hedged': 0, 'hedge_wins': 0}
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.open_seconds:
+            return 'half_open'
+        return 'open'
+
+    def available(self):
+        """熔断打开时不可用，半开状态只放行一个试探请求"""
+        state = self.state
+        return state == 'closed' or (state == 'half_open' and not self.half_open_trial)
+
+    def record_success(self, latency):
+        self.latencies.append(latency)
+        self.score = self.score * 0.8 + 0.2
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.half_open_trial = False
+        self.stats['success'] += 1
+
+    def record_failure(self):
+        self.score = self.score * 0.8
+        self.consecutive_failures += 1
+        self.stats['failure'] += 1
+        if self.half_open_trial or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None or self.half_open_trial:
+                logger.warning(f"模型 {self.name} 连续失败 {self.consecutive_failures} 次，熔断 {self.open_seconds} 秒")
+            self.opened_at = time.monotonic()
+            self.half_open_trial = False
+
+    def p95_latency(self, min_samples=10):
+        """最近请求耗时的 p95，样本不足时返回 None"""
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def metrics(self):
+        p95 = self.p95_latency(min_samples=1)
+        return {
+            'state': self.state,
+            'score': round(self.score, 3),
+            'consecutive_failures': self.consecutive_failures,
+            'p95_latency': round(p95, 3) if p95 is not None else None,
+            **self.stats
+        }
+
+
+class ProviderRouter(BaseAnalyzer):
+    """多模型路由
+
+    按配置顺序选择健康的模型提供方，失败时依次故障转移；开启对冲后，主提供方
+    超过其 p95 耗时仍未返回时，向下一个健康的提供方发送同一 prompt，取先返回的结果。
+    """
+
+    def __init__(self, analyzers, config=None):
+        """初始化路由
+
+        Args:
+            analyzers (list): 按优先级排序的 TextAnalyzer 列表
+            config (dict, optional): 包含 hedge_enabled, hedge_delay_seconds, hedge_min_delay_seconds,
+                failure_threshold, open_seconds 的配置
+        """
+        if not analyzers:
+            raise ValueError("至少需要一个模型提供方")
+        config = config or {}
+        self.analyzers = analyzers
+        self.model = analyzers[0].model
+        self.hedge_enabled = config.get('hedge_enabled', False)
+        self.hedge_delay = config.get('hedge_delay_seconds', 20)
+        self.hedge_min_delay = config.get('hedge_min_delay_seconds', 2)
+        self.health = [
+            ProviderHealth(
+                analyzer.model,
+                failure_threshold=config.get('failure_threshold', 3),
+                open_seconds=config.get('open_seconds', 60)
+            )
+            for analyzer in analyzers
+        ]
+        logger.info(f"模型路由初始化完成，提供方顺序: {[a.model for a in analyzers]}，对冲: {self.hedge_enabled}")
+
+    def _candidates(self):
+        """按优先级返回当前允许请求的提供方下标，全部熔断时退回全部提供方"""
+        allowed = [idx for idx, health in enumerate(self.health) if health.available()]
+        return allowed or list(range(len(self.analyzers)))
+
+    async def _call(self, idx, prompt_template, kwargs):
+        health = self.health[idx]
+        if health.state == 'half_open':
+            health.half_open_trial = True
+        started = time.monotonic()
+        try:
+            result = await self.analyzers[idx].analyze_text(prompt_template, **kwargs)
+        except asyncio.CancelledError:
+            # 对冲中被取消的请求不计入健康统计
+            health.half_open_trial = False
+            raise
+        if result:
+            self.health[idx].record_success(time.monotonic() - started)
+        else:
+            self.health[idx].record_failure()
+        return result
+
+    def _hedge_delay_for(self, idx):
+        p95 = self.health[idx].p95_latency()
+        delay = p95 if p95 is not None else self.hedge_delay
+        return max(self.hedge_min_delay, delay)
+
+    async def _hedged_call(self, primary, secondary, prompt_template, kwargs):
+        """先请求主提供方，超过对冲阈值后同时请求备用提供方，取先成功的结果"""
+        primary_task = asyncio.ensure_future(self._call(primary, prompt_template, kwargs))
+        done, _ = await asyncio.wait({primary_task}, timeout=self._hedge_delay_for(primary))
+        if done:
+            return primary_task.result(), False
+
+        self.health[secondary].stats['hedged'] += 1
+        secondary_task = asyncio.ensure_future(self._call(secondary, prompt_template, kwargs))
+        pending = {primary_task, secondary_task}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result:
+                        if task is secondary_task:
+                            self.health[secondary].stats['hedge_wins'] += 1
+                        return result, True
+            return {}, True
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def analyze_text(self, prompt_template, **kwargs):
+        """按路由策略分析文本，所有提供方都失败时返回 {}"""
+        candidates = self._candidates()
+        tried = set()
+        try:
+            if self.hedge_enabled and len(candidates) > 1:
+                primary, secondary = candidates[0], candidates[1]
+                result, hedged = await self._hedged_call(primary, secondary, prompt_template, kwargs)
+                if result:
+                    return result
+                tried.add(primary)
+                if hedged:
+                    tried.add(secondary)
+
+            for idx in candidates:
+                if idx in tried:
+                    continue
+                result = await self._call(idx, prompt_template, kwargs)
+                if result:
+                    return result
+                logger.warning(f"模型 {self.analyzers[idx].model} 分析失败，尝试下一个提供方")
+        except Exception as e:
+            logger.error(f"模型路由分析失败: {str(e)}")
+        return {}
+
+    def metrics(self):
+        """返回各提供方的健康状态与限流状态"""
+        return {
+            analyzer.model: {**health.metrics(), **analyzer.metrics()}
+            for analyzer, health in zip(self.analyzers, self.health)
+        }
 
+    async def aclose(self):
+        for analyzer in self.analyzers:
+            await analyzer.aclose()
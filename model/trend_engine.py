@@ -0,0 +1,210 @@
+import heapq
+import logging
+import math
+import time
+from array import array
+
+logger = logging.getLogger('trend_engine')
+
+MINUTE_BINS = 1440
+HOUR_BINS = 168
+# 窗口名称 -> 分钟数，7d 由小时环形缓冲区计算
+WINDOWS = {'1h': 60, '6h': 360, '24h': 1440, '7d': 10080}
+MINUTE_WINDOWS = (60, 120, 360, 1440)
+SCORES = ('count', 'velocity', 'acceleration', 'zscore')
+
+
+class ProjectCounter:
+    """单个项目的滑动窗口计数器
+
+    最近 24 小时按分钟计数，最近 7 天按小时计数，均为定长环形缓冲区；各窗口的合计随时间推进
+    增量维护（新的一分钟进入时减去移出窗口的那一分钟），查询为 O(1)。小时计数同时维护
+    平方和，用于计算基线的均值和标准差。
+    """
+
+    __slots__ = ('minutes', 'hours', 'minute', 'hour', 'totals', 'hour_sum', 'hour_sumsq')
+
+    def __init__(self, minute, hour):
+        self.minutes = array('I', bytes(4 * MINUTE_BINS))
+        self.hours = array('I', bytes(4 * HOUR_BINS))
+        self.minute = minute
+        self.hour = hour
+        self.totals = dict.fromkeys(MINUTE_WINDOWS, 0)
+        self.hour_sum = 0
+        self.hour_sumsq = 0
+
+    def advance(self, minute):
+        """把分钟缓冲区推进到 minute，移出窗口的计数从各窗口合计中减去"""
+        if minute <= self.minute:
+            return
+        if minute - self.minute >= MINUTE_BINS:
+            self.minutes = array('I', bytes(4 * MINUTE_BINS))
+            self.totals = dict.fromkeys(MINUTE_WINDOWS, 0)
+        else:
+            for m in range(self.minute + 1, minute + 1):
+                for window in MINUTE_WINDOWS:
+                    self.totals[window] -= self.minutes[(m - window) % MINUTE_BINS]
+                self.minutes[m % MINUTE_BINS] = 0
+        self.minute = minute
+        self._advance_hour(minute // 60)
+
+    def _advance_hour(self, hour):
+        if hour <= self.hour:
+            return
+        if hour - self.hour >= HOUR_BINS:
+            self.hours = array('I', bytes(4 * HOUR_BINS))
+            self.hour_sum = 0
+            self.hour_sumsq = 0
+        else:
+            for h in range(self.hour + 1, hour + 1):
+                old = self.hours[h % HOUR_BINS]
+                self.hour_sum -= old
+                self.hour_sumsq -= old * old
+                self.hours[h % HOUR_BINS] = 0
+        self.hour = hour
+
+    def add(self, minute, count=1):
+        """在 minute 所在的分钟（不早于 24 小时前）增加计数，调用前需已推进到当前分钟"""
+        if self.minute - minute < MINUTE_BINS:
+            self.minutes[minute % MINUTE_BINS] += count
+            for window in MINUTE_WINDOWS:
+                if self.minute - minute < window:
+                    self.totals[window] += count
+        self.add_hour(minute // 60, count)
+
+    def add_hour(self, hour, count):
+        """在 hour 所在的小时（不早于 7 天前）增加计数，只影响 7 天窗口和基线"""
+        if self.hour - hour >= HOUR_BINS or hour > self.hour:
+            return
+        old = self.hours[hour % HOUR_BINS]
+        self.hours[hour % HOUR_BINS] = old + count
+        self.hour_sum += count
+        self.hour_sumsq += (old + count) ** 2 - old * old
+
+    def count(self, minutes):
+        if minutes > MINUTE_BINS:
+            return self.hour_sum
+        return self.totals[minutes]
+
+    def baseline(self):
+        """返回过去 7 天已结束小时的每小时提及数均值和标准差（不含当前小时）"""
+        current = self.hours[self.hour % HOUR_BINS]
+        n = HOUR_BINS - 1
+        total = self.hour_sum - current
+        mean = total / n
+        variance = max((self.hour_sumsq - current * current) / n - mean * mean, 0.0)
+        return mean, math.sqrt(variance)
+
+
+class TrendEngine:
+    """多时间窗口（1h/6h/24h/7d）项目热度引擎
+
+    由结构化后的KOL推文实时喂入项目提及，每个项目一个 ProjectCounter。除窗口计数外提供：
+    velocity 为最近 1 小时提及数（次/小时），acceleration 为最近 1 小时与前 1 小时之差，
+    zscore 为最近 1 小时相对过去 7 天每小时基线的标准分。top_k 对活跃项目做一次大小为 K
+    的堆选择。7 天内没有提及的项目会被清除，内存只与活跃项目数成正比。
+    """
+
+    def __init__(self, min_std=1.0):
+        """初始化引擎
+
+        Args:
+            min_std (float, optional): 计算 z-score 时标准差的下限，避免冷门项目偶发一次提及得到极大分数
+        """
+        self.min_std = min_std
+        self._counters = {}
+        self.stats = {
+            'mentions': 0,
+            'evicted': 0
+        }
+
+    @staticmethod
+    def _minute(ts=None):
+        return int(ts if ts is not None else time.time()) // 60
+
+    def add(self, project_name, ts=None, count=1):
+        """记录一次项目提及
+
+        Args:
+            project_name (str): 项目名称
+            ts (int, optional): 提及时间戳，默认当前时间；晚于当前时间的按当前时间计
+            count (int, optional): 提及次数
+        """
+        if not project_name:
+            return
+        now = self._minute()
+        minute = min(self._minute(ts), now)
+        counter = self._counters.get(project_name)
+        if counter is None:
+            counter = self._counters[project_name] = ProjectCounter(now, now // 60)
+        counter.advance(now)
+        counter.add(minute, count)
+        self.stats['mentions'] += count
+
+    def load_hourly(self, rows, now=None):
+        """用小时汇总数据预热 7 天窗口和基线，分钟窗口只能由实时提及填充
+
+        Args:
+            rows (list): (小时开始时间戳, 项目名称, 提及次数) 列表
+            now (int, optional): 当前时间戳
+        """
+        minute = self._minute(now)
+        for bucket_hour, project_name, count in rows:
+            counter = self._counters.get(project_name)
+            if counter is None:
+                counter = self._counters[project_name] = ProjectCounter(minute, minute // 60)
+            counter.advance(minute)
+            counter.add_hour(int(bucket_hour) // 3600, int(count))
+
+    def _scores(self, counter, window):
+        last_hour = counter.count(60)
+        mean, std = counter.baseline()
+        return {
+            'count': counter.count(WINDOWS[window]),
+            'velocity': last_hour,
+            'acceleration': last_hour - (counter.count(120) - last_hour),
+            'zscore': round((last_hour - mean) / max(std, self.min_std), 2),
+            'baseline': round(mean, 2)
+        }
+
+    def score(self, project_name, window='1h'):
+        """返回单个项目在窗口内的计数和热度指标，项目不存在时返回 None"""
+        counter = self._counters.get(project_name)
+        if counter is None:
+            return None
+        counter.advance(self._minute())
+        return {'name': project_name, **self._scores(counter, window)}
+
+    def top_k(self, window='1h', k=10, by='count', min_count=1):
+        """返回窗口内按指定指标排序的前 K 个项目
+
+        Args:
+            window (str, optional): 窗口，1h/6h/24h/7d
+            k (int, optional): 返回数量
+            by (str, optional): 排序指标，count/velocity/acceleration/zscore
+            min_count (int, optional): 窗口内最少提及次数
+
+        Returns:
+            list[dict]: [{"name", "count", "velocity", "acceleration", "zscore", "baseline"}]
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"不支持的窗口: {window}")
+        if by not in SCORES:
+            raise ValueError(f"不支持的排序指标: {by}")
+        now = self._minute()
+        candidates = []
+        for name, counter in list(self._counters.items()):
+            counter.advance(now)
+            if counter.hour_sum == 0:
+                del self._counters[name]
+                self.stats['evicted'] += 1
+                continue
+            if counter.count(WINDOWS[window]) < min_count:
+                continue
+            candidates.append((name, self._scores(counter, window)))
+        top = heapq.nlargest(k, candidates, key=lambda item: (item[1][by], item[1]['count']))
+        return [{'name': name, **scores} for name, scores in top]
+
+    def metrics(self):
+        """返回引擎统计"""
+        return {'projects': len(self._counters), **self.stats}
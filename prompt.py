@@ -21,6 +21,31 @@ token(type: list[str]): Ticker symbols or token names (e.g., BTC, ETH, PEPE).
 Always include all keys in the JSON result
 """
 
+kol_tweets_batch_template ="""You are given a list of Web3-related tweets from KOLs, each prefixed with its tweet id:
+<tweets>
+
+Task: For **each tweet independently**, extract **all explicitly mentioned Web3 projects and tokens** in that tweet.
+- Do NOT infer, guess, or include anything not directly mentioned in that tweet.
+- Do NOT carry mentions over from one tweet to another.
+- Only extract mentions of protocols, platforms, projects, companies, or tokens that appear in the text.
+- The extracted items and tokens can only be in English numbers.
+
+Return your result in the **strict JSON format** below, keyed by tweet id, with one entry for every tweet id:
+
+{
+  "results": {
+    "1": {"project": [], "token": []},
+    "2": {"project": [], "token": []}
+  }
+}
+
+Instructions:
+project(type: list[str]): Names of protocols, platforms, companies (e.g., uniswap, coinbase, ethereum).
+token(type: list[str]): Ticker symbols or token names (e.g., BTC, ETH, PEPE).
+
+Always include all keys in the JSON result
+"""
+
 # tweet_summary_template = """
 # 你的任务是分析并总结过去1小时内的KOL推文，内容如下：
 #
@@ -141,4 +166,39 @@ tweet_summary_template = """
       }
     ]
 }
-"""
\ No newline at end of file
+"""
+
+
+tweet_summary_merge_template = """
+以下是过去1小时KOL推文分批总结得到的事件列表，每个事件以事件编号开头（例如 E1），不同批次之间可能存在重复或重叠的事件：
+
+<events>
+
+请按照以下步骤合并这些事件：
+
+1. **合并重复事件**
+- 描述同一件事（同一项目/代币的同一动作、同一公告或同一市场事件）的事件合并为一个统一事件；
+- 不同的事件不要合并，也不要新增列表中不存在的事件。
+
+2. **重写事件描述**
+- 合并后的事件用完整可读的中文句子描述，综合被合并事件的全部信息；
+- 对项目/代币名称进行归一化处理（例如：统一“ETH”和“Ethereum”为同一表述）；
+- summary 综合被合并事件的总结。
+
+3. **记录来源事件**
+- source_events 中列出合并进该事件的所有事件编号，每个输入事件必须且只能出现在一个输出事件的 source_events 中。
+
+4. **输出格式**
+   最终结果以JSON格式返回，结构严格遵循以下示例：
+```json
+{
+    "events":[
+      {
+        "event": "用完整可读的中文句子描述事件，确保信息完整",
+        "source_events": ["E1", "E3"],
+        "projects": ["事件关联的项目/代币1", "事件关联的项目/代币2"],
+        "summary": "对合并后的事件进行总结"
+      }
+    ]
+}
+"""
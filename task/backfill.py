@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+logger = logging.getLogger('backfill')
+
+
+class SummaryBackfill:
+    """KOL推文小时总结回补
+
+    把任意时间范围切成固定长度的窗口，已完成的窗口记录在 kol_summary_backfill 表中，
+    重新运行时跳过。窗口推文由一个预取协程按顺序提前读取（最多领先 prefetch 个窗口），
+    多个工作协程在并发上限内同时总结，LLM 处理当前窗口时下一个窗口的推文已在内存中。
+    """
+
+    def __init__(self, processor, concurrency=4, prefetch=2, window_seconds=3600):
+        """初始化回补任务
+
+        Args:
+            processor (DataProcessor): 数据处理器，提供数据库访问和 _summarize_window
+            concurrency (int, optional): 同时总结的窗口数
+            prefetch (int, optional): 预取推文领先的窗口数
+            window_seconds (int, optional): 窗口长度（秒）
+        """
+        self.processor = processor
+        self.concurrency = max(1, concurrency)
+        self.prefetch = max(1, prefetch)
+        self.window_seconds = window_seconds
+
+    def windows(self, start_ts, end_ts):
+        """将 [start_ts, end_ts) 切分为窗口列表"""
+        windows = []
+        current = start_ts
+        while current < end_ts:
+            windows.append((current, min(current + self.window_seconds, end_ts)))
+            current += self.window_seconds
+        return windows
+
+    async def run(self, start_ts, end_ts):
+        """回补 [start_ts, end_ts) 内所有未完成的窗口
+
+        Returns:
+            dict: 各状态的窗口数
+        """
+        db = self.processor.async_mysql
+        windows = self.windows(start_ts, end_ts)
+        completed = await db.get_completed_backfill_windows(start_ts, end_ts)
+        pending = [window for window in windows if window not in completed]
+        stats = {'total': len(windows), 'skipped': len(windows) - len(pending), 'done': 0, 'failed': 0}
+        logger.info(f"回补 {start_ts} - {end_ts}：共 {len(windows)} 个窗口，跳过已完成 {stats['skipped']} 个，"
+                    f"并发 {self.concurrency}，预取 {self.prefetch}")
+        if not pending:
+            return stats
+
+        queue = asyncio.Queue(maxsize=self.prefetch)
+
+        async def producer():
+            for window in pending:
+                try:
+                    tweets = await db.get_target_kol_tweets(*window)
+                except Exception as e:
+                    logger.error(f"读取窗口 {window} 推文失败: {str(e)}")
+                    tweets = None
+                await queue.put((window, tweets))
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                window, tweets = item
+                try:
+                    if tweets is None:
+                        raise RuntimeError("推文读取失败")
+                    await self.processor._summarize_window(window[0], window[1], tweets)
+                    await db.mark_backfill_window_done(*window)
+                    stats['done'] += 1
+                    logger.info(f"回补窗口 {window} 完成（{stats['done']}/{len(pending)}）")
+                except Exception as e:
+                    stats['failed'] += 1
+                    logger.error(f"回补窗口 {window} 失败，下次运行时重试: {str(e)}")
+
+        await asyncio.gather(producer(), *(worker() for _ in range(self.concurrency)))
+        logger.info(f"回补结束: {stats}")
+        return stats
@@ -0,0 +1,109 @@
+import bisect
+import logging
+
+logger = logging.getLogger('kol_progress')
+
+IN_FLIGHT = 'in_flight'
+SETTLED = 'settled'
+RETRY = 'retry'
+
+
+class KolTweetsProgress:
+    """KOL 推文处理进度跟踪器
+
+    推文按 (tweet_date, twitter_id) 顺序登记，并发分析时可能乱序完成。游标只会推进到
+    “连续已落库（或已放弃）”的前缀末尾，游标之后已完成的推文会被记住，
+    下次拉取时跳过，避免漏处理或重复处理。
+    """
+
+    def __init__(self, watermark, max_retries=3):
+        """初始化进度跟踪器
+
+        Args:
+            watermark (tuple): 初始游标 (tweet_date, twitter_id)，twitter_id 为None时
+                表示从 tweet_date 之后开始
+            max_retries (int, optional): 单条推文分析/保存失败的最大重试次数
+        """
+        self.watermark = watermark
+        self.max_retries = max_retries
+        # 按 (tweet_date, twitter_id) 排序的待推进条目
+        self._entries = []
+        self._states = {}
+        self._failures = {}
+
+    @staticmethod
+    def cursor_of(tweet):
+        """推文对应的游标位置"""
+        return int(tweet['tweet_date']), tweet['twitter_id']
+
+    def track(self, tweets):
+        """登记新拉取的推文，返回需要处理的推文
+
+        已在处理中或已完成的推文会被过滤掉，之前失败待重试的推文会重新返回。
+
+        Args:
+            tweets (list): 推文列表，需包含 twitter_id 与 tweet_date
+
+        Returns:
+            list: 本次需要处理的推文
+        """
+        pending = []
+        for tweet in tweets:
+            key = tweet['twitter_id']
+            state = self._states.get(key)
+            if state in (IN_FLIGHT, SETTLED):
+                continue
+            if state is None:
+                bisect.insort(self._entries, self.cursor_of(tweet))
+            self._states[key] = IN_FLIGHT
+            pending.append(tweet)
+        return pending
+
+    def settle(self, key):
+        """标记推文已落库"""
+        self._states[key] = SETTLED
+        self._failures.pop(key, None)
+
+    def fail(self, key):
+        """标记推文处理失败
+
+        未超过重试次数时推文留在游标之后等待下次拉取重试，超过后放弃并视为已完成。
+
+        Returns:
+            bool: 是否已放弃该推文
+        """
+        count = self._failures.get(key, 0) + 1
+        if count >= self.max_retries:
+            logger.warning(f"推文 {key} 连续失败 {count} 次，放弃处理")
+            self.settle(key)
+            return True
+        self._failures[key] = count
+        self._states[key] = RETRY
+        return False
+
+    def has_unsettled(self):
+        """游标之后是否还有未完成的推文"""
+        return bool(self._entries)
+
+    def has_retry(self):
+        """游标之后是否有失败待重试的推文"""
+        return RETRY in self._states.values()
+
+    def advance(self):
+        """将游标推进到连续已完成前缀的末尾
+
+        Returns:
+            tuple: 推进后的游标 (tweet_date, twitter_id)
+        """
+        idx = 0
+        while idx < len(self._entries) and self._states.get(self._entries[idx][1]) == SETTLED:
+            idx += 1
+        if idx == 0:
+            return self.watermark
+
+        self.watermark = self._entries[idx - 1]
+        for _, key in self._entries[:idx]:
+            self._states.pop(key, None)
+            self._failures.pop(key, None)
+        self._entries = self._entries[idx:]
+        return self.watermark
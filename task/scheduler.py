@@ -1,14 +1,30 @@
 import json
 import logging
 import asyncio
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from zoneinfo import ZoneInfo
 
 
 from prompt import *
 from database.db_manager import MySQLManager, MongoDBManager
-from model.text_analyzer import TextAnalyzer
+from database.async_db_manager import AsyncMySQLManager
+from database.kol_tweet_writer import KolTweetWriter
+from database.project_index import ProjectTagIndex
+from database.dossier_store import build_dossiers
+from model.text_analyzer import TextAnalyzer, ProviderRouter
+from model.llm_cache import LLMCache
+from model.rate_limiter import AdaptiveLimiter
+from model.entity_extractor import EntityExtractor
+from model.dedup import NearDuplicateDetector
+from model.trend_engine import TrendEngine
+from task.kol_progress import KolTweetsProgress
+from task.backfill import SummaryBackfill
 from tg_bot.bot import send_message, tg_bot
-from utils.format_msg import replace_newlines_with_space, format_kol_day_count, format_kol_hour_message
+from utils.format_msg import replace_newlines_with_space, format_kol_day_count, format_kol_hour_message, \
+    format_trend_alert
+from utils.loop_monitor import LoopLagMonitor
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
@@ -22,7 +38,8 @@ logging.getLogger("apscheduler.executors").setLevel(logging.ERROR)
 class DataProcessor:
     """数据处理器，负责从数据源获取数据并进行处理"""
 
-    def __init__(self, mysql_config, mongo_config, openai_config, task_config):
+    def __init__(self, mysql_config, mongo_config, openai_config, task_config, llm_cache_config=None,
+                 llm_rate_limit_config=None, fallback_configs=None, router_config=None, dossier_store_config=None):
         """初始化数据处理器
 
         Args:
@@ -30,19 +47,84 @@ class DataProcessor:
             mongo_config (dict): MongoDB配置
             openai_config (dict): OpenAI配置
             task_config (dict): 任务配置
+            llm_cache_config (dict, optional): LLM响应缓存配置，为None或未启用时不缓存
+            llm_rate_limit_config (dict, optional): LLM自适应限流配置，为None或未启用时不限流
+            fallback_configs (list, optional): 按优先级排序的备用模型配置
+            router_config (dict, optional): 模型路由配置（熔断、对冲）
+            dossier_store_config (dict, optional): 项目信息物化表配置，为None或未启用时不定时构建
         """
+        self.mysql_config = mysql_config
+        self.mongo_config = mongo_config
+        self.dossier_store_config = dossier_store_config or {}
         self.mysql_manager = MySQLManager(mysql_config)
+        # 调度任务中的数据库调用都通过线程池执行，避免阻塞事件循环
+        self.async_mysql = AsyncMySQLManager(self.mysql_manager, max_workers=mysql_config.get('executor_workers', 4))
+        self.project_index = ProjectTagIndex(self.mysql_manager)
+        self.entity_extractor = None
+        if task_config.get('kol_local_extract', True):
+            self.entity_extractor = EntityExtractor(task_config.get('kol_local_min_confidence', 0.8))
+        try:
+            self.project_index.refresh(force=True)
+            self.mysql_manager.project_index = self.project_index
+            if self.entity_extractor:
+                self.entity_extractor.build(self.project_index)
+        except Exception as e:
+            logger.error(f"加载项目标签索引失败，标签查询回退到数据库: {str(e)}")
+        # 近似重复推文检测：KOL流式去重使用滑动窗口，小时总结只用于聚类
+        self.kol_dedup = None
+        if task_config.get('kol_dedup', True):
+            self.kol_dedup = NearDuplicateDetector(
+                threshold=task_config.get('kol_dedup_threshold', 0.8),
+                window_seconds=task_config.get('kol_dedup_window_seconds', 6 * 3600)
+            )
+        # 增量小时总结的折叠任务与整点收尾互斥，避免同一批推文被重复总结
+        self._summary_lock = asyncio.Lock()
+        self.summary_dedup = NearDuplicateDetector(threshold=task_config.get('kol_dedup_threshold', 0.8))
+        self.loop_monitor = LoopLagMonitor(report_seconds=task_config.get('loop_lag_report_seconds', 60))
+        # 多窗口项目热度，由写库成功的结构化推文实时喂入，启动时用小时汇总预热 7 天基线
+        self.trend_engine = TrendEngine()
+        self._trend_alerted = {}
         self.mongo_manager = MongoDBManager(mongo_config)
-        self.text_analyzer = TextAnalyzer(openai_config)
+        self.llm_cache = None
+        if llm_cache_config and llm_cache_config.get('enabled'):
+            self.llm_cache = LLMCache(llm_cache_config)
+        analyzers = []
+        for provider_config in [openai_config] + list(fallback_configs or []):
+            limiter = None
+            if llm_rate_limit_config and llm_rate_limit_config.get('enabled'):
+                limiter = AdaptiveLimiter(llm_rate_limit_config, name=provider_config.get('model') or 'llm')
+            analyzers.append(TextAnalyzer(provider_config, cache=self.llm_cache, limiter=limiter))
+        self.text_analyzer = ProviderRouter(analyzers, router_config)
         self.bot = tg_bot
         self.task_config = task_config
         self.running = False
         self.thread = None
         self.is_first_run = True
-        self.concurrency = 5
+        self.concurrency = self.task_config.get('kol_concurrency', 5)
         self.loop = None
         self.limit_count = self.task_config['process_limit_count']
-        self.latest_kol_tweets_time = int(datetime.now(ZoneInfo("Asia/Shanghai")).timestamp())
+        self.kol_page_size = self.task_config.get('kol_page_size', 200)
+        try:
+            self.mysql_manager.ensure_kol_tweets_index()
+        except Exception as e:
+            logger.warning(f"创建kol_tweets游标分页索引失败，分页查询可能无法走索引: {str(e)}")
+        # 读取失败时直接抛出，只有确实没有游标记录时才从当前时间开始
+        kol_cursor = self.mysql_manager.get_kol_tweets_cursor()
+        if kol_cursor is None:
+            kol_cursor = (int(datetime.now(ZoneInfo("Asia/Shanghai")).timestamp()), None)
+            self.mysql_manager.save_kol_tweets_cursor(kol_cursor)
+        else:
+            logger.info(f"从游标 {kol_cursor} 恢复KOL推文处理")
+        self.kol_progress = KolTweetsProgress(
+            kol_cursor,
+            max_retries=self.task_config.get('kol_max_retries', 3)
+        )
+        self.kol_writer = KolTweetWriter(
+            self.async_mysql,
+            batch_size=self.task_config.get('kol_write_batch_size', 50),
+            max_age_seconds=self.task_config.get('kol_write_max_age', 5),
+            on_flush=self._on_kol_tweets_flushed
+        )
         self.updated_projects_list = set()
         self.inner_group = '-4879675579'
         self.outer_group = '-4892377641'
@@ -82,13 +164,58 @@ class DataProcessor:
                     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
                 """
 
+        create_kol_summary_state_sql = """
+                    CREATE TABLE IF NOT EXISTS kol_summary_state (
+                    hour_start BIGINT PRIMARY KEY COMMENT '小时开始时间戳',
+                    state LONGTEXT COMMENT '增量总结状态（事件及已折叠的推文id）',
+                    updated_at INT NOT NULL COMMENT '更新时间'
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """
+
+        create_kol_summary_backfill_sql = """
+                    CREATE TABLE IF NOT EXISTS kol_summary_backfill (
+                    window_start BIGINT NOT NULL COMMENT '窗口开始时间戳',
+                    window_end BIGINT NOT NULL COMMENT '窗口结束时间戳',
+                    status VARCHAR(16) NOT NULL COMMENT '回补状态',
+                    updated_at INT NOT NULL COMMENT '更新时间',
+                    PRIMARY KEY (window_start, window_end)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """
+
+        create_kol_project_mentions_sql = """
+                    CREATE TABLE IF NOT EXISTS kol_project_mentions (
+                    bucket_hour BIGINT NOT NULL COMMENT '小时开始时间戳',
+                    project_name VARCHAR(255) NOT NULL COMMENT '项目名称',
+                    mention_count INT NOT NULL DEFAULT 0 COMMENT '提及次数',
+                    updated_at INT NOT NULL COMMENT '更新时间',
+                    PRIMARY KEY (bucket_hour, project_name)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """
+
+        create_kol_project_mention_tags_sql = """
+                    CREATE TABLE IF NOT EXISTS kol_project_mention_tags (
+                    bucket_hour BIGINT NOT NULL COMMENT '小时开始时间戳',
+                    project_name VARCHAR(255) NOT NULL COMMENT '项目名称',
+                    tag VARCHAR(255) NOT NULL COMMENT '项目标签',
+                    PRIMARY KEY (bucket_hour, project_name, tag)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+                """
+
         try:
             self.mysql_manager.execute_update(create_kol_tweets_table_sql)
             self.mysql_manager.execute_update(create_kol_tweets_summary_sql)
+            self.mysql_manager.execute_update(create_kol_summary_state_sql)
+            self.mysql_manager.execute_update(create_kol_summary_backfill_sql)
+            self.mysql_manager.execute_update(create_kol_project_mentions_sql)
+            self.mysql_manager.execute_update(create_kol_project_mention_tags_sql)
             logger.info("已确保必要的表存在")
         except Exception as e:
             logger.error(f"创建表失败: {str(e)}")
             raise
+        try:
+            self.mysql_manager.ensure_structured_kol_tweets_index()
+        except Exception as e:
+            logger.warning(f"创建structured_kol_tweets source_id 索引失败，批量写入查重可能较慢: {str(e)}")
 
     async def start_bot_async(self):
         """在当前 loop 中启动 bot"""
@@ -102,6 +229,7 @@ class DataProcessor:
 
         self.running = True
         self.loop = asyncio.get_running_loop()
+        self.loop_monitor.start()
         # asyncio.set_event_loop(self.loop)
 
         await self.start_bot_async()
@@ -123,6 +251,32 @@ class DataProcessor:
             name="实时处理 KOL 推文"
         )
 
+        self.scheduler.add_job(
+            self._refresh_project_index,
+            trigger=IntervalTrigger(seconds=self.task_config.get('project_index_refresh_seconds', 300)),
+            max_instances=1,
+            name="刷新项目标签索引"
+        )
+
+        await self._warm_trend_engine()
+        alert_minutes = self.task_config.get('trend_alert_minutes', 5)
+        if alert_minutes > 0:
+            self.scheduler.add_job(
+                self._send_trend_alerts,
+                trigger=IntervalTrigger(minutes=alert_minutes),
+                max_instances=1,
+                name="项目热度预警"
+            )
+
+        fold_minutes = self.task_config.get('summary_fold_minutes', 10)
+        if fold_minutes > 0:
+            self.scheduler.add_job(
+                self._fold_summary_tweets,
+                trigger=IntervalTrigger(minutes=fold_minutes),
+                max_instances=1,
+                name="增量折叠小时总结"
+            )
+
         self.scheduler.add_job(
             func=self._process_summary_tweets,
             trigger="cron",
@@ -141,6 +295,18 @@ class DataProcessor:
             name="定时发送项目热度"
         )
 
+        build_hour = self.dossier_store_config.get('build_hour', -1)
+        if self.dossier_store_config.get('enabled') and build_hour >= 0:
+            self.scheduler.add_job(
+                timezone='Asia/Shanghai',
+                func=self._build_dossiers,
+                trigger='cron',
+                hour=build_hour,
+                minute=30,
+                max_instances=1,
+                name="构建项目信息物化表"
+            )
+
 
         self.scheduler.start()
         logger.info("调度器已启动")
@@ -155,6 +321,7 @@ class DataProcessor:
     async def stop(self):
         """停止数据处理"""
         await self.bot.stop()
+        await self.text_analyzer.aclose()
         if not self.running:
             logger.warning("数据处理器未在运行")
             return
@@ -163,57 +330,403 @@ class DataProcessor:
         if self.thread:
             self.thread.join(timeout=5.0)
 
+        # 写入缓冲区中剩余的推文并保存游标，避免重启后重复分析
+        await self.kol_writer.flush()
+        await self._advance_kol_cursor()
+        await self.async_mysql.close()
+        await self.loop_monitor.stop()
+
         self.mysql_manager.close()
         self.mongo_manager.close()
+        if self.llm_cache:
+            self.llm_cache.close()
 
         logger.info("数据处理器已停止")
 
 
     async def _process_kol_tweets(self):
+        """按 (tweet_date, twitter_id) 游标分页处理KOL推文，直到追上最新数据"""
+        await self.kol_writer.flush_if_due()
+        await self._advance_kol_cursor()
+
+        pages = self.async_mysql.iter_kol_tweet_pages(self.kol_progress.watermark, self.kol_page_size)
+        async for tweets in pages:
+            await self._process_kol_page(tweets)
+            await self.kol_writer.flush_if_due()
+            await self._advance_kol_cursor()
+
+            # 本页有推文待重试时停止，下次从游标处重新拉取，保证内存占用不超过一页
+            if self.kol_progress.has_retry():
+                await pages.aclose()
+                return
+
+    async def _refresh_project_index(self):
+        """项目表有变化时重新加载项目标签索引"""
+        try:
+            await self.async_mysql.run(self.project_index.refresh)
+            self.mysql_manager.project_index = self.project_index
+            if self.entity_extractor:
+                # 名称集合有变化时在线程池中重建自动机
+                await self.async_mysql.run(self.entity_extractor.build, self.project_index)
+        except Exception as e:
+            logger.error(f"刷新项目标签索引失败: {str(e)}")
+
+    async def _advance_kol_cursor(self):
+        """推进游标，有变化时保存到进度表"""
+        previous = self.kol_progress.watermark
+        watermark = self.kol_progress.advance()
+        if watermark != previous:
+            logger.info(f"更新游标 {watermark}")
+            await self.async_mysql.save_kol_tweets_cursor(watermark)
+
+    def _on_kol_tweets_flushed(self, batch, saved):
+        """批量写库完成后再确认推文处理结果，写入失败的推文下次重新分析"""
+        for key, data in batch.items():
+            if saved:
+                self.kol_progress.settle(key)
+                self._feed_trend_engine(data)
+            else:
+                self.kol_progress.fail(key)
+
+    def _feed_trend_engine(self, data):
+        """把写库成功的结构化推文中提到的项目计入热度引擎，计数口径与项目提及汇总表一致"""
+        try:
+            items = json.loads(data.get('tags') or '[]')
+        except (TypeError, json.JSONDecodeError):
+            return
+        for item in items:
+            self.trend_engine.add(item.get('project_name'))
+
+    async def _warm_trend_engine(self):
+        """用过去 7 天的项目提及小时汇总预热热度引擎的基线"""
+        now = int(time.time())
+        rows = await self.async_mysql.get_project_mention_counts(now - 7 * 24 * 3600, now + 1)
+        self.trend_engine.load_hourly(rows, now)
+        logger.info(f"热度引擎已预热: {self.trend_engine.metrics()}")
+
+    async def _send_trend_alerts(self):
+        """近 1 小时提及数明显高于 7 天基线的项目发送预警，同一项目在冷却时间内只发送一次"""
+        now = time.time()
+        cooldown = self.task_config.get('trend_alert_cooldown_minutes', 120) * 60
+        threshold = self.task_config.get('trend_alert_zscore', 3.0)
+        candidates = self.trend_engine.top_k(
+            window='1h',
+            k=10,
+            by='zscore',
+            min_count=self.task_config.get('trend_alert_min_count', 5)
+        )
+        alerts = [
+            item for item in candidates
+            if item['zscore'] >= threshold and item['acceleration'] > 0
+            and now - self._trend_alerted.get(item['name'], 0) >= cooldown
+        ]
+        self._trend_alerted = {name: ts for name, ts in self._trend_alerted.items() if now - ts < cooldown}
+        if not alerts:
+            return
+        for item in alerts:
+            self._trend_alerted[item['name']] = now
+        logger.info(f"项目热度预警: {alerts}")
+        success = await send_message(self.daily_group, format_trend_alert(alerts))
+        if not success:
+            logger.error("发送项目热度预警失败")
 
-        tweets = self.mysql_manager.get_latest_kol_tweets(self.latest_kol_tweets_time)
-        if not tweets:
+    async def _process_kol_page(self, tweets):
+        pending = self.kol_progress.track(tweets)
+        if not pending:
             return
-        logger.info(f"获取 {len(tweets)} 条最新tweets")
-        for tweet in tweets:
+
+        tweets_by_id = {tweet["twitter_id"]: tweet for tweet in pending}
+        # 先用本地自动机提取，完全解析的推文不再调用 LLM，其余只发送未解析的剩余文本
+        local_results = {}
+        llm_items = []
+        # 本页内代表推文尚未分析完成的重复推文，代表推文出结果后复用
+        duplicates = {}
+        for tweet in pending:
             tweet_id = tweet["twitter_id"]
-            post_time = tweet["tweet_date"]
-            content = tweet["text"]
-            tweet_user = tweet['twitter_username']
-
-            result = await self.text_analyzer.analyze_text(kol_tweet_template, text=replace_newlines_with_space(content))
-            logger.info(result)
-            if post_time > self.latest_kol_tweets_time:
-                logger.info(f"更新时间 {self.latest_kol_tweets_time}")
-                self.latest_kol_tweets_time = int(post_time)
-            if not result:
-                logger.warning(f"分析文本失败，跳过推文，ID: {tweet_id}")
-                continue
-            project_data = result.get('project', '')
-            token_data = result.get('token', [])
-
-            proj_related_tags = []
-            if len(project_data) > 0:
-                proj_related_tags = self.mysql_manager.get_projects_tags(project_data, token_data)
-            structured_data = {
-                'source_id': str(tweet_id),
-                'project': json.dumps(project_data),
-                'token': json.dumps(token_data),
-                'content': content,
-                'tags': json.dumps(proj_related_tags)
-            }
-            logger.info(f"保存处理后的 {tweet_id} 推文到数据库")
-            self.mysql_manager.save_processed_kol_tweets(structured_data)
-
-    def _format_tweets(self, tweets):
+            text = replace_newlines_with_space(tweet["text"])
+            if self.kol_dedup:
+                canonical = self.kol_dedup.add(tweet_id, text, int(tweet["tweet_date"]))
+                if canonical is not None:
+                    cached = self.kol_dedup.get_result(canonical)
+                    if cached is not None:
+                        await self._store_kol_result(tweet, cached)
+                        continue
+                    if canonical in tweets_by_id:
+                        duplicates.setdefault(canonical, []).append(tweet)
+                        continue
+            if self.entity_extractor:
+                extraction = self.entity_extractor.extract(text)
+                local_results[tweet_id] = extraction.result
+                if extraction.resolved:
+                    await self._store_kol_result(tweet, extraction.result, duplicates.get(tweet_id))
+                    continue
+                text = extraction.residual or text
+            llm_items.append((tweet_id, text))
+
+        batches = self.text_analyzer.pack_batches(
+            llm_items,
+            token_budget=self.task_config.get('kol_batch_token_budget', 3000),
+            max_items=max(1, self.task_config.get('kol_batch_size', 1))
+        )
+        duplicate_count = sum(len(items) for items in duplicates.values())
+        logger.info(f"获取 {len(pending)} 条最新tweets，本地解析或复用 {len(pending) - len(llm_items)} 条"
+                    f"（其中近似重复 {duplicate_count} 条），其余分为 {len(batches)} 批，并发数 {self.concurrency}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(batch):
+            async with semaphore:
+                try:
+                    results = await self.text_analyzer.analyze_batch(
+                        kol_tweets_batch_template, kol_tweet_template, batch
+                    )
+                except Exception as e:
+                    logger.error(f"批量分析推文出错: {str(e)}")
+                    results = {}
+            for tweet_id, _ in batch:
+                result = results.get(tweet_id)
+                if result and tweet_id in local_results:
+                    result = EntityExtractor.merge(local_results[tweet_id], result)
+                await self._store_kol_result(tweets_by_id[tweet_id], result, duplicates.get(tweet_id))
+
+        await asyncio.gather(*(worker(batch) for batch in batches))
+        if self.kol_dedup:
+            logger.info(f"近似重复检测统计: {self.kol_dedup.metrics()}")
+        if self.entity_extractor:
+            logger.info(f"本地实体提取统计: {self.entity_extractor.metrics()}")
+        if self.llm_cache:
+            logger.info(f"LLM缓存统计: {self.llm_cache.metrics()}")
+        logger.info(f"LLM提供方状态: {self.text_analyzer.metrics()}")
+        logger.info(f"KOL推文写库统计: {self.kol_writer.metrics()}")
+        logger.info(f"MySQL连接统计: {self.mysql_manager.metrics()}")
+
+    async def _store_kol_result(self, tweet, result, duplicates=None):
+        """将分析结果加入批量写库缓冲区，分析失败时标记推文待重试
+
+        Args:
+            tweet (dict): 推文
+            result (dict): 提取结果，分析失败时为空
+            duplicates (list, optional): 以该推文为代表的近似重复推文，复用同一结果
+        """
+        tweet_id = tweet["twitter_id"]
+        if result and self.kol_dedup:
+            self.kol_dedup.set_result(tweet_id, result)
+        for duplicate in duplicates or []:
+            await self._store_kol_result(duplicate, result)
+        try:
+            structured_data = await self._build_kol_result(tweet, result)
+        except Exception as e:
+            logger.error(f"处理推文 {tweet_id} 出错: {str(e)}")
+            structured_data = None
+        if structured_data:
+            # 写库成功后由 _on_kol_tweets_flushed 确认，缓冲期间推文保持处理中，重新拉取时会被跳过
+            await self.kol_writer.add(tweet_id, structured_data)
+        else:
+            self.kol_progress.fail(tweet_id)
+
+    async def _build_kol_result(self, tweet, result):
+        """根据单条KOL推文的分析结果构造待写库数据
+
+        Returns:
+            dict: 结构化数据，分析失败时返回 None
+        """
+        tweet_id = tweet["twitter_id"]
+        content = tweet["text"]
+
+        logger.info(result)
+        if not result:
+            logger.warning(f"分析文本失败，稍后重试推文，ID: {tweet_id}")
+            return None
+        project_data = result.get('project', '')
+        token_data = result.get('token', [])
+
+        proj_related_tags = []
+        if len(project_data) > 0:
+            proj_related_tags = await self.async_mysql.get_projects_tags(project_data, token_data)
+        structured_data = {
+            'source_id': str(tweet_id),
+            'project': json.dumps(project_data),
+            'token': json.dumps(token_data),
+            'content': content,
+            'tags': json.dumps(proj_related_tags)
+        }
+        return structured_data
+
+    def _summary_lines(self, tweets):
+        """格式化小时总结的推文，近似重复的推文只保留每簇第一条并注明条数
+
+        推文编号沿用其在 tweets 中的位置（从1开始），format_kol_hour_message 按该编号回查推文。
+
+        Returns:
+            list: (推文编号, 格式化后的推文行) 列表
+        """
+        indexed = [(idx, t) for idx, t in enumerate(tweets, start=1) if t.get("text", "").strip()]
+        clusters = self.summary_dedup.cluster([replace_newlines_with_space(t["text"]) for _, t in indexed])
         lines = []
-        for idx, t in enumerate(tweets, start=1):
-            text = t.get("text", "").strip()
+        for cluster in clusters:
+            idx, t = indexed[cluster[0]]
             author_uid = t.get("uid", "未知博主")
-            if text:
-                clean_text = " ".join(text.split())
-                lines.append(f"Tweet {idx} (博主: {author_uid}): {clean_text}")
-        return "\n\n".join(lines)
+            clean_text = " ".join(t["text"].strip().split())
+            if len(cluster) > 1:
+                authors = len({indexed[i][1].get("uid") for i in cluster})
+                lines.append((idx, f"Tweet {idx} (博主: {author_uid}，另有 {len(cluster) - 1} 条相似推文，共 {authors} 位博主): {clean_text}"))
+            else:
+                lines.append((idx, f"Tweet {idx} (博主: {author_uid}): {clean_text}"))
+        return lines
+
+    @staticmethod
+    def _valid_tweet_ids(event, allowed_ids):
+        """只保留属于 allowed_ids 的推文编号，统一为字符串并去重"""
+        tweet_ids = []
+        for tweet_id in event.get("tweet_ids") or []:
+            try:
+                tweet_id = int(str(tweet_id).strip().lstrip('#'))
+            except ValueError:
+                continue
+            if tweet_id in allowed_ids and str(tweet_id) not in tweet_ids:
+                tweet_ids.append(str(tweet_id))
+        return tweet_ids
+
+    async def _summarize_tweets(self, all_tweets):
+        """总结一段时间内的推文，返回事件列表
+
+        推文总量在 summary_chunk_token_budget 之内时一次调用完成；超出时按token预算切分，
+        各分片并发总结（map），再用合并模板去重合并分片事件（reduce）。推文始终使用全局编号，
+        事件的 tweet_ids 只保留对应分片内真实存在的编号，合并后的 tweet_ids 由来源事件汇总得到。
+        有推文但任一次调用失败或没有返回事件时返回 None，调用方不应把这些推文视为已总结。
+        """
+        lines = self._summary_lines(all_tweets)
+        if not lines:
+            return []
+        token_budget = self.task_config.get('summary_chunk_token_budget', 6000)
+        chunks = self.text_analyzer.pack_batches(lines, token_budget=token_budget, max_items=len(lines))
+
+        if len(chunks) == 1:
+            formated_tweets = "\n\n".join(line for _, line in lines)
+            logger.info(formated_tweets)
+            result = await self.text_analyzer.analyze_text(tweet_summary_template, all_tweets=formated_tweets)
+            events = self._result_events(result)
+            if events is None:
+                logger.error(f"总结 {len(lines)} 条推文失败，模型未返回事件")
+                return None
+            allowed_ids = {idx for idx, _ in lines}
+            for event in events:
+                event["tweet_ids"] = self._valid_tweet_ids(event, allowed_ids)
+            return events
+
+        logger.info(f"推文共 {len(lines)} 条，超出token预算 {token_budget}，分为 {len(chunks)} 片并发总结")
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def summarize_chunk(chunk):
+            async with semaphore:
+                result = await self.text_analyzer.analyze_text(
+                    tweet_summary_template,
+                    all_tweets="\n\n".join(line for _, line in chunk)
+                )
+            events = self._result_events(result)
+            if events is None:
+                return None
+            allowed_ids = {idx for idx, _ in chunk}
+            for event in events:
+                event["tweet_ids"] = self._valid_tweet_ids(event, allowed_ids)
+            return events
+
+        partial_results = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+        failed = sum(1 for events in partial_results if events is None)
+        if failed:
+            logger.error(f"{len(chunks)} 个分片中 {failed} 个总结失败，模型未返回事件")
+            return None
+        partial_events = [event for events in partial_results for event in events]
+        if len(partial_events) <= 1:
+            return partial_events
+        return await self._merge_events(partial_events)
+
+    @staticmethod
+    def _result_events(result):
+        """取出模型返回的事件列表，调用失败（返回空字典）或事件为空时返回 None"""
+        events = result.get("events") if isinstance(result, dict) else None
+        if not events or not isinstance(events, list):
+            return None
+        return events
+
+    async def _merge_events(self, partial_events):
+        """合并分片总结得到的事件，合并失败时返回原始分片事件"""
+        labels = {f"E{idx}": event for idx, event in enumerate(partial_events, start=1)}
+        formated_events = "\n\n".join(
+            f"{label}: {json.dumps({k: v for k, v in event.items() if k != 'tweet_ids'}, ensure_ascii=False)}"
+            for label, event in labels.items()
+        )
+        result = await self.text_analyzer.analyze_text(tweet_summary_merge_template, events=formated_events)
+        merged_events = result.get("events") if result else None
+        if not merged_events:
+            logger.warning("合并分片事件失败，使用未合并的事件")
+            return partial_events
+
+        merged = []
+        used = set()
+        for event in merged_events:
+            sources = [str(label).strip() for label in event.pop("source_events", None) or []]
+            sources = [label for label in sources if label in labels and label not in used]
+            if not sources:
+                continue
+            used.update(sources)
+            tweet_ids = []
+            for label in sources:
+                for tweet_id in labels[label].get("tweet_ids", []):
+                    if tweet_id not in tweet_ids:
+                        tweet_ids.append(tweet_id)
+            event["tweet_ids"] = tweet_ids
+            merged.append(event)
+        # 合并结果中遗漏的分片事件原样保留
+        merged.extend(event for label, event in labels.items() if label not in used)
+        logger.info(f"分片事件 {len(partial_events)} 个合并为 {len(merged)} 个")
+        return merged
+
+    async def _summarize_new_tweets(self, tweets):
+        """总结一批推文，事件的 tweet_ids 由推文编号换成 twitter_id，便于跨批次累积，失败时返回 None"""
+        events = await self._summarize_tweets(tweets)
+        if events is None:
+            return None
+        for event in events:
+            event["tweet_ids"] = [str(tweets[int(idx) - 1]["twitter_id"]) for idx in event.get("tweet_ids", [])]
+        return events
+
+    async def _fold_hour(self, hour_start, end_ts, state):
+        """把 [hour_start, end_ts] 内尚未折叠的推文总结后并入该小时的增量状态
+
+        Returns:
+            tuple: (新的状态, 时间段内所有推文的引用信息)
+        """
+        refs = await self.async_mysql.get_kol_tweet_refs(hour_start, end_ts)
+        folded = set(state["folded_ids"])
+        new_ids = [ref["twitter_id"] for ref in refs if str(ref["twitter_id"]) not in folded]
+        if not new_ids:
+            return state, refs
+
+        tweets = await self.async_mysql.get_kol_tweets_by_ids(new_ids)
+        new_events = await self._summarize_new_tweets(tweets)
+        if new_events is None:
+            # 总结失败时不标记为已折叠，下次折叠时重试
+            logger.warning(f"增量折叠 {len(new_ids)} 条推文失败，保留为未折叠")
+            return state, refs
+        events = state["events"] + new_events
+        if state["events"] and new_events:
+            events = await self._merge_events(events)
+        state = {
+            "events": events,
+            "folded_ids": state["folded_ids"] + [str(twitter_id) for twitter_id in new_ids]
+        }
+        await self.async_mysql.save_kol_summary_state(hour_start, state)
+        logger.info(f"增量折叠 {len(new_ids)} 条推文，当前小时事件 {len(events)} 个")
+        return state, refs
+
+    async def _fold_summary_tweets(self):
+        """每隔几分钟把当前小时的新推文折叠进增量总结状态，整点只需处理剩余推文"""
+        now = datetime.now(ZoneInfo("Asia/Shanghai"))
+        hour_start = int(now.replace(minute=0, second=0, microsecond=0).timestamp())
+        async with self._summary_lock:
+            state = await self.async_mysql.get_kol_summary_state(hour_start)
+            await self._fold_hour(hour_start, int(now.timestamp()), state or {"events": [], "folded_ids": []})
 
     async def _process_summary_tweets(self):
         sh_tz = ZoneInfo("Asia/Shanghai")
@@ -221,23 +734,34 @@ class DataProcessor:
         end = now.replace(minute=0, second=0, microsecond=0)
         end_ts = int(end.timestamp())
         start_ts = int((end - timedelta(hours=1)).timestamp())
-        all_tweets = self.mysql_manager.get_target_kol_tweets(start_ts, end_ts)
+        async with self._summary_lock:
+            state = await self.async_mysql.get_kol_summary_state(start_ts)
+            if state is None:
+                # 没有增量状态（例如折叠任务未启用或刚启动），整小时一次性总结
+                all_tweets = await self.async_mysql.get_target_kol_tweets(start_ts, end_ts)
+                events = await self._summarize_tweets(all_tweets)
+                if events is None:
+                    logger.error("近一小时推文总结失败，不保存空总结")
+                    return
+            else:
+                state, all_tweets = await self._fold_hour(start_ts, end_ts, state)
+                # 事件中的 twitter_id 换回推文在 all_tweets 中的编号，供 format_kol_hour_message 使用
+                positions = {str(t["twitter_id"]): str(idx) for idx, t in enumerate(all_tweets, start=1)}
+                events = []
+                for event in state["events"]:
+                    event = dict(event)
+                    event["tweet_ids"] = [positions[i] for i in event.get("tweet_ids", []) if i in positions]
+                    events.append(event)
+            await self.async_mysql.delete_kol_summary_states(start_ts - 24 * 3600)
         if len(all_tweets) == 0:
             logger.warning("No tweets found during the past 1 hour")
-        formated_tweets = self._format_tweets(all_tweets)
-        logger.info(formated_tweets)
-        result = await self.text_analyzer.analyze_text(
-            tweet_summary_template,
-            all_tweets=formated_tweets
-        )
-        events = result.get("events", [])
         if len(events) == 0:
             logger.info("近一小时暂无热点事件")
             return
         all_projects = []
         for idx, e in enumerate(events):
             extracted_projects = [item.strip('$') for item in e.get("projects", [])]
-            project_token_tags = self.mysql_manager.get_projects_tokens_tags(extracted_projects)
+            project_token_tags = await self.async_mysql.get_projects_tokens_tags(extracted_projects)
             all_projects.extend(project_token_tags)
             events[idx]['projects'] = project_token_tags
         structured_data = {
@@ -246,7 +770,7 @@ class DataProcessor:
             "source_ids": json.dumps([t.get("twitter_id") for t in all_tweets if t.get("twitter_id")],
                                      ensure_ascii=False)
         }
-        self.mysql_manager.save_kol_summary_tweets(structured_data)
+        await self.async_mysql.save_kol_summary_tweets(structured_data)
         format_msg = format_kol_hour_message(events, all_tweets)
         logger.info(format_msg)
         # success = await send_message(self.daily_group, format_msg)
@@ -254,6 +778,7 @@ class DataProcessor:
         #     logger.error("发送项目热度消息失败")
 
     async def _once_process_summary_tweets(self):
+        """回补昨日每小时的推文总结"""
         sh_tz = ZoneInfo("Asia/Shanghai")
         now = datetime.now(sh_tz)
 
@@ -263,43 +788,65 @@ class DataProcessor:
         yesterday_end = now.replace(
             hour=0, minute=0, second=0, microsecond=0
         )
+        return await self.backfill_summaries(int(yesterday_start.timestamp()), int(yesterday_end.timestamp()))
 
-        current_period_end = yesterday_start
-        while current_period_end < yesterday_end:
-            current_period_start = current_period_end
-            current_period_end = current_period_start + timedelta(hours=1)
+    async def backfill_summaries(self, start_ts, end_ts, concurrency=None):
+        """回补 [start_ts, end_ts) 内每小时的推文总结，已完成的窗口会被跳过
 
-            start_ts = int(current_period_start.timestamp())
-            end_ts = int(current_period_end.timestamp())
+        Args:
+            start_ts (int): 开始时间戳
+            end_ts (int): 结束时间戳
+            concurrency (int, optional): 同时总结的窗口数，默认取 backfill_concurrency 配置
+
+        Returns:
+            dict: 各状态的窗口数
+        """
+        backfill = SummaryBackfill(
+            self,
+            concurrency=concurrency or self.task_config.get('backfill_concurrency', 4),
+            prefetch=self.task_config.get('backfill_prefetch', 2)
+        )
+        return await backfill.run(start_ts, end_ts)
 
-            all_tweets = self.mysql_manager.get_target_kol_tweets(start_ts, end_ts)
+    async def _summarize_window(self, start_ts, end_ts, all_tweets):
+        """总结一个时间窗口的推文并保存，总结或保存失败时抛出异常，调用方不应标记窗口完成"""
+        events = await self._summarize_tweets(all_tweets)
+        if events is None:
+            raise RuntimeError(f"总结 {start_ts} - {end_ts} 的推文失败，模型未返回事件")
+        all_projects = []
+        for idx, e in enumerate(events):
 
-            formated_tweets = self._format_tweets(all_tweets)
-            logger.info(formated_tweets)
-            result = await self.text_analyzer.analyze_text(
-                tweet_summary_template,
-                all_tweets=formated_tweets
+            extracted_projects = [item.strip('$') for item in e.get("projects", [])]
+            project_token_tags = await self.async_mysql.get_projects_tokens_tags(extracted_projects)
+            all_projects.extend(project_token_tags)
+            events[idx]['projects'] = project_token_tags
+        structured_data = {
+            "events": json.dumps(events, ensure_ascii=False),
+            "projects": json.dumps(all_projects, ensure_ascii=False),
+            "source_ids": json.dumps([t.get("twitter_id") for t in all_tweets if t.get("twitter_id")],
+                                     ensure_ascii=False)
+        }
+        logger.info(structured_data)
+        if not await self.async_mysql.save_kol_summary_tweets(structured_data):
+            raise RuntimeError(f"保存 {start_ts} - {end_ts} 的推文总结失败")
+
+    async def _build_dossiers(self):
+        """在独立进程中构建项目信息物化表，不占用本进程的事件循环和数据库连接池"""
+        # 使用 spawn 启动子进程，避免 fork 复制本进程的数据库连接和线程
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            stats = await self.loop.run_in_executor(
+                pool, build_dossiers, self.mysql_config, self.mongo_config, self.dossier_store_config
             )
-            events = result.get("events", [])
-            all_projects = []
-            for idx, e in enumerate(events):
-
-                extracted_projects = [item.strip('$') for item in e.get("projects", [])]
-                project_token_tags = self.mysql_manager.get_projects_tokens_tags(extracted_projects)
-                all_projects.extend(project_token_tags)
-                events[idx]['projects'] = project_token_tags
-            structured_data = {
-                "events": json.dumps(events, ensure_ascii=False),
-                "projects": json.dumps(all_projects, ensure_ascii=False),
-                "source_ids": json.dumps([t.get("twitter_id") for t in all_tweets if t.get("twitter_id")],
-                                         ensure_ascii=False)
-            }
-            logger.info(structured_data)
-            self.mysql_manager.save_kol_summary_tweets(structured_data)
+            logger.info(f"项目信息物化表构建完成: {stats}")
+        except Exception as e:
+            logger.error(f"构建项目信息物化表失败: {str(e)}")
+        finally:
+            pool.shutdown(wait=False)
 
     async def _send_projects_trends(self):
         """
-        获取昨日所有twitter的tags字段，统计提到的项目排序
+        从项目提及小时汇总表统计昨日提到的项目并排序
         """
         sh_tz = ZoneInfo("Asia/Shanghai")
         now = datetime.now(sh_tz)
@@ -310,43 +857,12 @@ class DataProcessor:
         end_ts = int(now.replace(
             hour=0, minute=0, second=0, microsecond=0
         ).timestamp())
-        all_tweets_tags = self.mysql_manager.get_target_structured_tweets(start_ts, end_ts)
-        logger.info(all_tweets_tags)
-        name_stats = {}
-        for item in all_tweets_tags:
-            try:
-                tags = json.loads(item.get('tags', '[]'))
-            except json.JSONDecodeError:
-                continue
-
-            for tag_item in tags:
-                name = tag_item.get('project_name')
-                tag_list = tag_item.get('tags', [])
-
-                if not name:
-                    continue
-
-                if name not in name_stats:
-                    unique_tags = list(set(tag_list))
-                    name_stats[name] = {
-                        'tag': unique_tags,
-                        'count': 1
-                    }
-                else:
-                    name_stats[name]['count'] += 1
-                    merged_tags = list(set(name_stats[name]['tag'] + tag_list))
-                    name_stats[name]['tag'] = merged_tags
-
-        result = [
-            {
-                'name': name,
-                'tag': stats['tag'],
-                'count': stats['count']
-            }
-            for name, stats in name_stats.items()
-        ]
+        # 项目提及在推文结构化时已按小时汇总，这里只需一次范围聚合
+        result = await self.async_mysql.get_project_mention_rollup(start_ts, end_ts)
+        if result is None:
+            logger.error("查询项目提及汇总失败")
+            return
         logger.info(result)
-        result.sort(key=lambda x: (-x['count'], x['name']))
 
         if len(result) == 0:
             logger.warning("No tweets data")
@@ -404,6 +404,21 @@ def format_kol_day_count(data_list):
     return "\n".join(message_parts)
 
 
+def format_trend_alert(data_list):
+    if not data_list:
+        return "📊 暂无数据"
+
+    message_parts = ["🚀 <b>X 话题热度异动(近1小时)</b>\n"]
+    for idx, item in enumerate(data_list, 1):
+        name = html.escape(item['name'])
+        line = (f"{idx}. <b>{name}</b> 📈 {item['count']} "
+                f"(前1小时 {item['count'] - item['acceleration']}，7日均值 {item['baseline']}/小时，z={item['zscore']})")
+        message_parts.append(line)
+
+    message_parts.append("\n💡 按近1小时提及数相对过去7天每小时均值的偏离程度排序")
+    return "\n".join(message_parts)
+
+
 def format_kol_hour_message(data: list, all_tweets) -> str:
     messages = []
     messages.append(" <b>🔥 KOL观点(近1小时)</b>")
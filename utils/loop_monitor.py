@@ -0,0 +1,78 @@
+import asyncio
+import logging
+
+logger = logging.getLogger('loop_monitor')
+
+
+class LoopLagMonitor:
+    """事件循环阻塞监控
+
+    每隔 interval 秒睡眠一次，实际唤醒时间比预期晚的部分即为事件循环被同步代码阻塞的时间。
+    每隔 report_seconds 秒输出一次统计并重新计数，可用于对比改动前后的阻塞情况。
+    """
+
+    def __init__(self, interval=0.1, report_seconds=60, warn_threshold=0.5):
+        """初始化监控器
+
+        Args:
+            interval (float, optional): 采样间隔（秒）
+            report_seconds (float, optional): 输出统计的间隔（秒），0 表示不自动输出
+            warn_threshold (float, optional): 单次阻塞超过该秒数时输出警告
+        """
+        self.interval = interval
+        self.report_seconds = report_seconds
+        self.warn_threshold = warn_threshold
+        self._task = None
+        self._reset()
+
+    def _reset(self):
+        self.samples = 0
+        self.blocked_seconds = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    def start(self):
+        """在当前事件循环中启动监控"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """停止监控"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"事件循环阻塞统计: {self.metrics()}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            lag = max(0.0, now - started - self.interval)
+            self.samples += 1
+            self.blocked_seconds += lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.warn_threshold:
+                self.stalls += 1
+                logger.warning(f"事件循环被阻塞 {lag:.3f} 秒")
+            if self.report_seconds and now - last_report >= self.report_seconds:
+                logger.info(f"事件循环阻塞统计: {self.metrics()}")
+                self._reset()
+                last_report = now
+
+    def metrics(self):
+        """返回当前统计窗口内的阻塞情况"""
+        return {
+            'samples': self.samples,
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'mean_lag_ms': round(self.blocked_seconds / self.samples * 1000, 2) if self.samples else 0.0,
+            'stalls': self.stalls
+        }